@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark: DOCX -> TXT with the streaming zipfile/iterparse engine vs. python-docx.
+
+Each engine runs in a fresh subprocess so the reported peak RSS belongs to that engine only.
+
+Usage:
+    python benchmarks/bench_docx.py [--pages 300]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import generate_docx, peak_rss_mb
+
+ENGINES = ['python-docx', 'stream']
+
+
+def run_one(engine, docx_path, output_path):
+    """Convert docx_path with a single engine and print the measurements as JSON."""
+    from converters.docx_converter import DOCXConverter
+
+    start = time.perf_counter()
+    ok = bool(DOCXConverter(docx_path, engine=engine).convert(output_path))
+    elapsed = time.perf_counter() - start
+
+    print(json.dumps({'engine': engine, 'ok': ok, 'seconds': elapsed, 'peak_rss_mb': peak_rss_mb()}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=300)
+    parser.add_argument('--run-one', nargs=3, metavar=('ENGINE', 'DOCX', 'OUTPUT'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        run_one(*args.run_one)
+        return
+
+    workdir = tempfile.mkdtemp(prefix='bench_docx_')
+    docx_path = generate_docx(os.path.join(workdir, 'input.docx'), args.pages)
+    print(f"Input: {args.pages} pages ({os.path.getsize(docx_path) / 1e6:.1f} MB)")
+    print(f"{'engine':<14}{'seconds':>10}{'pages/sec':>12}{'peak RSS MB':>14}")
+
+    for engine in ENGINES:
+        output_path = os.path.join(workdir, f'{engine}.txt')
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--run-one', engine, docx_path, output_path],
+            capture_output=True, text=True,
+        )
+        lines = [line for line in proc.stdout.splitlines() if line.startswith('{')]
+        if proc.returncode != 0 or not lines or not json.loads(lines[-1])['ok']:
+            print(f"{engine:<14}{'failed':>10}")
+            continue
+        result = json.loads(lines[-1])
+        print(f"{engine:<14}{result['seconds']:>10.2f}{args.pages / result['seconds']:>12.1f}{result['peak_rss_mb']:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Benchmark: CSV -> CSV and CSV -> JSONL throughput with CSVConverter(jobs=N).
+
+The input is parsed in newline-aligned byte ranges by N worker processes;
+throughput should scale close to linearly up to the number of CPU cores.
+
+Usage:
+    python benchmarks/bench_parallel_csv.py [--rows 2000000] [--jobs 1 2 4 8]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+from common import generate_csv
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=2000000)
+    parser.add_argument('--cols', type=int, default=8)
+    parser.add_argument('--jobs', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    from converters.csv_converter import CSVConverter
+
+    workdir = tempfile.mkdtemp(prefix='bench_parallel_csv_')
+    csv_path = generate_csv(os.path.join(workdir, 'input.csv'), args.rows, args.cols)
+    size_mb = os.path.getsize(csv_path) / 1e6
+    print(f"Input: {args.rows} rows x {args.cols} cols ({size_mb:.1f} MB), {os.cpu_count()} CPU cores")
+    print(f"{'output':<8}{'jobs':>6}{'seconds':>10}{'MB/sec':>10}{'speedup':>10}")
+
+    for extension in ('.csv', '.jsonl'):
+        baseline = None
+        for jobs in args.jobs:
+            output_path = os.path.join(workdir, f'output_{jobs}{extension}')
+            start = time.perf_counter()
+            # Silence the converter's progress messages so only the table is printed
+            with contextlib.redirect_stdout(io.StringIO()):
+                ok = CSVConverter(csv_path, jobs=jobs).convert(output_path)
+            seconds = time.perf_counter() - start
+            if not ok:
+                print(f"{extension:<8}{jobs:>6}{'failed':>10}")
+                continue
+            baseline = baseline or seconds
+            print(f"{extension:<8}{jobs:>6}{seconds:>10.2f}{size_mb / seconds:>10.1f}{baseline / seconds:>9.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Benchmark: PDF -> DOCX pages/sec with PDFConverter(jobs=N) page-range sharding.
+
+Usage:
+    python benchmarks/bench_pdf_parallel.py [--pages 200] [--jobs 1 2 4 8]
+"""
+
+import argparse
+import contextlib
+import io
+import logging
+import os
+import tempfile
+import time
+
+from common import generate_pdf
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=200)
+    parser.add_argument('--jobs', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    from converters.pdf_converter import PDFConverter
+
+    # pdf2docx logs every page; keep only the benchmark table
+    logging.disable(logging.INFO)
+
+    workdir = tempfile.mkdtemp(prefix='bench_pdf_')
+    pdf_path = generate_pdf(os.path.join(workdir, 'input.pdf'), args.pages)
+    print(f"Input: {args.pages} pages, {os.cpu_count()} CPU cores")
+    print(f"{'jobs':>6}{'seconds':>10}{'pages/sec':>12}{'speedup':>10}")
+
+    baseline = None
+    for jobs in args.jobs:
+        output_path = os.path.join(workdir, f'output_{jobs}.docx')
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            ok = PDFConverter(pdf_path, jobs=jobs).convert(output_path)
+        seconds = time.perf_counter() - start
+        if not ok:
+            print(f"{jobs:>6}{'failed':>10}")
+            continue
+        baseline = baseline or seconds
+        print(f"{jobs:>6}{seconds:>10.2f}{args.pages / seconds:>12.1f}{baseline / seconds:>9.2f}x")
+
+
+if __name__ == '__main__':
+    main()
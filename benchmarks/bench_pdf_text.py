@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark: PDF -> DOCX text-only conversion, page-streaming writer vs. the old
+build-one-string-then-python-docx approach, at several page counts.
+
+Each run happens in a fresh subprocess so the reported peak RSS belongs to that run only.
+Streaming should show flat memory and seconds that grow linearly with the page count.
+
+Usage:
+    python benchmarks/bench_pdf_text.py [--pages 500 1000 2000]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import generate_pdf, peak_rss_mb
+
+METHODS = ['legacy', 'stream']
+
+
+def convert_legacy(pdf_path, output_path):
+    """The previous fallback: one growing string and a single python-docx paragraph."""
+    import fitz
+    from docx import Document
+
+    pdf_text = ""
+    pdf_doc = fitz.open(pdf_path)
+    for page_num in range(len(pdf_doc)):
+        pdf_text += f"--- Page {page_num + 1} ---\n"
+        pdf_text += pdf_doc[page_num].get_text() + "\n"
+    pdf_doc.close()
+
+    doc = Document()
+    doc.add_heading('PDF Content', level=1)
+    doc.add_paragraph(pdf_text)
+    doc.save(output_path)
+
+
+def run_one(method, pdf_path, output_path):
+    """Convert pdf_path with a single method and print the measurements as JSON."""
+    from converters.pdf_converter import PDFConverter
+
+    start = time.perf_counter()
+    if method == 'legacy':
+        convert_legacy(pdf_path, output_path)
+    else:
+        PDFConverter(pdf_path, mode='fast').convert_text_only(output_path)
+    elapsed = time.perf_counter() - start
+
+    print(json.dumps({'method': method, 'seconds': elapsed, 'peak_rss_mb': peak_rss_mb()}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, nargs='+', default=[500, 1000, 2000])
+    parser.add_argument('--run-one', nargs=3, metavar=('METHOD', 'PDF', 'OUTPUT'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        run_one(*args.run_one)
+        return
+
+    workdir = tempfile.mkdtemp(prefix='bench_pdf_text_')
+    print(f"{'pages':>6}  {'method':<8}{'seconds':>10}{'ms/page':>10}{'peak RSS MB':>14}")
+
+    for pages in args.pages:
+        pdf_path = generate_pdf(os.path.join(workdir, f'input_{pages}.pdf'), pages)
+        for method in METHODS:
+            output_path = os.path.join(workdir, f'{method}_{pages}.docx')
+            proc = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--run-one', method, pdf_path, output_path],
+                capture_output=True, text=True,
+            )
+            lines = [line for line in proc.stdout.splitlines() if line.startswith('{')]
+            if proc.returncode != 0 or not lines:
+                print(f"{pages:>6}  {method:<8}{'failed':>10}")
+                continue
+            result = json.loads(lines[-1])
+            print(f"{pages:>6}  {method:<8}{result['seconds']:>10.2f}"
+                  f"{1000 * result['seconds'] / pages:>10.2f}{result['peak_rss_mb']:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark: PDF -> TXT/JSONL read straight from the text layer vs. the two-hop chain
+(PDF -> DOCX with pdf2docx, then DOCX -> TXT with DOCXConverter).
+
+Usage:
+    python benchmarks/bench_pdf_txt.py [--pages 100] [--jobs 1]
+"""
+
+import argparse
+import contextlib
+import io
+import logging
+import os
+import tempfile
+import time
+
+from common import generate_pdf
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=100)
+    parser.add_argument('--jobs', type=int, default=1, help='pdf2docx worker processes for the two-hop chain')
+    args = parser.parse_args()
+
+    from converters.docx_converter import DOCXConverter
+    from converters.pdf_converter import PDFConverter
+
+    # pdf2docx logs every page; keep only the benchmark table
+    logging.disable(logging.INFO)
+
+    workdir = tempfile.mkdtemp(prefix='bench_pdf_txt_')
+    pdf_path = generate_pdf(os.path.join(workdir, 'input.pdf'), args.pages)
+
+    def two_hop():
+        docx_path = os.path.join(workdir, 'two_hop.docx')
+        return (PDFConverter(pdf_path, jobs=args.jobs, mode='layout').convert(docx_path)
+                and DOCXConverter(docx_path).convert(os.path.join(workdir, 'two_hop.txt')))
+
+    methods = [
+        ('direct .txt', lambda: PDFConverter(pdf_path).convert(os.path.join(workdir, 'direct.txt'))),
+        ('direct .jsonl', lambda: PDFConverter(pdf_path).convert(os.path.join(workdir, 'direct.jsonl'))),
+        ('two-hop via .docx', two_hop),
+    ]
+
+    print(f"Input: {args.pages} pages")
+    print(f"{'method':<20}{'seconds':>10}{'pages/sec':>12}{'speedup':>10}")
+
+    seconds_by_method = {}
+    for name, run in methods:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            ok = run()
+        seconds = time.perf_counter() - start
+        if not ok:
+            print(f"{name:<20}{'failed':>10}")
+            continue
+        seconds_by_method[name] = seconds
+
+    # Speedup is relative to the two-hop chain
+    baseline = seconds_by_method.get('two-hop via .docx')
+    for name, seconds in seconds_by_method.items():
+        speedup = f"{baseline / seconds:>9.1f}x" if baseline else f"{'-':>10}"
+        print(f"{name:<20}{seconds:>10.2f}{args.pages / seconds:>12.1f}{speedup}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Load test of the HTTP conversion service (python -m converters serve).
+
+Every request uploads a generated CSV, polls the job until it has finished and
+downloads the result; its latency is measured from the start of the upload to the
+end of the download. For each concurrency level, that many clients send requests
+back to back for --duration seconds. Reports p50/p99 latency, completed conversions
+per second, and how many uploads were refused with 429 because the queue was full
+(refused uploads are retried after the server's Retry-After and not counted as done).
+
+The service is started on a free local port unless --url points at a running one.
+
+Usage:
+    python benchmarks/bench_server.py [--rows 20000] [--to .json] [--concurrency 1 4 16]
+                                      [--duration 10] [--workers N] [--queue-size 16] [--url URL]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from common import PROJECT_ROOT, generate_csv
+
+# Seconds between status polls of a job
+POLL_INTERVAL = 0.01
+
+
+def convert_once(url, body, to):
+    """Upload, wait and download once; return 'ok', 'refused' or 'failed'."""
+    request = urllib.request.Request(f'{url}/jobs?filename=bench.csv&to={to}', data=body, method='POST')
+    try:
+        with urllib.request.urlopen(request) as response:
+            job = json.load(response)
+    except urllib.error.HTTPError as e:
+        if e.code == 429:
+            time.sleep(float(e.headers.get('Retry-After', 1)))
+            return 'refused'
+        return 'failed'
+
+    while job['status'] in ('queued', 'running'):
+        time.sleep(POLL_INTERVAL)
+        with urllib.request.urlopen(f"{url}/jobs/{job['id']}") as response:
+            job = json.load(response)
+    if job['status'] != 'success':
+        return 'failed'
+
+    with urllib.request.urlopen(f"{url}{job['result_url']}") as response:
+        while response.read(1024 * 1024):
+            pass
+    urllib.request.urlopen(urllib.request.Request(f"{url}/jobs/{job['id']}", method='DELETE')).close()
+    return 'ok'
+
+
+def run_level(url, body, to, concurrency, duration):
+    """Run concurrency clients for duration seconds; return latencies and outcome counts."""
+    latencies = []
+    counts = {'ok': 0, 'refused': 0, 'failed': 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            outcome = convert_once(url, body, to)
+            elapsed = time.perf_counter() - start
+            with lock:
+                counts[outcome] += 1
+                if outcome == 'ok':
+                    latencies.append(elapsed)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, counts, time.perf_counter() - start
+
+
+def percentile(values, fraction):
+    """Return the value below which fraction of the sorted values fall."""
+    if not values:
+        return float('nan')
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=20000, help='rows of the uploaded CSV')
+    parser.add_argument('--to', default='.json', help='output format (default: .json)')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--duration', type=float, default=10, help='seconds per concurrency level')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes of the started service')
+    parser.add_argument('--queue-size', type=int, default=16, help='queue size of the started service')
+    parser.add_argument('--url', default=None, help='use a running service instead of starting one')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, 'bench.csv')
+        generate_csv(input_path, args.rows)
+        with open(input_path, 'rb') as f:
+            body = f.read()
+
+        server = service = None
+        url = args.url.rstrip('/') if args.url else None
+        if url is None:
+            sys.path.insert(0, PROJECT_ROOT)
+            from converters.server import ConversionServer, ConversionService
+            service = ConversionService(workers=args.workers, queue_size=args.queue_size)
+            service.warm_up()
+            server = ConversionServer(('127.0.0.1', 0), service)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            url = f'http://127.0.0.1:{server.server_address[1]}'
+            print(f"Service on {url}: {service.workers} workers, queue of {service.capacity} jobs")
+
+        print(f"Upload: {len(body) / 1e6:.1f} MB CSV -> {args.to}, {args.duration:.0f} s per level\n")
+        print(f"{'clients':>8}{'done':>8}{'429':>8}{'failed':>8}{'p50 ms':>10}{'p99 ms':>10}{'req/s':>10}")
+        try:
+            for concurrency in args.concurrency:
+                latencies, counts, elapsed = run_level(url, body, args.to, concurrency, args.duration)
+                print(f"{concurrency:>8}{counts['ok']:>8}{counts['refused']:>8}{counts['failed']:>8}"
+                      f"{percentile(latencies, 0.5) * 1000:>10.1f}{percentile(latencies, 0.99) * 1000:>10.1f}"
+                      f"{counts['ok'] / elapsed:>10.1f}")
+        finally:
+            if server is not None:
+                server.shutdown()
+                server.server_close()
+                service.close()
+
+
+if __name__ == '__main__':
+    main()
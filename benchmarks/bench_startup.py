@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Startup budget: measure import time with `python -X importtime` for the modules
+loaded at startup, and fail if the GUI or the converters package goes over budget.
+
+Each import runs in a fresh interpreter; the best of --repeat runs is reported,
+together with the heaviest top-level imports. Exits with status 1 if a budgeted
+import takes longer than --budget-ms, so the check can run in CI.
+
+Usage:
+    python benchmarks/bench_startup.py [--budget-ms 200] [--repeat 5]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+from common import PROJECT_ROOT
+
+# Imports that must stay within the budget: what the GUI and the package load at startup
+BUDGETED = ['converters', 'ui.gui']
+
+# Converter classes, loaded on first use; reported for tracking but not budgeted
+ON_DEMAND = ['TXTConverter', 'CSVConverter', 'DOCXConverter', 'PDFConverter']
+
+
+def measure(statement):
+    """Run statement with -X importtime and return (total_ms, [(cumulative_ms, module), ...])."""
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+    )
+    top_level = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Nested imports are indented; only top-level ones add up to the total
+        if not name[1:].startswith(' '):
+            top_level.append((int(cumulative) / 1000, name.strip()))
+    return sum(ms for ms, _ in top_level), top_level
+
+
+def best_of(statement, repeat):
+    """Return the fastest of repeat measurements."""
+    return min((measure(statement) for _ in range(repeat)), key=lambda result: result[0])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--budget-ms', type=float, default=200.0)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=3, help='heaviest top-level imports to list per statement')
+    args = parser.parse_args()
+
+    statements = [(f'import {module}', True) for module in BUDGETED]
+    statements += [(f'from converters import {name}', False) for name in ON_DEMAND]
+
+    print(f"{'statement':<38}{'ms':>9}{'budget':>9}  heaviest imports")
+    over_budget = False
+    for statement, budgeted in statements:
+        total, top_level = best_of(statement, args.repeat)
+        heaviest = sorted(top_level, reverse=True)[:args.top]
+        status = ''
+        if budgeted:
+            over = total > args.budget_ms
+            over_budget = over_budget or over
+            status = 'OVER' if over else 'ok'
+        print(f"{statement:<38}{total:>9.1f}{status:>9}  "
+              + ', '.join(f"{name} {ms:.0f}" for ms, name in heaviest))
+
+    if over_budget:
+        print(f"\nStartup budget of {args.budget_ms:.0f} ms exceeded")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
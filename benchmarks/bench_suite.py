@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite: every conversion the GUI offers, on deterministic synthetic inputs.
+
+Inputs (long and wide CSV, whitespace TXT table, access log, multi-page DOCX and PDF)
+are generated locally at the chosen size and reused from --workdir when they already
+exist. Each input is converted to every output format its converter supports, each
+run in a fresh subprocess so the reported peak RSS belongs to that run only.
+
+Results are written as JSON. With --baseline, every case is compared against a stored
+run: a case regresses when its time or peak RSS grows by more than --threshold
+(default 20%), and the script then exits with status 1.
+
+Usage:
+    python benchmarks/bench_suite.py [--size small|medium|large] [--output results.json]
+                                     [--baseline baseline.json] [--threshold 0.2]
+                                     [--update-baseline] [--cases csv pdf] [--repeat 3]
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+
+from common import (PROJECT_ROOT, generate_csv, generate_docx, generate_log, generate_pdf,
+                    generate_whitespace_txt, peak_rss_mb)
+
+# Input size of each generated file per --size: rows for tables and logs, pages for documents
+SIZES = {
+    'small': {'csv_long': 20000, 'csv_wide': 2000, 'txt_table': 20000, 'txt_log': 20000, 'docx': 20, 'pdf': 20},
+    'medium': {'csv_long': 200000, 'csv_wide': 20000, 'txt_table': 200000, 'txt_log': 200000, 'docx': 200, 'pdf': 200},
+    'large': {'csv_long': 1000000, 'csv_wide': 100000, 'txt_table': 1000000, 'txt_log': 1000000, 'docx': 500, 'pdf': 1000},
+}
+
+# Columns of the wide CSV
+WIDE_COLUMNS = 200
+
+# Input name -> (file extension, generator(path, size))
+INPUTS = {
+    'csv_long': ('.csv', lambda path, size: generate_csv(path, size)),
+    'csv_wide': ('.csv', lambda path, size: generate_csv(path, size, cols=WIDE_COLUMNS)),
+    'txt_table': ('.txt', lambda path, size: generate_whitespace_txt(path, size)),
+    'txt_log': ('.txt', lambda path, size: generate_log(path, size)),
+    'docx': ('.docx', lambda path, size: generate_docx(path, size)),
+    'pdf': ('.pdf', lambda path, size: generate_pdf(path, size)),
+}
+
+# Output extensions that are aliases of another one and add nothing to the suite
+ALIASES = {'.ndjson'}
+
+# Measurements compared against the baseline, with the smallest absolute growth that
+# counts as a regression so timer noise on very fast cases is not reported
+COMPARED = {'seconds': 0.05, 'peak_rss_mb': 5.0}
+
+DEFAULT_THRESHOLD = 0.2
+
+
+def plan_cases(names=None):
+    """Return (case id, input name, output extension) for every supported edge."""
+    from converters.registry import get_spec
+
+    cases = []
+    for input_name, (extension, _) in INPUTS.items():
+        for output_format in get_spec(extension).output_formats:
+            if output_format in ALIASES:
+                continue
+            case_id = f'{input_name}->{output_format.lstrip(".")}'
+            if names and not any(name in case_id for name in names):
+                continue
+            cases.append((case_id, input_name, output_format))
+    return cases
+
+
+def prepare_input(workdir, input_name, size):
+    """Generate an input file unless an identical one is already in workdir."""
+    extension, generator = INPUTS[input_name]
+    path = os.path.join(workdir, f'{input_name}_{size}{extension}')
+    if not os.path.exists(path):
+        print(f"Generating {os.path.basename(path)}...")
+        generator(path + '.tmp', size)
+        os.replace(path + '.tmp', path)
+    return path
+
+
+def run_one(input_path, output_path):
+    """Convert input_path to output_path once and print the measurements as JSON."""
+    from converters.registry import create_converter
+
+    result = create_converter(input_path).convert(output_path)
+    print(json.dumps({
+        'ok': bool(result),
+        'seconds': result.wall_seconds,
+        'peak_rss_mb': peak_rss_mb(),
+        'bytes_in': result.bytes_in,
+        'bytes_out': result.bytes_out,
+        'rows': result.rows,
+        'pages': result.pages,
+        'error': result.error,
+    }))
+
+
+def measure(input_path, output_path, repeat):
+    """Run a case repeat times in fresh subprocesses; keep the fastest run and the largest RSS."""
+    best = None
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--run-one', input_path, output_path],
+            capture_output=True, text=True,
+        )
+        lines = [line for line in proc.stdout.splitlines() if line.startswith('{')]
+        if proc.returncode != 0 or not lines:
+            return {'ok': False, 'error': (proc.stderr.strip().splitlines() or ['no output'])[-1]}
+        run = json.loads(lines[-1])
+        if not run['ok']:
+            return run
+        if best is None:
+            best = run
+        else:
+            best['seconds'] = min(best['seconds'], run['seconds'])
+            best['peak_rss_mb'] = max(best['peak_rss_mb'], run['peak_rss_mb'])
+    best['mb_per_second'] = best['bytes_in'] / 1e6 / best['seconds'] if best['seconds'] else None
+    return best
+
+
+def compare(results, baseline, threshold):
+    """Return a list of (case id, measurement, baseline value, new value) regressions."""
+    regressions = []
+    for case_id, result in results.items():
+        previous = baseline.get(case_id)
+        if not previous or not previous.get('ok'):
+            continue
+        if not result.get('ok'):
+            regressions.append((case_id, 'ok', True, False))
+            continue
+        for measurement, noise in COMPARED.items():
+            old, new = previous.get(measurement), result.get(measurement)
+            if old and new is not None and new > old * (1 + threshold) and new - old > noise:
+                regressions.append((case_id, measurement, old, new))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', choices=list(SIZES), default='small')
+    parser.add_argument('--cases', nargs='+', metavar='NAME',
+                        help='only run cases whose id contains one of these names, e.g. csv_wide pdf->txt')
+    parser.add_argument('--repeat', type=int, default=1, help='runs per case; the fastest is kept')
+    parser.add_argument('--workdir', default=os.path.join(tempfile.gettempdir(), 'file_converter_bench'),
+                        help='where generated inputs are kept between runs')
+    parser.add_argument('--output', default=None, help='results file (default: bench_results_<size>.json)')
+    parser.add_argument('--baseline', default=None, help='compare against this results file')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='allowed growth of time and peak RSS before a case regresses (default: 0.2)')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='write the results to --baseline instead of comparing against it')
+    parser.add_argument('--run-one', nargs=2, metavar=('INPUT', 'OUTPUT'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        run_one(*args.run_one)
+        return 0
+
+    os.makedirs(args.workdir, exist_ok=True)
+    sizes = SIZES[args.size]
+    results = {}
+    print(f"{'case':<22}{'seconds':>10}{'MB/s':>10}{'peak RSS MB':>14}")
+    for case_id, input_name, output_format in plan_cases(args.cases):
+        input_path = prepare_input(args.workdir, input_name, sizes[input_name])
+        output_path = os.path.join(args.workdir, f'out_{input_name}{output_format}')
+        result = measure(input_path, output_path, args.repeat)
+        result['size'] = sizes[input_name]
+        results[case_id] = result
+        if result['ok']:
+            print(f"{case_id:<22}{result['seconds']:>10.2f}{result['mb_per_second'] or 0:>10.1f}"
+                  f"{result['peak_rss_mb']:>14.1f}")
+        else:
+            print(f"{case_id:<22}{'failed':>10}  {result.get('error')}")
+
+    report = {
+        'meta': {
+            'size': args.size,
+            'date': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+        },
+        'results': results,
+    }
+    output_path = args.output or os.path.join(PROJECT_ROOT, f'bench_results_{args.size}.json')
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output_path}")
+
+    if args.baseline and args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline updated: {args.baseline}")
+    elif args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline['meta'].get('size') != args.size:
+            print(f"Warning: baseline was measured at size '{baseline['meta'].get('size')}'")
+        regressions = compare(results, baseline['results'], args.threshold)
+        for case_id, measurement, old, new in regressions:
+            print(f"REGRESSION {case_id}: {measurement} {old} -> {new}")
+        if regressions:
+            print(f"{len(regressions)} regression(s) over {args.threshold:.0%}")
+            return 1
+        print(f"No regressions over {args.threshold:.0%} against {args.baseline}")
+    if any(not result['ok'] for result in results.values()):
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Benchmark: parsing a whitespace-separated TXT table with the sniffed C-engine path
+vs. the previous pd.read_csv(sep='\\s+', engine='python') parse.
+
+Usage:
+    python benchmarks/bench_txt.py [--rows 1000000] [--cols 6]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from common import generate_whitespace_txt
+
+
+def time_call(func):
+    """Run func once and return (seconds, rows)."""
+    start = time.perf_counter()
+    rows = func()
+    return time.perf_counter() - start, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--cols', type=int, default=6)
+    args = parser.parse_args()
+
+    import pandas as pd
+    from converters.txt_converter import TXTConverter
+
+    workdir = tempfile.mkdtemp(prefix='bench_txt_')
+    txt_path = generate_whitespace_txt(os.path.join(workdir, 'input.txt'), args.rows, args.cols)
+    print(f"Input: {args.rows} lines x {args.cols} cols ({os.path.getsize(txt_path) / 1e6:.1f} MB)")
+
+    cases = [
+        ('before: python engine', lambda: len(pd.read_csv(txt_path, sep='\\s+', engine='python'))),
+        ('after: sniff + C engine', lambda: sum(len(chunk) for chunk in TXTConverter(txt_path).read_chunks())),
+        ('after: full TXT -> CSV', lambda: TXTConverter(txt_path).convert(os.path.join(workdir, 'output.csv')) and args.rows),
+    ]
+
+    print(f"{'case':<28}{'seconds':>10}{'lines/sec':>14}")
+    for name, func in cases:
+        seconds, rows = time_call(func)
+        print(f"{name:<28}{seconds:>10.2f}{rows / seconds:>14,.0f}")
+
+
+if __name__ == '__main__':
+    main()
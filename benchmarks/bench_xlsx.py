@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark: CSV -> XLSX with the streaming XLSX writer vs. the pandas/openpyxl path.
+
+Each mode runs in a fresh subprocess so the reported peak RSS belongs to that mode only.
+
+Usage:
+    python benchmarks/bench_xlsx.py [--rows 200000] [--cols 8] [--chunksize 50000]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import generate_csv, peak_rss_mb
+
+MODES = ['pandas-openpyxl', 'stream-openpyxl', 'stream-xlsxwriter']
+
+
+def run_one(mode, csv_path, output_path, chunksize):
+    """Convert csv_path with a single mode and print the measurements as JSON."""
+    import pandas as pd
+    from converters.csv_converter import CSVConverter
+
+    start = time.perf_counter()
+    if mode == 'pandas-openpyxl':
+        # The conversion path CSVConverter used before the streaming writer
+        df = pd.read_csv(csv_path)
+        df.to_excel(output_path, index=False, engine='openpyxl')
+        ok = True
+    else:
+        engine = mode.split('-', 1)[1]
+        ok = bool(CSVConverter(csv_path, chunksize=chunksize, xlsx_engine=engine).convert(output_path))
+    elapsed = time.perf_counter() - start
+
+    print(json.dumps({'mode': mode, 'ok': ok, 'seconds': elapsed, 'peak_rss_mb': peak_rss_mb()}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--cols', type=int, default=8)
+    parser.add_argument('--chunksize', type=int, default=50000)
+    parser.add_argument('--modes', nargs='+', default=MODES, choices=MODES)
+    parser.add_argument('--run-one', nargs=3, metavar=('MODE', 'CSV', 'OUTPUT'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        run_one(*args.run_one, chunksize=args.chunksize)
+        return
+
+    workdir = tempfile.mkdtemp(prefix='bench_xlsx_')
+    csv_path = generate_csv(os.path.join(workdir, 'input.csv'), args.rows, args.cols)
+    print(f"Input: {args.rows} rows x {args.cols} cols ({os.path.getsize(csv_path) / 1e6:.1f} MB)")
+    print(f"{'mode':<20}{'seconds':>10}{'rows/sec':>14}{'peak RSS MB':>14}")
+
+    for mode in args.modes:
+        output_path = os.path.join(workdir, f'{mode}.xlsx')
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--chunksize', str(args.chunksize),
+             '--run-one', mode, csv_path, output_path],
+            capture_output=True, text=True,
+        )
+        lines = [line for line in proc.stdout.splitlines() if line.startswith('{')]
+        if proc.returncode != 0 or not lines or not json.loads(lines[-1])['ok']:
+            # Show the converter's own error message, e.g. a missing optional engine
+            errors = [line for line in (proc.stdout + proc.stderr).splitlines() if 'Error' in line]
+            print(f"{mode:<20}{'failed':>10}  {errors[-1] if errors else ''}")
+            continue
+        result = json.loads(lines[-1])
+        rate = args.rows / result['seconds']
+        print(f"{mode:<20}{result['seconds']:>10.2f}{rate:>14,.0f}{result['peak_rss_mb']:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+Shared helpers for the benchmark scripts: deterministic input generators
+and peak memory measurement.
+"""
+
+import os
+import random
+import sys
+
+# Add project root to path so the benchmarks can import the converters
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+
+def peak_rss_mb():
+    """Return the peak resident set size of the current process in MB."""
+    try:
+        import resource
+    except ImportError:
+        # The resource module is not available on Windows
+        return float('nan')
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+    if sys.platform == 'darwin':
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def generate_csv(path, rows, cols=8, seed=42):
+    """Write a deterministic CSV file with a mix of integer, float and text columns."""
+    rng = random.Random(seed)
+    words = ['alpha', 'bravo', 'charlie', 'delta', 'echo', 'foxtrot', 'golf', 'hotel']
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write(','.join(f'col{i}' for i in range(cols)) + '\n')
+        for row in range(rows):
+            values = []
+            for col in range(cols):
+                if col % 3 == 0:
+                    values.append(str(row * cols + col))
+                elif col % 3 == 1:
+                    values.append(f'{rng.random() * 1000:.3f}')
+                else:
+                    values.append(rng.choice(words))
+            f.write(','.join(values) + '\n')
+    return path
+
+
+def generate_whitespace_txt(path, rows, cols=6, seed=42):
+    """Write a deterministic whitespace-separated text table with a header row."""
+    rng = random.Random(seed)
+    words = ['alpha', 'bravo', 'charlie', 'delta', 'echo', 'foxtrot', 'golf', 'hotel']
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(' '.join(f'col{i}' for i in range(cols)) + '\n')
+        for row in range(rows):
+            values = []
+            for col in range(cols):
+                if col % 2 == 0:
+                    values.append(str(row * cols + col))
+                else:
+                    values.append(rng.choice(words))
+            # Runs of several spaces, as in hand-aligned text tables
+            f.write('   '.join(values) + '\n')
+    return path
+
+
+def generate_docx(path, pages, paragraphs_per_page=8, seed=42):
+    """Write a deterministic multi-page Word document with a table every ten pages."""
+    from docx import Document
+
+    rng = random.Random(seed)
+    words = ['contract', 'party', 'agreement', 'shall', 'term', 'payment', 'notice', 'clause',
+             'liability', 'herein', 'provided', 'section', 'the', 'of', 'and', 'to']
+    doc = Document()
+    for page in range(pages):
+        doc.add_heading(f'Section {page + 1}', level=2)
+        for _ in range(paragraphs_per_page):
+            doc.add_paragraph(' '.join(rng.choice(words) for _ in range(60)))
+        if page % 10 == 9:
+            table = doc.add_table(rows=5, cols=4)
+            for row in table.rows:
+                for cell in row.cells:
+                    cell.text = rng.choice(words)
+        doc.add_page_break()
+    doc.save(path)
+    return path
+
+
+def generate_pdf(path, pages, lines_per_page=40, seed=42):
+    """Write a deterministic text PDF with PyMuPDF (installed with pdf2docx)."""
+    import fitz
+
+    rng = random.Random(seed)
+    words = ['report', 'quarter', 'revenue', 'growth', 'market', 'customer', 'the', 'of', 'and', 'in']
+    doc = fitz.open()
+    for page_number in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 60), f'Page heading {page_number + 1}', fontsize=16)
+        for line in range(lines_per_page):
+            text = ' '.join(rng.choice(words) for _ in range(12))
+            page.insert_text((72, 90 + line * 17), text, fontsize=10)
+    doc.save(path)
+    doc.close()
+    return path
+
+
+def generate_log(path, lines, seed=42):
+    """Write a deterministic space-separated access log (timestamp, level, service, ...)."""
+    rng = random.Random(seed)
+    levels = ['INFO', 'INFO', 'INFO', 'DEBUG', 'WARN', 'ERROR']
+    services = ['auth', 'billing', 'search', 'upload', 'gateway']
+    paths = ['/login', '/api/items', '/api/orders', '/static/app.js', '/health']
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('timestamp level service method path status latency_ms bytes\n')
+        for line in range(lines):
+            seconds = line // 10
+            timestamp = f'2024-01-{1 + seconds // 86400 % 28:02d}T{seconds // 3600 % 24:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}'
+            f.write(f'{timestamp} {rng.choice(levels)} {rng.choice(services)} '
+                    f'{rng.choice(["GET", "POST"])} {rng.choice(paths)} {rng.choice([200, 200, 201, 404, 500])} '
+                    f'{rng.randint(1, 2000)} {rng.randint(100, 100000)}\n')
+    return path
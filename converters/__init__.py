@@ -1,20 +1,26 @@
 # This file makes the converters folder a Python package
-# It imports all converter classes so they can be easily imported from the converters module
+# Converter classes can be imported from the converters module as before, but each one
+# is only loaded on first access, so importing the package does not pull in pandas,
+# python-docx or pdf2docx (see registry.py)
 
 # Import base converter class that all other converters inherit from
 from .base_converter import BaseConverter
 
-# Import CSV converter class for converting CSV files
-from .csv_converter import CSVConverter
+# Import the registry that knows where every converter class lives
+from .registry import CONVERTERS, get_converter_class, create_converter
 
-# Import PDF converter class for converting PDF files
-from .pdf_converter import PDFConverter
+# Converter class name -> registry entry, e.g. 'CSVConverter' -> the CSV ConverterSpec
+_LAZY_CONVERTERS = {spec.class_name: spec for spec in CONVERTERS}
 
-# Import DOCX converter class for converting Word documents
-from .docx_converter import DOCXConverter
 
-# Import TXT converter class for converting text files
-from .txt_converter import TXTConverter
+"""
+Load converter classes such as CSVConverter the first time they are accessed.
+"""
+def __getattr__(name):
+    if name in _LAZY_CONVERTERS:
+        return _LAZY_CONVERTERS[name].load()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 # This list defines what gets imported when someone does "from converters import *"
 __all__ = [
@@ -22,5 +28,7 @@ __all__ = [
     'CSVConverter',
     'PDFConverter',
     'DOCXConverter',
-    'TXTConverter'
+    'TXTConverter',
+    'get_converter_class',
+    'create_converter',
 ]
@@ -0,0 +1,217 @@
+# Command line entry point: python -m converters <command> ...
+#
+#   python -m converters convert <input> <output> [--to .json] [--profile] [--compress-level N]
+#                                ('-' reads stdin / writes stdout; report.csv.gz -> data.json.gz works too)
+#   python -m converters batch <in_dir> <out_dir> --to .json [--jobs N] [--recursive]
+#                              [--cache-dir DIR] [--cache-size MB] [--report FILE] [--profile]
+#                              [--compress-level N]
+#   python -m converters watch <in_dir> <out_dir> --to .json [--jobs N] [--recursive] [--debounce S]
+#                              [--poll-interval S] [--polling] [--manifest FILE] [--once]
+#                              [--compress-level N]
+#   python -m converters serve [--host 127.0.0.1] [--port 8000] [--workers N] [--queue-size M]
+
+# Import argparse module to parse the command line
+import argparse
+
+# Import os module to check the input file
+import os
+
+# Import sys module for the exit status and the standard streams
+import sys
+
+# Import redirect_stdout to keep progress messages out of converted output on stdout
+from contextlib import redirect_stdout
+
+# Import the batch runner
+from .batch import run_batch, print_summary
+
+# Import the default size budget of the conversion cache
+from .cache import DEFAULT_MAX_BYTES
+
+# Import the registry to pick the converter for a single file
+from .registry import create_converter, get_converter_class
+
+# Import the name that stands for stdin/stdout
+from .streams import STDIO
+
+# Import the watch-folder mode and its defaults
+from .watch import DEFAULT_DEBOUNCE, DEFAULT_POLL_INTERVAL, MANIFEST_NAME, watch_folder
+
+# Import the HTTP service and its defaults
+from .server import DEFAULT_HOST, DEFAULT_MAX_UPLOAD_BYTES, DEFAULT_PORT, DEFAULT_QUEUE_SIZE, serve
+
+"""
+Help text of the --profile option, shared by the subcommands.
+"""
+PROFILE_HELP = 'write a cProfile (.prof) and memory report (.profile.txt) next to every output file'
+
+"""
+Help text of the --compress-level option, shared by the subcommands.
+"""
+COMPRESS_LEVEL_HELP = ('compression level of compressed outputs such as .json.gz '
+                       '(default: gzip 6, bz2 9, xz 6, zstd 3)')
+
+
+"""
+Build the command line parser with one subcommand per mode.
+"""
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m converters', description='Headless file conversion.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    convert = commands.add_parser('convert', help='convert a single file')
+    convert.add_argument('input', help="file to convert, or '-' for stdin")
+    convert.add_argument('output', help="output file, or '-' for stdout; its extension selects the format")
+    convert.add_argument('--from', dest='from_format', metavar='EXT',
+                         help="input format when reading stdin, e.g. .csv")
+    convert.add_argument('--to', metavar='EXT', help="output format when writing stdout, e.g. .json")
+    convert.add_argument('--profile', action='store_true', help=PROFILE_HELP)
+    convert.add_argument('--compress-level', type=int, default=None, metavar='N', help=COMPRESS_LEVEL_HELP)
+
+    batch = commands.add_parser('batch', help='convert every supported file in a directory')
+    batch.add_argument('input_dir', help='directory with the files to convert')
+    batch.add_argument('output_dir', help='directory for the converted files (created if missing)')
+    batch.add_argument('--to', required=True, metavar='EXT', help='output format, e.g. .json')
+    batch.add_argument('--jobs', type=int, default=None,
+                       help='worker processes (default: one per CPU core)')
+    batch.add_argument('--recursive', action='store_true',
+                       help='include subdirectories and mirror them in output_dir')
+    batch.add_argument('--cache-dir', default=None,
+                       help='reuse earlier results of identical conversions stored in this directory')
+    batch.add_argument('--cache-size', type=float, default=DEFAULT_MAX_BYTES / 1e6, metavar='MB',
+                       help='size budget of the cache directory (default: %(default).0f MB)')
+    batch.add_argument('--report', default=None, metavar='FILE',
+                       help='write the metrics of every conversion to FILE as JSON Lines')
+    batch.add_argument('--profile', action='store_true', help=PROFILE_HELP)
+    batch.add_argument('--compress-level', type=int, default=None, metavar='N', help=COMPRESS_LEVEL_HELP)
+
+    watch = commands.add_parser('watch', help='convert files as they appear or change in a directory')
+    watch.add_argument('input_dir', help='directory to watch')
+    watch.add_argument('output_dir', help='directory for the converted files (created if missing)')
+    watch.add_argument('--to', required=True, metavar='EXT', help='output format, e.g. .json')
+    watch.add_argument('--jobs', type=int, default=None,
+                       help='worker processes (default: one per CPU core)')
+    watch.add_argument('--recursive', action='store_true',
+                       help='include subdirectories and mirror them in output_dir')
+    watch.add_argument('--debounce', type=float, default=DEFAULT_DEBOUNCE, metavar='SECONDS',
+                       help='convert a file once it has not changed for this long (default: %(default)s)')
+    watch.add_argument('--poll-interval', type=float, default=DEFAULT_POLL_INTERVAL, metavar='SECONDS',
+                       help='seconds between scans when inotify is not available (default: %(default)s)')
+    watch.add_argument('--polling', action='store_true', help='scan the directory instead of using inotify')
+    watch.add_argument('--manifest', default=None, metavar='FILE',
+                       help=f'record of converted files (default: output_dir/{MANIFEST_NAME})')
+    watch.add_argument('--once', action='store_true',
+                       help='convert new and changed files, then exit instead of watching')
+    watch.add_argument('--cache-dir', default=None,
+                       help='reuse earlier results of identical conversions stored in this directory')
+    watch.add_argument('--cache-size', type=float, default=DEFAULT_MAX_BYTES / 1e6, metavar='MB',
+                       help='size budget of the cache directory (default: %(default).0f MB)')
+    watch.add_argument('--profile', action='store_true', help=PROFILE_HELP)
+    watch.add_argument('--compress-level', type=int, default=None, metavar='N', help=COMPRESS_LEVEL_HELP)
+
+    serve = commands.add_parser('serve', help='run a local HTTP conversion service')
+    serve.add_argument('--host', default=DEFAULT_HOST, help='address to listen on (default: %(default)s)')
+    serve.add_argument('--port', type=int, default=DEFAULT_PORT, help='port to listen on (default: %(default)s)')
+    serve.add_argument('--workers', type=int, default=None,
+                       help='worker processes (default: one per CPU core)')
+    serve.add_argument('--queue-size', type=int, default=DEFAULT_QUEUE_SIZE,
+                       help='jobs accepted beyond the running ones before uploads get 429 (default: %(default)s)')
+    serve.add_argument('--max-upload', type=float, default=DEFAULT_MAX_UPLOAD_BYTES / 1e6, metavar='MB',
+                       help='largest accepted upload (default: %(default).0f MB)')
+    serve.add_argument('--work-dir', default=None,
+                       help='where uploads and results are kept (default: a temporary directory)')
+    serve.add_argument('--cache-dir', default=None,
+                       help='reuse earlier results of identical conversions stored in this directory')
+    serve.add_argument('--cache-size', type=float, default=DEFAULT_MAX_BYTES / 1e6, metavar='MB',
+                       help='size budget of the cache directory (default: %(default).0f MB)')
+    serve.add_argument('--verbose', action='store_true', help='log every request')
+
+    return parser
+
+
+"""
+Run the command line interface and return the process exit status.
+"""
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.command == 'convert':
+        return convert_file(args)
+
+    if args.command == 'batch':
+        try:
+            summary = run_batch(args.input_dir, args.output_dir, args.to, jobs=args.jobs, recursive=args.recursive,
+                                cache_dir=args.cache_dir, cache_max_bytes=int(args.cache_size * 1e6),
+                                report_path=args.report, profile=args.profile,
+                                compresslevel=args.compress_level)
+        except NotADirectoryError as e:
+            print(f"Error: {str(e)}")
+            return 2
+        print_summary(summary)
+        return 1 if summary.failed else 0
+
+    if args.command == 'watch':
+        try:
+            summary = watch_folder(args.input_dir, args.output_dir, args.to, jobs=args.jobs,
+                                   recursive=args.recursive, debounce=args.debounce,
+                                   poll_interval=args.poll_interval, polling=args.polling,
+                                   cache_dir=args.cache_dir, cache_max_bytes=int(args.cache_size * 1e6),
+                                   manifest_path=args.manifest, profile=args.profile, once=args.once,
+                                   compresslevel=args.compress_level)
+        except NotADirectoryError as e:
+            print(f"Error: {str(e)}")
+            return 2
+        except KeyboardInterrupt:
+            return 0
+        print_summary(summary)
+        return 1 if summary.failed else 0
+
+    if args.command == 'serve':
+        serve(args.host, args.port, verbose=args.verbose, workers=args.workers, queue_size=args.queue_size,
+              work_dir=args.work_dir, cache_dir=args.cache_dir, cache_max_bytes=int(args.cache_size * 1e6),
+              max_upload_bytes=int(args.max_upload * 1e6))
+        return 0
+
+    return 2
+
+
+"""
+Run the convert subcommand. With '-' as input the converter is picked by --from and
+reads stdin; with '-' as output the result goes to stdout in the --to format, and
+all progress messages go to stderr instead.
+"""
+def convert_file(args):
+    if args.input == STDIO:
+        if not args.from_format:
+            print("Error: --from is required when reading from stdin")
+            return 2
+        converter_class = get_converter_class('.' + args.from_format.lstrip('.'))
+        source = sys.stdin.buffer
+    else:
+        if not os.path.isfile(args.input):
+            print(f"Error: Input file '{args.input}' does not exist")
+            return 2
+        converter_class = get_converter_class(args.input)
+        source = args.input
+    if converter_class is None:
+        print(f"Error: No converter for '{args.input if args.input != STDIO else args.from_format}'")
+        return 2
+
+    target = args.output
+    messages = sys.stdout
+    if args.output == STDIO:
+        if not args.to:
+            print("Error: --to is required when writing to stdout")
+            return 2
+        target = sys.stdout.buffer
+        messages = sys.stderr
+
+    with redirect_stdout(messages):
+        converter = converter_class(source, compresslevel=args.compress_level, profile=args.profile)
+        result = converter.convert(target, output_format=args.to)
+        print(result.format())
+    return 0 if result else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
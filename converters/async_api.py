@@ -0,0 +1,372 @@
+# Async API module - run conversions from asyncio code
+# AsyncConverter runs every conversion in a worker pool so the event loop never blocks:
+# converters that release the GIL (pandas, file I/O) run in threads, GIL-bound ones
+# (PDF) in processes, as declared by ConverterSpec.executor. Each input format has its
+# own concurrency limit, so a queue of slow PDF jobs never holds up quick CSV jobs.
+# Conversions can be cancelled and given a timeout; a cancelled conversion stops at its
+# next chunk or page, or has its worker process terminated, and frees its slot at once
+
+# Import asyncio to await the worker pools
+import asyncio
+
+# Import multiprocessing to pick how the worker processes are started
+import multiprocessing
+
+# Import os module to size the default limits by CPU count
+import os
+
+# Import threading module to guard the idle worker processes
+import threading
+
+# Import the thread pool that runs conversions or waits for worker processes
+from concurrent.futures import ThreadPoolExecutor
+
+# Import cancellation
+from .progress import CancellationToken, remove_partial_outputs, snapshot_outputs
+
+# Import the registry to find the converter and executor of an input format
+from .registry import CONVERTERS, get_converter_class, get_spec
+
+# Import the result type that conversions return
+from .result import ConversionResult
+
+# Import the stream helpers; streams cannot be sent to another process
+from .streams import describe, is_stream
+
+"""
+Default number of conversions of one input format that may run at the same time.
+"""
+DEFAULT_LIMIT = os.cpu_count() or 1
+
+"""
+Executor names accepted by ConverterSpec.executor and AsyncConverter.convert().
+"""
+EXECUTORS = ['thread', 'process']
+
+"""
+Seconds between two checks of the cancellation token while a worker process converts.
+"""
+CANCEL_POLL_INTERVAL = 0.05
+
+
+"""
+Runs conversions for asyncio code.
+limits maps a converter name ('PDF') or input extension ('.pdf') to the number of
+conversions of that format allowed to run at once; formats not listed get default_limit.
+A slot is held until the worker has really finished; a conversion that timed out or
+was cancelled is stopped at its next chunk or page (threads) or terminated at once
+(processes), so it gives its slot back quickly.
+Use it as an async context manager (or call close()) to shut the worker pools down.
+One AsyncConverter belongs to the event loop it is first used in.
+"""
+class AsyncConverter:
+
+    def __init__(self, limits=None, default_limit=DEFAULT_LIMIT):
+        self.limits = dict(limits or {})
+        self.default_limit = default_limit
+        self._semaphores = {}
+        self._pools = {}
+        self._processes = WorkerProcessPool()
+
+    """
+    Return the concurrency limit of a converter spec.
+    """
+    def get_limit(self, spec):
+        for key in [spec.name] + spec.input_formats:
+            if key in self.limits:
+                return self.limits[key]
+        return self.default_limit
+
+    """
+    Convert input_path to output_path in a worker and return its ConversionResult.
+    options are passed to the converter's constructor. executor ('thread' or
+    'process') overrides the converter's default; stream inputs and outputs always
+    run in a thread. input_format (e.g. '.csv') picks the converter for a stream input,
+    output_format the format of a stream output.
+    on_progress is called with a ConversionProgress from a worker thread (not the event
+    loop's), and cancelling cancel_token stops the conversion like cancelling the task.
+    Raises asyncio.TimeoutError after timeout seconds. On a timeout or when the
+    awaiting task is cancelled, a conversion that has not started yet is dropped and
+    one that is already running is cancelled, and its partial output deleted.
+    """
+    async def convert(self, input_path, output_path, timeout=None, executor=None,
+                      input_format=None, output_format=None, on_progress=None, cancel_token=None, **options):
+        spec = get_spec(input_format or describe(input_path, ''))
+        if spec is None:
+            return _failed_result(input_path, output_path, f"No converter for '{describe(input_path, '<stdin>')}'")
+
+        executor = executor or spec.executor
+        if executor not in EXECUTORS:
+            raise ValueError(f"Unknown executor '{executor}'. Use one of: {', '.join(EXECUTORS)}")
+        if is_stream(input_path) or is_stream(output_path):
+            executor = 'thread'
+
+        loop = asyncio.get_running_loop()
+        semaphore = self._get_semaphore(spec)
+        await semaphore.acquire()
+        token = cancel_token or CancellationToken()
+        # Process jobs run in a worker process that a pool thread waits for
+        function = self._processes.run if executor == 'process' else convert_in_worker
+        try:
+            future = self._get_pool(executor).submit(function, input_path, output_path, input_format, output_format,
+                                                     options, on_progress=on_progress, cancel_token=token)
+        except BaseException:
+            semaphore.release()
+            raise
+        # Free the slot when the worker is done, not when the caller stops waiting
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(semaphore.release))
+
+        # Cancelling the awaited future also cancels the pool's future if it has not started
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            # A conversion that has already started is stopped through its token
+            token.cancel()
+            raise
+
+    """
+    Convert several files concurrently and return their ConversionResults in order.
+    jobs holds (input_path, output_path) pairs or dicts of convert() arguments.
+    A conversion that times out becomes a failed result instead of an exception;
+    cancelling the batch cancels every conversion in it.
+    """
+    async def convert_batch(self, jobs, timeout=None, **options):
+        async def run(job):
+            arguments = dict(options, **job) if isinstance(job, dict) else dict(options, input_path=job[0],
+                                                                                 output_path=job[1])
+            try:
+                return await self.convert(timeout=timeout, **arguments)
+            except asyncio.TimeoutError:
+                return _failed_result(arguments['input_path'], arguments['output_path'],
+                                      f"Timed out after {timeout} s")
+
+        return await asyncio.gather(*(run(job) for job in jobs))
+
+    """
+    Shut the worker pools down. wait=False returns at once and lets running conversions finish.
+    """
+    def close(self, wait=True):
+        for pool in self._pools.values():
+            pool.shutdown(wait=wait, cancel_futures=True)
+        self._pools = {}
+        self._processes.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        # Waiting for the pools blocks, so it happens in a thread
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+        return False
+
+    def _get_semaphore(self, spec):
+        if spec.name not in self._semaphores:
+            self._semaphores[spec.name] = asyncio.Semaphore(self.get_limit(spec))
+        return self._semaphores[spec.name]
+
+    """
+    Create the pool for an executor on first use. It has a worker for every slot of
+    every format that uses it, so a format within its limit never waits for a worker.
+    Both pools are thread pools; the threads of the 'process' pool each wait for a
+    conversion in a WorkerProcess.
+    """
+    def _get_pool(self, executor):
+        if executor not in self._pools:
+            workers = sum(self.get_limit(spec) for spec in CONVERTERS if spec.executor == executor)
+            # Formats moved to this executor by convert(executor=...) or by a stream still need a worker
+            workers = max(workers, self.default_limit)
+            self._pools[executor] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=executor)
+        return self._pools[executor]
+
+
+"""
+Return the multiprocessing context for worker pools created next to running threads.
+Forking while other threads run conversions can copy a held lock (e.g. the import
+lock) into the child and deadlock it, so workers come from a fork server or are spawned.
+"""
+def get_mp_context():
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return multiprocessing.get_context(method)
+
+
+# Shared AsyncConverter used by the module-level functions
+_default_converter = None
+
+
+"""
+Convert one file with a shared AsyncConverter (default limits). See AsyncConverter.convert().
+"""
+async def convert_async(input_path, output_path, timeout=None, **options):
+    return await get_default_converter().convert(input_path, output_path, timeout=timeout, **options)
+
+
+"""
+Convert several files with a shared AsyncConverter (default limits). See AsyncConverter.convert_batch().
+"""
+async def convert_batch_async(jobs, timeout=None, **options):
+    return await get_default_converter().convert_batch(jobs, timeout=timeout, **options)
+
+
+"""
+Return the shared AsyncConverter, creating it on first use.
+"""
+def get_default_converter():
+    global _default_converter
+    if _default_converter is None:
+        _default_converter = AsyncConverter()
+    return _default_converter
+
+
+"""
+Worker function: create the converter and run the conversion. input_format (e.g. '.csv')
+picks the converter instead of the input's extension; options go to its constructor.
+Converters run single-process here unless options set jobs, as the caller's pool
+already runs several conversions at once. on_progress and cancel_token are passed to convert().
+"""
+def convert_in_worker(input_path, output_path, input_format, output_format, options,
+                      on_progress=None, cancel_token=None):
+    converter_class = get_converter_class(input_format or describe(input_path, ''))
+    converter = converter_class(input_path, **options)
+    if 'jobs' not in options and hasattr(converter, 'jobs'):
+        converter.jobs = 1
+    return converter.convert(output_path, output_format=output_format, on_progress=on_progress,
+                             cancel_token=cancel_token)
+
+
+"""
+A process that runs conversions one at a time for the thread that calls run().
+Unlike a ProcessPoolExecutor worker it can be stopped in the middle of a conversion:
+a cancelled conversion has its process terminated, which frees its CPU at once.
+The process is daemonic, so it never outlives the program but cannot start processes
+of its own: converters run single-process in it whatever their jobs option says.
+"""
+class WorkerProcess:
+
+    def __init__(self, context=None):
+        context = context or get_mp_context()
+        self._connection, child_connection = context.Pipe()
+        self._process = context.Process(target=_worker_process_main, args=(child_connection,), daemon=True)
+        self._process.start()
+        child_connection.close()
+
+    @property
+    def alive(self):
+        return self._process.is_alive()
+
+    """
+    Run convert_in_worker() with these arguments in the process and return its
+    ConversionResult. Progress reports are passed to on_progress as they arrive. If
+    cancel_token is cancelled, the process is terminated, the partial output deleted
+    and a result with status 'cancelled' returned; the process cannot be used again.
+    """
+    def run(self, input_path, output_path, input_format, output_format, options,
+            on_progress=None, cancel_token=None):
+        outputs_before = snapshot_outputs([output_path])
+        self._connection.send((input_path, output_path, input_format, output_format, options))
+        while True:
+            if cancel_token is not None and cancel_token.cancelled:
+                self.terminate()
+                remove_partial_outputs([output_path], outputs_before)
+                return _failed_result(input_path, output_path, 'Conversion cancelled', status='cancelled')
+            if not self._connection.poll(CANCEL_POLL_INTERVAL):
+                if not self._process.is_alive():
+                    return _failed_result(input_path, output_path,
+                                          f"Worker process exited with code {self._process.exitcode}")
+                continue
+            try:
+                kind, payload = self._connection.recv()
+            except (EOFError, OSError):
+                self._process.join()
+                return _failed_result(input_path, output_path,
+                                      f"Worker process exited with code {self._process.exitcode}")
+            if kind == 'result':
+                return payload
+            if on_progress is not None:
+                on_progress(payload)
+
+    """
+    Stop the process, even in the middle of a conversion.
+    """
+    def terminate(self):
+        self._process.terminate()
+        self._process.join()
+        self._connection.close()
+
+    """
+    Let the process exit after its current conversion.
+    """
+    def close(self):
+        try:
+            self._connection.send(None)
+        except OSError:
+            pass
+        self._connection.close()
+
+
+"""
+Idle WorkerProcesses that are reused by later conversions. There is no limit on the
+number of processes: callers already bound how many conversions run at once.
+"""
+class WorkerProcessPool:
+
+    def __init__(self, context=None):
+        self.context = context
+        self._idle = []
+        self._closed = False
+        self._lock = threading.Lock()
+
+    """
+    Run a conversion in an idle (or new) WorkerProcess; see WorkerProcess.run().
+    """
+    def run(self, *arguments, **keywords):
+        with self._lock:
+            worker = self._idle.pop() if self._idle else None
+        worker = worker or WorkerProcess(self.context)
+        try:
+            return worker.run(*arguments, **keywords)
+        finally:
+            with self._lock:
+                if worker.alive and not self._closed:
+                    self._idle.append(worker)
+                    worker = None
+            if worker is not None and worker.alive:
+                worker.close()
+
+    """
+    Let the idle processes exit. Processes still converting exit when they are done.
+    """
+    def close(self):
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.close()
+
+
+"""
+Main function of a WorkerProcess: run the conversions sent by the parent and send
+back ('progress', ConversionProgress) reports and a final ('result', ConversionResult).
+"""
+def _worker_process_main(connection):
+    while True:
+        try:
+            arguments = connection.recv()
+        except EOFError:
+            return
+        if arguments is None:
+            return
+        input_path, output_path, input_format, output_format, options = arguments
+        options = {name: value for name, value in options.items() if name != 'jobs'}
+        try:
+            result = convert_in_worker(input_path, output_path, input_format, output_format, options,
+                                       on_progress=lambda progress: connection.send(('progress', progress)))
+        except Exception as e:
+            result = _failed_result(input_path, output_path, str(e))
+        connection.send(('result', result))
+
+
+def _failed_result(input_path, output_path, error, status='failed'):
+    result = ConversionResult('', describe(input_path, '<stdin>'), [describe(output_path, '<stdout>')])
+    result.status = status
+    result.error = error
+    return result
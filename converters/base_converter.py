@@ -1,9 +1,56 @@
 # This is the base converter module that defines the abstract class for all file converters
 # All specific converters (CSV, PDF, DOCX, etc.) will inherit from this class
 
+# Import io module to give zipfile a seekable copy of a compressed input
+import io
+
+# Import os module for file operations and path handling
+import os
+
+# Import time module to measure the wall time of a conversion
+import time
+
 # Import the ABC (Abstract Base Class) module to create abstract classes
 from abc import ABC, abstractmethod
 
+# Import the structured result that convert() returns
+from .result import ConversionResult, get_observers, start_peak_memory, stop_peak_memory, total_file_size
+
+# Import the helpers for inputs and outputs that are streams instead of files
+from .streams import InputStream, describe, get_compression, get_extension, is_stream
+
+# Import the helpers that read compressed inputs as they are decompressed
+from .compression import MAGIC_SIZE, CompressedSample, detect_compression, open_decompressed
+
+# Import read_sample to look at the magic bytes at the head of the input
+from .sniffer import read_sample
+
+# Import progress reporting and cancellation
+from .progress import (PROGRESS_INTERVAL, ByteCounter, ConversionCancelled, ConversionProgress,
+                       remove_partial_outputs, snapshot_outputs)
+
+"""
+Converter options that only change how a conversion runs, not its output.
+"""
+EXECUTION_OPTIONS = ('jobs', 'chunksize', 'profile')
+
+"""
+Number of rows (CSV, TXT) or paragraphs (DOCX) shown by preview().
+"""
+PREVIEW_ROWS = 50
+
+"""
+Number of pages shown by preview() of a PDF.
+"""
+PREVIEW_PAGES = 2
+
+"""
+Converter attributes that are state rather than options.
+"""
+STATE_ATTRIBUTES = ('input_path', 'output_path', 'cache', 'result', 'observers', 'input_stream', 'output_format',
+                    'progress', 'on_progress', 'cancel_token')
+
+
 """
 Abstract base class for all file converters.
 This class defines the interface that all converter subclasses must implement.
@@ -12,18 +59,179 @@ class BaseConverter(ABC):
 
     """
     Initializes the converter with an input file path.
+    input_path can also be a binary file-like object or '-' for stdin (see streams.py).
+    A compressed input (gzip, bz2, xz or zstd, see compression.py) is decompressed as
+    it is read. compresslevel is the level of compressed outputs such as data.json.gz,
+    None for the compression's default.
+    profile=True runs every conversion under cProfile and tracemalloc and writes
+    <output>.prof and <output>.profile.txt next to the output file.
     """
-    def __init__(self, input_path):
+    def __init__(self, input_path, compresslevel=None, profile=False):
         self.input_path = input_path
         self.output_path = None
+        self.compresslevel = compresslevel
+        self.profile = profile
+        # Input given as a stream instead of a file path, None for files
+        self.input_stream = InputStream(input_path) if is_stream(input_path) else None
+        # Output format of a stream output that has no file name to take the extension from
+        self.output_format = None
+        # Metrics of the current (or last) conversion; converters record stages, rows and pages here
+        self.result = ConversionResult(type(self).__name__, self.input_name, [])
+        # ConversionObserver objects for this converter only (see result.add_observer for all converters)
+        self.observers = []
+        # Progress of the current conversion, the callback it is reported to, and its CancellationToken
+        self.progress = ConversionProgress()
+        self.on_progress = None
+        self.cancel_token = None
+        self._input_counter = None
+        self._open_inputs = []
+        self._last_progress = 0.0
+        # Compression of the input, read from its magic bytes on first use ('' if none)
+        self._input_compression = None
 
+    # Optional ConversionCache (see cache.py); when set, repeated conversions of the
+    # same input with the same options are served from the cache
+    cache = None
+
+    """
+    Convert the file to output_path.
+    output_path can also be a binary file-like object or '-' for stdout; output_format
+    (e.g. '.json') then gives the format if the stream has no file name to tell it.
+    on_progress is called with a ConversionProgress as the conversion goes on, and
+    cancelling cancel_token (a CancellationToken) stops it at the next chunk or page
+    and deletes the partial output.
+    Returns a ConversionResult, which is truthy if the conversion was successful.
+    """
+    def convert(self, output_path, output_format=None, on_progress=None, cancel_token=None):
+        self.output_format = output_format
+        self.on_progress = on_progress
+        self.cancel_token = cancel_token
+        return self.run_conversion([output_path], lambda: self._convert_with_cache(output_path))
+
+    """
+    Printable name of the input: its path, or the name of the input stream.
+    """
+    @property
+    def input_name(self):
+        return self.input_stream.name if self.input_stream is not None else describe(self.input_path)
+
+    """
+    Compression of the input ('gzip', 'bz2', 'xz' or 'zstd') as told by its magic
+    bytes, or None if the input is not compressed (or does not exist).
+    """
+    @property
+    def input_compression(self):
+        if self._input_compression is None:
+            if not self.validate_input():
+                return None
+            self._input_compression = detect_compression(read_sample(self.input_stream or self.input_path,
+                                                                     MAGIC_SIZE)) or ''
+        return self._input_compression or None
+
+    """
+    Return what readers should be given for the input: the file path, or a binary
+    file object that reads the input stream from its start. During a conversion, and
+    for compressed inputs, it is a file object, which counts the bytes read for the
+    progress reports, decompresses the input, and is closed by close_inputs() when
+    the conversion ends.
+    """
+    def input_source(self):
+        if self._input_counter is None and self.input_compression is None:
+            return self.input_stream.reader() if self.input_stream is not None else self.input_path
+        source = self.open_input()
+        self._open_inputs.append(source)
+        return source
+
+    """
+    Open the input as a binary file object, whether it is a file or a stream.
+    A compressed input is decompressed as it is read.
+    """
+    def open_input(self):
+        # Sampling the magic bytes comes first, as a stream that cannot seek is only read once
+        compression = self.input_compression
+        source = self.input_stream.reader() if self.input_stream is not None else open(self.input_path, 'rb')
+        if self._input_counter is not None:
+            # Compressed bytes are counted, as they are what the total size measures
+            source = self._input_counter.wrap(source)
+        if compression is not None:
+            source = open_decompressed(source, compression)
+        return source
+
+    """
+    Close the file objects handed out by input_source().
+    """
+    def close_inputs(self):
+        for source in self._open_inputs:
+            source.close()
+        self._open_inputs = []
+
+    """
+    Return what sniffers should sample the head of the input from (see
+    sniffer.read_sample): the file path or input stream, or a CompressedSample that
+    decompresses their head.
     """
-    Abstract method to convert the file.
+    def sample_source(self):
+        source = self.input_stream or self.input_path
+        if self.input_compression is not None:
+            return CompressedSample(source, self.input_compression)
+        return source
+
+    """
+    Return the input for readers that need to seek, such as zipfile: the file path,
+    the stream (read into memory if it cannot seek), or the decompressed input in memory.
+    """
+    def seekable_input(self):
+        if self.input_compression is not None:
+            with self.open_input() as f:
+                return io.BytesIO(f.read())
+        return self.input_stream.seekable_file() if self.input_stream is not None else self.input_path
+
+    """
+    Record how far the conversion has got and check for cancellation; converters call
+    this between chunks, pages or batches of lines. Counters left as None keep their
+    value, except bytes_done, which defaults to the bytes read through input_source()
+    and open_input(). The on_progress callback is called at most every PROGRESS_INTERVAL
+    seconds. Raises ConversionCancelled if the conversion's token was cancelled.
+    """
+    def report_progress(self, rows=None, bytes_done=None, pages=None, total_pages=None, total_bytes=None):
+        progress = self.progress
+        if rows is not None:
+            progress.rows = rows
+        if pages is not None:
+            progress.pages = pages
+        if total_pages is not None:
+            progress.total_pages = total_pages
+        if total_bytes is not None:
+            progress.total_bytes = total_bytes
+        if bytes_done is not None:
+            progress.bytes_done = bytes_done
+        elif self._input_counter is not None:
+            progress.bytes_done = self._input_counter.count
+
+        if self.on_progress is not None and time.monotonic() - self._last_progress >= PROGRESS_INTERVAL:
+            self._call_progress()
+        if self.cancel_token is not None:
+            self.cancel_token.raise_if_cancelled()
+
+    """
+    Return the extension that selects the format written to output_path, e.g. '.json'.
+    """
+    def get_output_extension(self, output_path):
+        return get_extension(output_path, self.output_format)
+
+    """
+    Return the compression of output_path (e.g. 'gzip' for data.json.gz), or None.
+    """
+    def get_output_compression(self, output_path):
+        return get_compression(output_path, self.output_format)
+
+    """
+    Abstract method that does the actual conversion for convert().
     Every converter class must implement this method.
     True if conversion was successful, otherwise False
     """
     @abstractmethod
-    def convert(self, output_path):
+    def _convert(self, output_path):
         pass
 
     """
@@ -35,10 +243,143 @@ class BaseConverter(ABC):
     def get_supported_formats(self):
         pass
 
+    """
+    Return the first limit rows, paragraphs or pages of the input as text, to check
+    that the right input format was chosen without running a conversion. Only the
+    head of the input is read, so previewing a huge file is as quick as a small one.
+    Converters that can be previewed override this method.
+    """
+    def preview(self, limit=None):
+        raise NotImplementedError(f"{type(self).__name__} cannot preview its input")
+
     """
     Validate that the input file exists.
     This method can be called by subclasses to check if input file is valid.
     """
     def validate_input(self):
-        import os
-        return os.path.isfile(self.input_path)
+        return self.input_stream is not None or os.path.isfile(self.input_path)
+
+    """
+    Print an error message and record it as the error of the current conversion.
+    """
+    def report_error(self, message):
+        print(message)
+        if self.result.error is None:
+            # The result is shown with its own "Error:" label
+            self.result.error = message[len('Error: '):] if message.startswith('Error: ') else message
+
+    """
+    Return the options that change what this converter writes, e.g. {'mode': 'fast'}.
+    Used in cache keys. Options in EXECUTION_OPTIONS only change how the work is done
+    (number of processes, chunk size), not the result, so they are left out.
+    """
+    def get_options(self):
+        return {name: value for name, value in sorted(vars(self).items())
+                if not name.startswith('_') and name not in STATE_ATTRIBUTES
+                and name not in EXECUTION_OPTIONS}
+
+    """
+    Run function (which returns True or False) as a conversion to output_paths and
+    return its ConversionResult: status, wall time, bytes in/out and peak memory are
+    filled in here, and the observers are notified before and after.
+    """
+    def run_conversion(self, output_paths, function):
+        result = ConversionResult(type(self).__name__, self.input_name,
+                                  [describe(path, '<stdout>') for path in output_paths])
+        self.result = result
+        observers = get_observers() + self.observers
+        _notify(observers, 'on_start', result)
+
+        if self.input_stream is None and self.validate_input():
+            result.bytes_in = os.path.getsize(self.input_path)
+        self.progress = ConversionProgress(total_bytes=result.bytes_in or None)
+        self._input_counter = ByteCounter(result.bytes_in or None)
+        self._last_progress = 0.0
+        # The profile report is written next to the output, so stream outputs are not profiled
+        if self.profile and output_paths and not is_stream(output_paths[0]):
+            # Imported here so cProfile and tracemalloc are only loaded when profiling
+            from .profiling import Profiler
+            result.profiler = Profiler(output_paths[0])
+            result.profiler.start()
+        # Outputs are only deleted after a failure or cancel if this run wrote them
+        outputs_before = snapshot_outputs(output_paths)
+        peak_token = start_peak_memory()
+        start = time.perf_counter()
+        cancelled = False
+        try:
+            if self.cancel_token is not None:
+                self.cancel_token.raise_if_cancelled()
+            ok = function()
+        except ConversionCancelled:
+            cancelled = True
+            ok = False
+        except Exception as e:
+            # Converters report their own errors; this only catches what slips through
+            self.report_error(f"Error during conversion: {str(e)}")
+            ok = False
+        finally:
+            if result.profiler is not None:
+                result.profiler.stop()
+            self.close_inputs()
+            self._input_counter = None
+            result.peak_memory = stop_peak_memory(peak_token)
+        result.wall_seconds = time.perf_counter() - start
+        result.status = 'success' if ok else 'failed'
+        if not ok:
+            # A failed conversion must not leave a truncated file that looks like a result
+            remove_partial_outputs(output_paths, outputs_before)
+        if cancelled:
+            result.status = 'cancelled'
+            result.error = 'Conversion cancelled'
+            print(f"Conversion cancelled: {self.input_name}")
+        elif self.on_progress is not None:
+            # The last report of a finished conversion is never throttled away
+            self._call_progress()
+        if ok:
+            result.bytes_out = total_file_size([path for path in output_paths if not is_stream(path)])
+        if result.profiler is not None:
+            self._write_profile(result)
+
+        _notify(observers, 'on_finish', result)
+        return result
+
+    def _call_progress(self):
+        self._last_progress = time.monotonic()
+        try:
+            self.on_progress(self.progress)
+        except Exception as e:
+            print(f"Warning: progress callback failed: {str(e)}")
+
+    """
+    Write the profiler's report next to the output and detach the profiler from the result.
+    """
+    def _write_profile(self, result):
+        profiler = result.profiler
+        # The profiler cannot be pickled, so a result sent between processes must not hold it
+        result.profiler = None
+        if os.path.isdir(os.path.dirname(os.path.abspath(profiler.output_path))):
+            result.profile_paths = profiler.write_report(result)
+            print(f"Profile written to: {', '.join(result.profile_paths)}")
+
+    """
+    Run _convert(), through the conversion cache if one is set.
+    Streams are not cached: the cache key is a hash of the input file.
+    """
+    def _convert_with_cache(self, output_path):
+        if self.cache is None or self.input_stream is not None or is_stream(output_path):
+            return self._convert(output_path)
+        hits = self.cache.hits
+        ok = self.cache.convert(self, output_path)
+        self.result.cached = self.cache.hits > hits
+        return ok
+
+
+"""
+Call method_name on every observer. A failing observer must not fail the conversion.
+"""
+def _notify(observers, method_name, result):
+    for observer in observers:
+        try:
+            getattr(observer, method_name)(result)
+        except Exception as e:
+            print(f"Warning: {type(observer).__name__}.{method_name} failed: {str(e)}")
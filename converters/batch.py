@@ -0,0 +1,280 @@
+# Batch module - converts every file in a directory with a pool of worker processes
+# Each input file is matched to its converter by extension (see registry.py) and the
+# files are scheduled largest first, so one big file started last cannot leave all
+# other workers idle at the end of the run
+
+# Import contextlib and io to capture the progress messages printed by each converter
+import contextlib
+import io
+
+# Import json module to write the per-file report
+import json
+
+# Import os module for file operations and path handling
+import os
+
+# Import time module to measure conversion times
+import time
+
+# Import the process pool that runs the conversions, and the error of a pool whose worker died
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+# Import the registry that maps input extensions to converters
+from .registry import get_spec, create_converter
+
+# Import the conversion cache shared by the workers
+from .cache import ConversionCache, DEFAULT_MAX_BYTES
+
+# Import split_extension to name the output of report.csv.gz report.json
+from .compression import split_extension
+
+
+"""
+Outcome of converting one file in a batch.
+"""
+class BatchItem:
+
+    def __init__(self, input_path, output_path, input_bytes, ok, seconds, log='', cache_hit=None, result=None):
+        self.input_path = input_path
+        self.output_path = output_path
+        self.input_bytes = input_bytes
+        self.ok = ok
+        self.seconds = seconds
+        self.log = log
+        # True or False when a conversion cache was used, otherwise None
+        self.cache_hit = cache_hit
+        # The converter's ConversionResult (None if the converter could not be created)
+        self.result = result
+
+
+"""
+Totals for a whole batch run, as printed by print_summary().
+"""
+class BatchSummary:
+
+    def __init__(self, items, skipped, wall_seconds, jobs):
+        self.items = items
+        self.skipped = skipped
+        self.wall_seconds = wall_seconds
+        self.jobs = jobs
+
+    @property
+    def succeeded(self):
+        return [item for item in self.items if item.ok]
+
+    @property
+    def failed(self):
+        return [item for item in self.items if not item.ok]
+
+    @property
+    def cache_hits(self):
+        return sum(1 for item in self.items if item.cache_hit)
+
+    @property
+    def cache_misses(self):
+        return sum(1 for item in self.items if item.cache_hit is False)
+
+    @property
+    def total_bytes(self):
+        return sum(item.input_bytes for item in self.succeeded)
+
+    """
+    Total seconds spent in each conversion stage, summed over all files.
+    """
+    @property
+    def stage_seconds(self):
+        totals = {}
+        for item in self.items:
+            if item.result is not None:
+                for stage, seconds in item.result.stages.items():
+                    totals[stage] = totals.get(stage, 0.0) + seconds
+        return totals
+
+
+"""
+Find the files under input_dir that have a converter able to write target_format.
+Returns (tasks, skipped): tasks is a list of (input_path, output_path, size) sorted
+largest file first, and skipped lists the files that cannot be converted to target_format.
+With recursive=True subdirectories are included and mirrored under output_dir.
+"""
+def plan_batch(input_dir, output_dir, target_format, recursive=False):
+    target_format = normalize_format(target_format)
+
+    if recursive:
+        paths = [os.path.join(root, name) for root, _, names in os.walk(input_dir) for name in names]
+    else:
+        paths = [os.path.join(input_dir, name) for name in os.listdir(input_dir)]
+
+    tasks = []
+    skipped = []
+    used_outputs = set()
+    for input_path in sorted(paths):
+        if not os.path.isfile(input_path):
+            continue
+        spec = get_spec(input_path)
+        if spec is None or not spec.can_write(target_format):
+            skipped.append(input_path)
+            continue
+
+        output_path = get_output_path(input_path, input_dir, output_dir, target_format, used_outputs)
+        used_outputs.add(output_path)
+        tasks.append((input_path, output_path, os.path.getsize(input_path)))
+
+    # Largest first: the longest conversions start while every worker is still free
+    tasks.sort(key=lambda task: task[2], reverse=True)
+    return tasks, skipped
+
+
+"""
+Return target_format as a lower-case extension with its dot, e.g. 'JSON' -> '.json'.
+A compression suffix is kept: 'json.gz' -> '.json.gz' writes gzip-compressed JSON.
+"""
+def normalize_format(target_format):
+    target_format = target_format.lower()
+    return target_format if target_format.startswith('.') else '.' + target_format
+
+
+"""
+Return the output path of input_path (a file under input_dir) in output_dir, mirroring
+its subdirectories. used_outputs holds the output paths already taken by other inputs.
+"""
+def get_output_path(input_path, input_dir, output_dir, target_format, used_outputs):
+    relative = os.path.relpath(input_path, input_dir)
+    # report.csv.gz becomes report.json, not report.csv.json
+    stem, extension = split_extension(relative)
+    output_path = os.path.join(output_dir, stem + target_format)
+    # report.csv and report.txt would both become report.json; keep both
+    if output_path in used_outputs or os.path.abspath(output_path) == os.path.abspath(input_path):
+        output_path = os.path.join(output_dir, f"{stem}_{extension.lstrip('.').replace('.', '_')}{target_format}")
+    return output_path
+
+
+"""
+Worker function: convert one file and return a BatchItem.
+The converter's progress messages are captured and returned instead of being
+printed, so the output of parallel conversions does not interleave.
+"""
+def _convert_task(task):
+    input_path, output_path, size, cache_options, profile, compresslevel = task
+    log = io.StringIO()
+    cache = ConversionCache(**cache_options) if cache_options is not None else None
+    result = None
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(log):
+            os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+            converter = create_converter(input_path, compresslevel=compresslevel, profile=profile)
+            # The batch pool already keeps every core busy, so converters run single-process
+            if hasattr(converter, 'jobs'):
+                converter.jobs = 1
+            converter.cache = cache
+            result = converter.convert(output_path)
+            ok = bool(result)
+    except Exception as e:
+        log.write(f"Error: {str(e)}\n")
+        ok = False
+    cache_hit = cache.hits > 0 if cache is not None else None
+    return BatchItem(input_path, output_path, size, ok, time.perf_counter() - start, log.getvalue(), cache_hit, result)
+
+
+"""
+Convert every supported file in input_dir to target_format in output_dir.
+jobs is the number of worker processes (None uses one per CPU core).
+cache_dir enables a ConversionCache in that directory, limited to cache_max_bytes.
+report_path, if given, receives one JSON line with the ConversionResult of every file.
+profile=True writes a profile report next to every output file (see profiling.py).
+compresslevel is the level of compressed outputs (target_format e.g. '.json.gz').
+Prints one line per finished file and returns a BatchSummary. A worker process that dies
+(killed for running out of memory, or crashed in a native parser) breaks the pool: its
+file and every file that had not finished yet are recorded as failed.
+"""
+def run_batch(input_dir, output_dir, target_format, jobs=None, recursive=False,
+              cache_dir=None, cache_max_bytes=DEFAULT_MAX_BYTES, report_path=None, profile=False,
+              compresslevel=None):
+    if not os.path.isdir(input_dir):
+        raise NotADirectoryError(f"Input directory '{input_dir}' does not exist")
+
+    tasks, skipped = plan_batch(input_dir, output_dir, target_format, recursive)
+    # Same rule as parallel.resolve_jobs(), which is not imported here because it loads pandas
+    if jobs is None or jobs <= 0:
+        jobs = os.cpu_count() or 1
+    jobs = min(jobs, max(len(tasks), 1))
+    os.makedirs(output_dir, exist_ok=True)
+
+    print(f"Converting {len(tasks)} file(s) to {target_format} with {jobs} worker process(es)...")
+    for input_path in skipped:
+        print(f"- skipped {input_path} (no converter to {target_format})")
+
+    items = []
+    start = time.perf_counter()
+    with contextlib.ExitStack() as stack:
+        report = stack.enter_context(open(report_path, 'w', encoding='utf-8')) if report_path else None
+        executor = stack.enter_context(ProcessPoolExecutor(max_workers=jobs))
+        # Every worker opens the shared cache directory itself
+        cache_options = {'directory': cache_dir, 'max_bytes': cache_max_bytes} if cache_dir else None
+        futures = {executor.submit(_convert_task, task + (cache_options, profile, compresslevel)): task
+                   for task in tasks}
+        for future in as_completed(futures):
+            try:
+                item = future.result()
+            except BrokenProcessPool as e:
+                input_path, output_path, size = futures[future]
+                item = BatchItem(input_path, output_path, size, False, 0.0,
+                                 f"Error: a worker process died before the conversion finished ({str(e)})\n")
+            items.append(item)
+            print_item(item)
+            if report is not None and item.result is not None:
+                report.write(json.dumps(item.result.to_dict()) + '\n')
+
+    return BatchSummary(items, skipped, time.perf_counter() - start, jobs)
+
+
+"""
+Print one finished file: its outcome and metrics, or the converter's messages if it failed.
+"""
+def print_item(item):
+    mark = '✓' if item.ok else '✗'
+    cached = ', cached' if item.cache_hit else ''
+    print(f"{mark} {item.input_path} -> {item.output_path} "
+          f"({item.input_bytes / 1e6:.1f} MB, {item.seconds:.2f} s{cached})")
+    if item.ok and item.result is not None:
+        print(f"    {_format_metrics(item.result)}")
+    if not item.ok:
+        for line in item.log.strip().splitlines():
+            print(f"    {line}")
+
+
+"""
+Print the totals of a batch run: successes, failures and throughput.
+"""
+def print_summary(summary):
+    succeeded = summary.succeeded
+    print()
+    print(f"Succeeded: {len(succeeded)}  Failed: {len(summary.failed)}  Skipped: {len(summary.skipped)}")
+    print(f"Wall time: {summary.wall_seconds:.2f} s with {summary.jobs} worker process(es)")
+    stage_seconds = summary.stage_seconds
+    if stage_seconds:
+        print('Stage totals: ' + ', '.join(f"{stage} {seconds:.2f} s" for stage, seconds in stage_seconds.items()))
+    if summary.cache_hits or summary.cache_misses:
+        print(f"Cache: {summary.cache_hits} hit(s), {summary.cache_misses} miss(es)")
+    if succeeded:
+        megabytes = summary.total_bytes / 1e6
+        print(f"Throughput: {megabytes:.1f} MB in total, "
+              f"{megabytes / max(summary.wall_seconds, 1e-9):.2f} MB/s, "
+              f"{len(succeeded) / max(summary.wall_seconds, 1e-9):.2f} files/s, "
+              f"{sum(item.seconds for item in succeeded) / len(succeeded):.2f} s per file on average")
+
+
+"""
+One-line summary of a result's stages, rows or pages and peak memory.
+"""
+def _format_metrics(result):
+    parts = [f"{stage} {seconds:.2f} s" for stage, seconds in result.stages.items()]
+    if result.rows is not None:
+        parts.append(f"{result.rows:,} rows")
+    if result.pages is not None:
+        parts.append(f"{result.pages:,} pages")
+    if result.peak_memory is not None:
+        parts.append(f"peak {result.peak_memory / 1e6:.0f} MB")
+    return ', '.join(parts)
@@ -0,0 +1,247 @@
+# Cache module - content-addressed cache of conversion results
+# A conversion is identified by the hash of the input file's bytes together with the
+# converter class, the output format and the converter options. The result of a
+# conversion is stored under that key, and converting the same content again is
+# served by copying (or hard-linking) the stored file instead of converting it again
+
+# Import hashlib module to hash the input bytes
+import hashlib
+
+# Import json module to serialise the converter options into the key
+import json
+
+# Import os module for file operations and path handling
+import os
+
+# Import shutil module to copy stored results
+import shutil
+
+# Import tempfile module to write cache entries atomically
+import tempfile
+
+# Import get_codec to name the compression suffix of cache entries
+from .compression import get_codec
+
+"""
+Default location and size budget of the cache.
+"""
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'file-converter')
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+
+"""
+Part of every key; bump it when converters change their output so old entries stop matching.
+"""
+CACHE_VERSION = 1
+
+"""
+Size of the blocks read while hashing the input file.
+"""
+HASH_BLOCK_SIZE = 1024 * 1024
+
+"""
+Share of max_bytes a cache object may store before it walks the cache directory again.
+Other processes sharing the cache store entries too, so the running size total kept
+between walks is an estimate that is brought up to date this often.
+"""
+RESCAN_FRACTION = 0.1
+
+
+"""
+Content-addressed store of converted files with a byte budget and LRU eviction.
+Entries live in directory as <key[:2]>/<key><output extension>. An entry's modification
+time is updated on every hit, so the least recently used entries are evicted first
+when the cache grows past max_bytes. The cache can be shared by several processes:
+entries are written to a temporary file and renamed into place. The directory is only
+walked to evict when the size at the last walk plus what was stored since goes past
+max_bytes, or after RESCAN_FRACTION of max_bytes has been stored.
+With link=True hits are hard-linked to the output path instead of copied (falling back
+to a copy across file systems); the output must then not be modified in place, as it
+shares its data with the cache entry.
+"""
+class ConversionCache:
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, link=False):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.link = link
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Size of the cache at the last walk (None before the first) and bytes stored since
+        self._size = None
+        self._added = 0
+        os.makedirs(directory, exist_ok=True)
+
+    """
+    Return the extension of what converter writes to output_path, with the canonical
+    suffix of its compression: '.json' or '.json.gz'. The format and compression come
+    from the converter's output_format if it has one, otherwise from output_path.
+    """
+    def output_extension(self, converter, output_path):
+        extension = converter.get_output_extension(output_path)
+        compression = converter.get_output_compression(output_path)
+        if compression is not None:
+            extension += get_codec(compression).suffixes[0]
+        return extension
+
+    """
+    Return the cache key for converting converter's input file to output_path.
+    """
+    def key(self, converter, output_path):
+        digest = hashlib.sha256()
+        with open(converter.input_path, 'rb') as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+                digest.update(block)
+
+        converter_class = type(converter)
+        recipe = {
+            'version': CACHE_VERSION,
+            'converter': f"{converter_class.__module__}.{converter_class.__qualname__}",
+            'format': self.output_extension(converter, output_path),
+            'options': converter.get_options(),
+        }
+        digest.update(json.dumps(recipe, sort_keys=True, default=repr).encode('utf-8'))
+        return digest.hexdigest()
+
+    """
+    Path of the cache entry for key and output extension.
+    """
+    def entry_path(self, key, extension):
+        return os.path.join(self.directory, key[:2], key + extension)
+
+    """
+    Convert through the cache: serve a stored result if there is one, otherwise
+    run the converter and store its result. Returns what the conversion returns.
+    """
+    def convert(self, converter, output_path):
+        if not converter.validate_input():
+            return converter._convert(output_path)
+
+        key = self.key(converter, output_path)
+        entry = self.entry_path(key, self.output_extension(converter, output_path))
+
+        if self.get(entry, output_path):
+            self.hits += 1
+            print(f"Cache hit: {output_path} served from {entry}")
+            return True
+
+        self.misses += 1
+        result = converter._convert(output_path)
+        if result and os.path.isfile(output_path):
+            self.put(entry, output_path)
+        return result
+
+    """
+    Copy (or link) the cache entry to output_path. Returns False if there is no such entry.
+    """
+    def get(self, entry, output_path):
+        try:
+            # Mark the entry as recently used
+            os.utime(entry)
+        except FileNotFoundError:
+            return False
+
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        if os.path.lexists(output_path):
+            os.remove(output_path)
+        try:
+            if self.link:
+                try:
+                    os.link(entry, output_path)
+                    return True
+                except OSError:
+                    pass
+            shutil.copyfile(entry, output_path)
+        except FileNotFoundError:
+            # Evicted by another process between utime() and the copy
+            return False
+        return True
+
+    """
+    Store a copy of output_path as the cache entry, then evict old entries if the
+    cache may have grown past max_bytes.
+    """
+    def put(self, entry, output_path):
+        os.makedirs(os.path.dirname(entry), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(entry), suffix='.tmp')
+        os.close(fd)
+        try:
+            shutil.copyfile(output_path, temp_path)
+            size = os.path.getsize(temp_path)
+            os.replace(temp_path, entry)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        self._added += size
+        if (self._size is None or self._size + self._added > self.max_bytes
+                or self._added >= self.max_bytes * RESCAN_FRACTION):
+            self.evict()
+
+    """
+    List the cache entries as (last_used, size, path), least recently used first.
+    """
+    def entries(self):
+        entries = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.endswith('.tmp'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        return entries
+
+    """
+    Total size of all cache entries in bytes.
+    """
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    """
+    Remove least recently used entries until the cache fits in max_bytes.
+    """
+    def evict(self):
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                self.evictions += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._size = total
+        self._added = 0
+
+    """
+    Remove every entry from the cache.
+    """
+    def clear(self):
+        for _, _, path in self.entries():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self._size = 0
+        self._added = 0
+
+    """
+    Return the hit/miss counters of this cache object and the current cache size.
+    """
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'entries': len(self.entries()),
+            'bytes': self.size(),
+            'max_bytes': self.max_bytes,
+        }
@@ -0,0 +1,228 @@
+# Compression module - reads compressed inputs and writes compressed outputs as streams
+# A compressed input (report.csv.gz, log.txt.zst) is recognised by the magic bytes at
+# its head, and a compressed output by the compression suffix after its format
+# extension (data.json.gz). The data is decompressed and compressed on the fly between
+# the file and the chunked readers and writers, so neither side of a conversion is
+# ever held in memory or written to disk uncompressed.
+# gzip, bz2 and xz come with Python; zstd needs the optional zstandard package
+
+# Import bz2, gzip and lzma modules for the compressed file formats that come with Python
+import bz2
+import gzip
+import lzma
+
+# Import io module for the stream wrappers
+import io
+
+# Import zlib module to decompress the head of a gzip stream
+import zlib
+
+# Import the compression suffixes and the file name helpers built on them, which the GUI shares
+from utils.file_utils import COMPRESSION_SUFFIXES, split_compression, split_extension
+
+"""
+Number of bytes at the head of a file that tell its compression.
+"""
+MAGIC_SIZE = 10
+
+"""
+Buffer size between the codecs and the readers and writers. Compressors work best
+on large blocks, so the many small writes of a text writer are gathered first.
+"""
+BUFFER_SIZE = 1024 * 1024
+
+
+"""
+Description of one compression format: its name, the file suffixes that select it
+(from COMPRESSION_SUFFIXES),
+the byte strings its files start with, and its range and default of compression levels.
+"""
+class Codec:
+
+    def __init__(self, name, suffixes, magic, min_level, max_level, default_level):
+        self.name = name
+        self.suffixes = suffixes
+        self.magic = magic
+        self.min_level = min_level
+        self.max_level = max_level
+        self.default_level = default_level
+
+    def __repr__(self):
+        return f"Codec({self.name!r})"
+
+
+"""
+All supported compression formats. A bzip2 stream starts with 'BZh', the block size
+digit, and the magic number of its first block (or of the end of an empty stream).
+"""
+COMPRESSIONS = [
+    Codec('gzip', COMPRESSION_SUFFIXES['gzip'], (b'\x1f\x8b',), 0, 9, 6),
+    Codec('bz2', COMPRESSION_SUFFIXES['bz2'], tuple(b'BZh' + str(size).encode() + block
+                                 for size in range(1, 10) for block in (b'1AY&SY', b'\x17rE8P\x90')), 1, 9, 9),
+    Codec('xz', COMPRESSION_SUFFIXES['xz'], (b'\xfd7zXZ\x00',), 0, 9, 6),
+    Codec('zstd', COMPRESSION_SUFFIXES['zstd'], (b'\x28\xb5\x2f\xfd',), 1, 22, 3),
+]
+
+
+"""
+Return the Codec called name. Raises ValueError for an unknown compression.
+"""
+def get_codec(name):
+    for codec in COMPRESSIONS:
+        if codec.name == name:
+            return codec
+    raise ValueError(f"Unknown compression '{name}'. Available compressions: "
+                     f"{', '.join(codec.name for codec in COMPRESSIONS)}")
+
+
+"""
+Return the name of the compression whose magic bytes head starts with, or None.
+"""
+def detect_compression(head):
+    for codec in COMPRESSIONS:
+        if head.startswith(codec.magic):
+            return codec.name
+    return None
+
+
+"""
+Return the compression level to use for compression: level, or the codec's default
+if level is None. Raises ValueError if level is out of the codec's range.
+"""
+def resolve_level(compression, level=None):
+    codec = get_codec(compression)
+    if level is None:
+        return codec.default_level
+    if not codec.min_level <= level <= codec.max_level:
+        raise ValueError(f"{compression} compression level must be between "
+                         f"{codec.min_level} and {codec.max_level}, got {level}")
+    return level
+
+
+"""
+Return a buffered binary reader that decompresses the binary file object raw.
+Concatenated streams (as written by appending to a .gz file) are read as one.
+Closing the reader closes raw.
+"""
+def open_decompressed(raw, compression):
+    if compression == 'gzip':
+        codec_file = gzip.GzipFile(fileobj=raw, mode='rb')
+    elif compression == 'bz2':
+        codec_file = bz2.BZ2File(raw, 'rb')
+    elif compression == 'xz':
+        codec_file = lzma.LZMAFile(raw, 'rb')
+    elif compression == 'zstd':
+        codec_file = _import_zstandard().ZstdDecompressor().stream_reader(raw, read_across_frames=True,
+                                                                          closefd=False)
+    else:
+        raise ValueError(f"Unknown compression '{compression}'")
+    return io.BufferedReader(_CodecFile(codec_file, raw), BUFFER_SIZE)
+
+
+"""
+Return a buffered binary writer that compresses into the binary file object raw at
+the given level (None for the codec's default). Closing the writer finishes the
+compressed stream and closes raw.
+"""
+def open_compressed(raw, compression, level=None):
+    level = resolve_level(compression, level)
+    if compression == 'gzip':
+        # mtime=0 leaves the time out of the header, so equal outputs are equal files
+        codec_file = gzip.GzipFile(filename='', fileobj=raw, mode='wb', compresslevel=level, mtime=0)
+    elif compression == 'bz2':
+        codec_file = bz2.BZ2File(raw, 'wb', compresslevel=level)
+    elif compression == 'xz':
+        codec_file = lzma.LZMAFile(raw, 'wb', preset=level)
+    else:
+        codec_file = _import_zstandard().ZstdCompressor(level=level).stream_writer(raw, closefd=False)
+    return io.BufferedWriter(_CodecFile(codec_file, raw), BUFFER_SIZE)
+
+
+"""
+Decompress up to size bytes from the compressed bytes data, which may be cut off
+anywhere: what the complete part of data decompresses to is returned.
+"""
+def decompress_head(data, compression, size):
+    if compression == 'gzip':
+        # wbits=31 reads the gzip header and trailer around the deflate data
+        return zlib.decompressobj(wbits=31).decompress(data, size)
+    if compression == 'bz2':
+        return bz2.BZ2Decompressor().decompress(data, max_length=size)
+    if compression == 'xz':
+        return lzma.LZMADecompressor(format=lzma.FORMAT_XZ).decompress(data, max_length=size)
+    if compression == 'zstd':
+        return _import_zstandard().ZstdDecompressor().decompressobj().decompress(data)[:size]
+    raise ValueError(f"Unknown compression '{compression}'")
+
+
+"""
+Sample source for the sniffers (see sniffer.read_sample) that returns the head of a
+compressed input decompressed. source is a file path or a streams.InputStream.
+"""
+class CompressedSample:
+
+    def __init__(self, source, compression):
+        self.source = source
+        self.compression = compression
+
+    """
+    Return up to size decompressed bytes from the head of the input.
+    A stream is sampled without consuming it; the compressed sample grows until it
+    holds size bytes of data or the whole input.
+    """
+    def sample(self, size):
+        if not hasattr(self.source, 'sample'):
+            with open_decompressed(open(self.source, 'rb'), self.compression) as f:
+                return f.read(size)
+        compressed_size = size + 1024
+        while True:
+            data = self.source.sample(compressed_size)
+            head = decompress_head(data, self.compression, size)
+            if len(head) >= size or len(data) < compressed_size:
+                return head
+            compressed_size *= 4
+
+
+"""
+Import zstandard, which is only needed for .zst files.
+"""
+def _import_zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("zstd compression requires zstandard. Install it with: pip install zstandard")
+    return zstandard
+
+
+"""
+Raw stream over a codec's file object that also closes the file object the codec
+reads from or writes to, which the codecs leave open when they are given one.
+"""
+class _CodecFile(io.RawIOBase):
+
+    def __init__(self, codec_file, raw):
+        super().__init__()
+        self._file = codec_file
+        self._raw = raw
+
+    def readable(self):
+        return self._file.readable()
+
+    def writable(self):
+        return self._file.writable()
+
+    def readinto(self, buffer):
+        return self._file.readinto(buffer)
+
+    def write(self, data):
+        self._file.write(data)
+        return len(data)
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            super().close()
+            self._file.close()
+        finally:
+            self._raw.close()
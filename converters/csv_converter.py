@@ -1,83 +1,101 @@
 # CSV Converter module - converts CSV files to other formats
 
+# Import io module to parse the header from a sample of the input
+import io
+
 # Import pandas library for working with CSV files 
 import pandas as pd
 
-# Import the base converter class
-from .base_converter import BaseConverter
+# Import the tabular base class that streams chunks to the output writers
+from .tabular_converter import TabularConverter
+
+# Import the byte-range parallel parser for large CSV files
+from .parallel import EXTRA_COLUMN, conform_dtypes, drop_extra_column, resolve_jobs, write_csv_in_parallel
+
+# Import read_sample to parse the header without consuming a stream input
+from .sniffer import SAMPLE_SIZE, read_sample
+
+# Import the default number of rows per chunk
+from .writers import DEFAULT_CHUNKSIZE
 
 """
 Converter class for handling CSV (Comma-Separated Values) file conversions.
-Can convert CSV files to Excel (.xlsx), JSON, HTML, or keep as CSV format.
+Can convert CSV files to Excel (.xlsx), JSON, JSON Lines, HTML, or keep as CSV format.
+Use convert_many() to write several formats while parsing the CSV only once.
 """
-class CSVConverter(BaseConverter):
+class CSVConverter(TabularConverter):
+
+    format_name = 'CSV'
+
+    """
+    Initializes the converter with an input file path.
+    chunksize is the number of rows parsed at a time by the sequential reader.
+    xlsx_engine selects the constant-memory Excel backend ('openpyxl' or 'xlsxwriter').
+    jobs is the number of worker processes that parse the file in parallel byte ranges;
+    1 parses on a single core, and None or 0 uses every CPU core.
+    compresslevel is the level of compressed outputs such as data.json.gz (None for the default).
+    profile=True writes a cProfile/tracemalloc report next to the output (see profiling.py).
+    """
+    def __init__(self, input_path, chunksize=DEFAULT_CHUNKSIZE, xlsx_engine='openpyxl', jobs=1, compresslevel=None,
+                 profile=False):
+        super().__init__(input_path, chunksize=chunksize, xlsx_engine=xlsx_engine, compresslevel=compresslevel,
+                         profile=profile)
+        self.jobs = jobs
 
     """
      Return the file formats that CSV files can be converted to.  
     """
     def get_supported_formats(self):
         # CSV can be converted to these formats
-        return ['.xlsx', '.json', '.html', '.csv']
+        return ['.xlsx', '.json', '.jsonl', '.ndjson', '.html', '.csv']
+
+    """
+    Read the CSV file in chunks of self.chunksize rows.
+    Memory use is bounded by the chunk size instead of by the size of the CSV file.
+    Records with more fields than the header raise ValueError (see parallel.EXTRA_COLUMN).
+    Every column keeps the type it has in the first chunk.
+    """
+    def read_chunks(self):
+        names = self.read_columns() + [EXTRA_COLUMN]
+        # A DataFrame is like a table with rows and columns; each chunk is one of them
+        with pd.read_csv(self.input_source(), chunksize=self.chunksize, header=None, skiprows=1, names=names,
+                         index_col=False) as reader:
+            dtypes = None
+            for chunk in reader:
+                chunk = drop_extra_column(chunk)
+                if dtypes is None:
+                    dtypes = dict(chunk.dtypes)
+                else:
+                    conform_dtypes(chunk, dtypes)
+                yield chunk
+
+    """
+    Return the column names from the header record, parsed from a sample of the input
+    that grows until it holds the whole record.
+    """
+    def read_columns(self):
+        size = SAMPLE_SIZE
+        while True:
+            sample = read_sample(self.sample_source(), size)
+            # The header is complete at a newline that is outside quotes
+            end = 0
+            while True:
+                end = sample.find(b'\n', end) + 1
+                if end == 0 or sample[:end].count(b'"') % 2 == 0:
+                    break
+            if end or len(sample) < size:
+                return list(pd.read_csv(io.BytesIO(sample[:end] if end else sample), nrows=0).columns)
+            size *= 4
 
     """
-    Convert a CSV file to another format (Excel, JSON, or HTML).
+    Feed the parsed CSV to the writers, in parallel byte ranges when jobs allows it.
+    Stream and compressed inputs are parsed on a single core, as the byte ranges need
+    a file that can be read from any offset.
     """
-    def convert(self, output_path):
-        try:
-            # Store the output path for later use
-            self.output_path = output_path
-            
-            # Check if the input file exists before attempting to convert
-            if not self.validate_input():
-                print(f"Error: Input file '{self.input_path}' does not exist.")
-                return False
-            
-            # Read the CSV file into a pandas DataFrame
-            # A DataFrame is like a table with rows and columns
-            print(f"Reading CSV file: {self.input_path}")
-            df = pd.read_csv(self.input_path)
-            
-            # Extract the file extension from the output path
-            # For example: 'myfile.xlsx' -> 'xlsx'
-            # We use split('.') to split by dot, then [-1] to get the last part
-            file_extension = output_path.split('.')[-1].lower()
-            
-            # Convert to the appropriate format based on the file extension
-            if file_extension == 'xlsx':
-                # Convert to Excel format (.xlsx)
-                print(f"Converting to Excel format...")
-                # index=False means don't save the row numbers as a column
-                # engine='openpyxl' tells pandas to use the openpyxl library for Excel files
-                df.to_excel(output_path, index=False, engine='openpyxl')
-                
-            elif file_extension == 'json':
-                # Convert to JSON format (.json)
-                print(f"Converting to JSON format...")
-                # orient='records' means each row becomes a separate object
-                # indent=2 makes the JSON file readable with proper indentation
-                df.to_json(output_path, orient='records', indent=2)
-                
-            elif file_extension == 'html':
-                # Convert to HTML format (.html)
-                print(f"Converting to HTML format...")
-                # index=False means don't include the row numbers in the table
-                df.to_html(output_path, index=False)
-                
-            elif file_extension == 'csv':
-                # Save as CSV with a new name
-                print(f"Saving CSV file with new name...")
-                df.to_csv(output_path, index=False)
-            else:
-                # If the file extension is not supported, show an error
-                print(f"Error: Unsupported output format '.{file_extension}'")
-                print(f"Supported formats: {', '.join(self.get_supported_formats())}")
-                return False
-            
-            # successful conversion
-            print(f"Conversion successful! File saved to: {output_path}")
-            return True
-            
-        except Exception as e:
-            # If any error occurs during conversion, catch and print the error message
-            print(f"Error during CSV conversion: {str(e)}")
-            return False
+    def write_chunks(self, writers):
+        if self.input_stream is None and self.input_compression is None and resolve_jobs(self.jobs) > 1:
+            write_csv_in_parallel(self.input_path, writers, jobs=self.jobs, stage=self.result.stage,
+                                  checkpoint=lambda rows, offset: self.report_progress(rows=rows, bytes_done=offset),
+                                  sample_rows=self.chunksize)
+        else:
+            super().write_chunks(writers)
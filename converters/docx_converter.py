@@ -1,13 +1,134 @@
 # DOCX Converter module - converts Word (.docx) files to other formats
 
-# Imports Document class from python-docx library for reading Word documents
-from docx import Document
+# Import zipfile module to read the document XML straight from the .docx archive
+import zipfile
+
+# Import ElementTree for incremental (streaming) XML parsing
+import xml.etree.ElementTree as ET
 
 # Import the base converter class that we created earlier
-from .base_converter import BaseConverter
+from .base_converter import PREVIEW_ROWS, BaseConverter
+
+# Import the helpers for stream outputs
+from .streams import describe, open_output
+
+# Import islice to group the extracted lines into batches, and chain to put the first batch back
+from itertools import chain, islice
+
+# Import the byte counter that measures how much of the document XML was parsed
+from .progress import ByteCounter
+
+# XML namespace used by all WordprocessingML elements
+W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+# Run children that hold text, mapped to their text (None means the element's own text)
+RUN_TEXT = {
+    W + 't': None,
+    W + 'tab': '\t',
+    W + 'ptab': '\t',
+    W + 'cr': '\n',
+    W + 'noBreakHyphen': '-',
+}
+
+# Number of lines written to the text file at a time
+LINES_PER_BATCH = 1000
+
+
+"""
+Yield lists of up to size items from iterable.
+"""
+def _batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
 
-# Import os module for file operations and path handling
-import os
+
+"""
+Stream the text of a .docx file, one line per paragraph, in document order.
+Reads word/document.xml from the zip archive with iterparse() and clears every
+paragraph and table once it has been read, so memory use does not grow with the
+document. Each table row becomes one line with its cells separated by tabs.
+Text boxes are skipped, like python-docx's Document.paragraphs does.
+input_path can also be a seekable binary file object.
+counter is an optional progress.ByteCounter that gets the uncompressed size of the
+document XML as its total and counts the bytes of it parsed so far.
+"""
+def iter_docx_lines(input_path, counter=None):
+    with zipfile.ZipFile(input_path) as archive:
+        with archive.open('word/document.xml') as xml_file:
+            if counter is not None:
+                counter.total = archive.getinfo('word/document.xml').file_size
+                xml_file = counter.wrap(xml_file)
+            body = None
+            paragraph = None
+            row = None
+            cell = None
+            run_depth = 0
+            table_depth = 0
+            textbox_depth = 0
+
+            for event, elem in ET.iterparse(xml_file, events=('start', 'end')):
+                tag = elem.tag
+
+                if event == 'start':
+                    if tag == W + 'txbxContent':
+                        textbox_depth += 1
+                    elif textbox_depth:
+                        continue
+                    elif tag == W + 'body':
+                        body = elem
+                    elif tag == W + 'p':
+                        paragraph = []
+                    elif tag == W + 'r':
+                        run_depth += 1
+                    elif tag == W + 'tbl':
+                        table_depth += 1
+                    elif tag == W + 'tr' and table_depth == 1:
+                        row = []
+                    elif tag == W + 'tc' and table_depth == 1:
+                        cell = []
+                    continue
+
+                # Everything inside a text box is ignored
+                if tag == W + 'txbxContent':
+                    textbox_depth -= 1
+                    continue
+                if textbox_depth:
+                    continue
+
+                if run_depth and paragraph is not None and tag in RUN_TEXT:
+                    text = RUN_TEXT[tag]
+                    paragraph.append((elem.text or '') if text is None else text)
+                elif run_depth and paragraph is not None and tag == W + 'br':
+                    # Only line breaks become text; page and column breaks do not
+                    if elem.get(W + 'type', 'textWrapping') == 'textWrapping':
+                        paragraph.append('\n')
+                elif tag == W + 'r':
+                    run_depth -= 1
+                elif tag == W + 'p':
+                    text = ''.join(paragraph)
+                    paragraph = None
+                    if table_depth == 0:
+                        yield text
+                    elif cell is not None:
+                        # Paragraphs of nested tables end up in the enclosing cell
+                        cell.append(text)
+                    elem.clear()
+                elif tag == W + 'tc' and table_depth == 1:
+                    row.append(' '.join(part for part in cell if part))
+                    cell = None
+                elif tag == W + 'tr' and table_depth == 1:
+                    yield '\t'.join(row)
+                    row = None
+                elif tag == W + 'tbl':
+                    table_depth -= 1
+
+                # Drop finished top-level elements so the tree never holds the whole body
+                if body is not None and table_depth == 0 and tag in (W + 'p', W + 'tbl'):
+                    body.clear()
 
 
 class DOCXConverter(BaseConverter):
@@ -16,6 +137,18 @@ class DOCXConverter(BaseConverter):
     Can extract text from Word documents and save as plain text.
     """
 
+    """
+    Initializes the converter with an input file path.
+    engine selects how the text is extracted:
+    'stream' reads the document XML incrementally and includes table text,
+    'python-docx' loads the whole document with python-docx (body paragraphs only).
+    compresslevel is the level of compressed outputs such as data.json.gz (None for the default).
+    profile=True writes a cProfile/tracemalloc report next to the output (see profiling.py).
+    """
+    def __init__(self, input_path, engine='stream', compresslevel=None, profile=False):
+        super().__init__(input_path, compresslevel=compresslevel, profile=profile)
+        self.engine = engine
+
     """
     Return the file formats that Word files can be converted to.
     """
@@ -26,61 +159,101 @@ class DOCXConverter(BaseConverter):
     """
     Convert a Word (.docx) file to another format (plain text).
     """
-    def convert(self, output_path):
+    def _convert(self, output_path):
         try:
             # Store the output path for later use
             self.output_path = output_path
             
             # Checks if the input file exists before attempting to convert
             if not self.validate_input():
-                print(f"Error: Input file '{self.input_path}' does not exist.")
+                self.report_error(f"Error: Input file '{self.input_path}' does not exist.")
                 return False
             
-            print(f"Reading Word document: {self.input_path}")
-            
-            # Open the Word document using python-docx library
-            # A Document object represents a .docx file
-            doc = Document(self.input_path)
-            
             # Extract the file extension from the output path
             # For example: 'myfile.txt' -> '.txt'
-            # os.path.splitext() returns a tuple: (filename, extension)
-            file_extension = os.path.splitext(output_path)[1].lower()
+            # (or the output_format given to convert() for a stream without a name)
+            file_extension = self.get_output_extension(output_path)
             
             # Checks if the output format is supported
-            if file_extension == '.txt':
-                # Converts to plain text format
-                print("Converting to plain text format...")
-                
-                # Creates an empty list to store all the text from the document
-                text_content = []
-                
-                # Loops through each paragraph in the Word document
-                # paragraphs is a list of all text blocks in the document
-                for paragraph in doc.paragraphs:
-                    # Adds the text from each paragraph to our list
-                    text_content.append(paragraph.text)
-                
-                # Joins all paragraphs with newlines to create the final text
-                # '\n' means add a new line between each paragraph
-                final_text = '\n'.join(text_content)
-                
-                # Opens the output file and writes the text to it
-                # 'w' means open for writing
-                # encoding='utf-8' ensures we handle special characters correctly
-                with open(output_path, 'w', encoding='utf-8') as f:
-                    f.write(final_text)
-                
-                print(f"Conversion successful! File saved to: {output_path}")
-                return True
-                
-            else:
+            if file_extension != '.txt':
                 # If the file extension is not supported, show an error
-                print(f"Error: Unsupported output format '{file_extension}'")
+                self.report_error(f"Error: Unsupported output format '{file_extension}'")
                 print(f"Supported formats: {', '.join(self.get_supported_formats())}")
                 return False
             
+            if self.engine not in ('stream', 'python-docx'):
+                self.report_error(f"Error: Unknown DOCX engine '{self.engine}'. Use 'stream' or 'python-docx'")
+                return False
+            
+            print(f"Reading Word document: {self.input_name}")
+            
+            # Converts to plain text format
+            print("Converting to plain text format...")
+            # zipfile needs to seek, so a stream input that cannot seek and a compressed
+            # input are read into memory
+            source = self.seekable_input()
+            # Progress is measured in bytes of the uncompressed document XML, not of the .docx file
+            counter = ByteCounter()
+            if self.engine == 'stream':
+                lines = iter_docx_lines(source, counter)
+            else:
+                lines = self.iter_python_docx_lines(source)
+            
+            # The lines are read lazily, so the first batch is read before the output is
+            # opened: a corrupt archive then fails without creating an empty output
+            batches = self.result.timed(_batched(lines, LINES_PER_BATCH), 'read')
+            first = next(batches, None)
+            
+            # Opens the output file and writes the paragraphs in batches as they are read
+            # 'w' means open for writing
+            # encoding='utf-8' ensures we handle special characters correctly
+            self.result.rows = 0
+            with open_output(output_path, 'w', encoding='utf-8', compression=self.get_output_compression(output_path),
+                             compresslevel=self.compresslevel) as f:
+                for batch in chain([] if first is None else [first], batches):
+                    with self.result.stage('write'):
+                        # '\n' means add a new line between each paragraph
+                        if self.result.rows:
+                            f.write('\n')
+                        f.write('\n'.join(batch))
+                    self.result.rows += len(batch)
+                    if counter.total:
+                        self.report_progress(rows=self.result.rows, bytes_done=counter.count,
+                                             total_bytes=counter.total)
+                    else:
+                        self.report_progress(rows=self.result.rows)
+            
+            print(f"Conversion successful! File saved to: {describe(output_path, '<stdout>')}")
+            return True
+            
         except Exception as e:
             # If any error occurs during conversion, catch and print the error message
-            print(f"Error during DOCX conversion: {str(e)}")
+            self.report_error(f"Error during DOCX conversion: {str(e)}")
             return False
+
+    """
+    Return the text of the first limit paragraphs (or table rows), read with the
+    streaming engine, which stops parsing the document XML after them.
+    """
+    def preview(self, limit=PREVIEW_ROWS):
+        lines = iter_docx_lines(self.seekable_input())
+        try:
+            return '\n'.join(islice(lines, limit))
+        finally:
+            lines.close()
+
+    """
+    Yield the text of every body paragraph using python-docx.
+    This loads the whole document into memory first.
+    """
+    def iter_python_docx_lines(self, source):
+        # Imports Document class from python-docx library for reading Word documents
+        from docx import Document
+        
+        # Open the Word document using python-docx library
+        # A Document object represents a .docx file
+        doc = Document(source)
+        
+        # paragraphs is a list of all text blocks in the document
+        for paragraph in doc.paragraphs:
+            yield paragraph.text
@@ -0,0 +1,136 @@
+# DOCX Writer module - writes Word documents paragraph by paragraph
+# python-docx keeps the whole document tree in memory until save(); this writer
+# copies python-docx's blank template and streams word/document.xml straight into
+# the .docx archive, so memory stays flat however long the document gets
+
+# Import os module to find python-docx's bundled template
+import os
+
+# Import re module to drop characters that XML 1.0 does not allow
+import re
+
+# Import zipfile module because a .docx file is a zip archive of XML parts
+import zipfile
+
+# Import open_output so the document can be written to a stream as well as a file
+from .streams import open_output
+
+"""
+Name of the main document part inside a .docx archive.
+"""
+DOCUMENT_PART = 'word/document.xml'
+
+"""
+Control characters that are not allowed in XML 1.0 (tab, newline and carriage return are).
+"""
+_INVALID_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+
+
+
+"""
+Escape text for use as XML character data.
+(xml.sax.saxutils.escape does the same, but importing it loads urllib and http.client.)
+"""
+def escape(text):
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+"""
+Return the path of the blank document template that ships with python-docx.
+"""
+def get_default_template():
+    import docx
+    return os.path.join(os.path.dirname(docx.__file__), 'templates', 'default.docx')
+
+
+"""
+Writes a .docx file one paragraph at a time.
+Call open(), then add_heading() / add_paragraph() / add_page_break() in document order,
+and close() to finish the file. The writer can be used as a context manager.
+Styles, fonts and page setup come from python-docx's default template, so the result
+looks exactly like a document built with docx.Document().
+output_path can also be a binary file-like object or '-' for stdout. With compression
+(see compression.py) the document is compressed as it is written, at compresslevel.
+"""
+class DOCXStreamWriter:
+
+    def __init__(self, output_path, template_path=None, compression=None, compresslevel=None):
+        self.output_path = output_path
+        self.template_path = template_path or get_default_template()
+        self.compression = compression
+        self.compresslevel = compresslevel
+        self.paragraphs_written = 0
+        self._file = None
+        self._archive = None
+        self._document = None
+        self._tail = None
+
+    """
+    Copy every template part except the document body and start streaming the body.
+    """
+    def open(self):
+        # The output can also be a stream; zipfile writes non-seekable streams with data descriptors
+        self._file = open_output(self.output_path, 'wb', compression=self.compression,
+                                 compresslevel=self.compresslevel)
+        self._archive = zipfile.ZipFile(self._file, 'w', zipfile.ZIP_DEFLATED)
+        with zipfile.ZipFile(self.template_path) as template:
+            for item in template.infolist():
+                if item.filename != DOCUMENT_PART:
+                    self._archive.writestr(item, template.read(item.filename))
+            document_xml = template.read(DOCUMENT_PART).decode('utf-8')
+
+        # Paragraphs go between <w:body> and the section properties that close the body
+        split_at = document_xml.index('<w:sectPr')
+        head, self._tail = document_xml[:split_at], document_xml[split_at:]
+        self._document = self._archive.open(DOCUMENT_PART, 'w')
+        self._write(head.rstrip() + '\n')
+
+    """
+    Append a paragraph. Newlines inside text become line breaks, as in python-docx.
+    """
+    def add_paragraph(self, text='', style=None):
+        properties = f'<w:pPr><w:pStyle w:val="{style}"/></w:pPr>' if style else ''
+        runs = ''
+        if text:
+            lines = _INVALID_XML_CHARS.sub('', text).split('\n')
+            runs = '<w:r>' + '<w:br/>'.join(
+                f'<w:t xml:space="preserve">{escape(line)}</w:t>' for line in lines) + '</w:r>'
+        self._write(f'<w:p>{properties}{runs}</w:p>\n')
+        self.paragraphs_written += 1
+
+    """
+    Append a heading paragraph (level 0 is the document title).
+    """
+    def add_heading(self, text, level=1):
+        self.add_paragraph(text, style='Title' if level == 0 else f'Heading{level}')
+
+    """
+    Start a new page.
+    """
+    def add_page_break(self):
+        self._write('<w:p><w:r><w:br w:type="page"/></w:r></w:p>\n')
+
+    """
+    Finish the document body and close the archive.
+    """
+    def close(self):
+        if self._archive is None:
+            return
+        self._write('    ' + self._tail)
+        self._document.close()
+        self._archive.close()
+        self._file.close()
+        self._file = None
+        self._archive = None
+        self._document = None
+
+    def _write(self, text):
+        self._document.write(text.encode('utf-8'))
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
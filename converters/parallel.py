@@ -0,0 +1,255 @@
+# Parallel module - parses one large CSV file on several CPU cores
+# The file is memory-mapped and cut into byte ranges that end on record boundaries;
+# every range is parsed by a worker process and the results are written back in order
+
+# Import io module to hand a byte range to pandas like a file
+import io
+
+# Import mmap module to read the input without copying it into memory up front
+import mmap
+
+# Import os module to find the number of CPU cores
+import os
+
+# Import deque to keep the in-flight ranges in submission order
+from collections import deque
+
+# Import nullcontext as the default (untimed) stage
+from contextlib import nullcontext
+
+# Import the process pool that runs the range parsers
+from concurrent.futures import ProcessPoolExecutor
+
+# Import pandas library for parsing each byte range
+import pandas as pd
+
+# Import the dtype checks that keep a column's type the same in every chunk
+from pandas.api.types import is_float_dtype, is_integer_dtype
+
+# Import cancellation, which has to stop the worker processes as well
+from .progress import ConversionCancelled, terminate_pool
+
+# Import the number of rows handed to a DataFrame writer at a time
+from .writers import DEFAULT_CHUNKSIZE
+
+"""
+Target size of one byte range. Several ranges per worker keep all cores busy
+and bound the memory held by results that are waiting to be written.
+"""
+RANGE_SIZE = 32 * 1024 * 1024
+
+"""
+Size of the blocks scanned when counting quote characters.
+"""
+SCAN_BLOCK_SIZE = 16 * 1024 * 1024
+
+"""
+Name of a spare column that CSV records are parsed into one past the header.
+pandas does not check the field count of the first record of a chunk or byte range
+and drops its extra fields, so a record that is too long is found by a value here.
+"""
+EXTRA_COLUMN = '__extra_fields__'
+
+
+"""
+Remove EXTRA_COLUMN from a parsed chunk and return it. Raises ValueError if a record
+had more fields than the header; location tells where the chunk's rows are counted from.
+"""
+def drop_extra_column(df, location=''):
+    extra = df.pop(EXTRA_COLUMN)
+    row = extra.first_valid_index()
+    if row is not None:
+        raise ValueError(f"Expected {len(df.columns)} fields in data row {row + 1}{location}, saw more")
+    return df
+
+
+"""
+Give a parsed chunk the column types of the first chunk of the file, dtypes, and return
+it. pandas infers the types of every chunk anew, so without this a column of integers
+with a blank in a later chunk would be written as 4 in one chunk and 4.0 in the next.
+Such a chunk gets a nullable Int64 column, and integers in a float column become floats.
+Values that do not fit the first chunk's type (2.5 in an integer column) keep their own.
+"""
+def conform_dtypes(df, dtypes):
+    for column, dtype in dtypes.items():
+        parsed = df[column].dtype
+        if is_integer_dtype(dtype) and is_float_dtype(parsed):
+            try:
+                df[column] = df[column].astype('Int64')
+            except TypeError:
+                pass
+        elif is_float_dtype(dtype) and is_integer_dtype(parsed):
+            df[column] = df[column].astype(dtype)
+    return df
+
+
+"""
+Return the number of worker processes to use for a jobs option.
+jobs=None or jobs <= 0 means one worker per CPU core.
+"""
+def resolve_jobs(jobs):
+    if jobs is None or jobs <= 0:
+        return os.cpu_count() or 1
+    return jobs
+
+
+"""
+Split a CSV file into byte ranges that start and end on record boundaries.
+A newline only ends a record when it is outside a quoted field, which is the case
+when an even number of quote characters comes before it. Returns (data_start, ranges),
+where data_start is the offset just after the header record.
+"""
+def split_byte_ranges(input_path, range_size=RANGE_SIZE, quotechar=b'"'):
+    with open(input_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return 0, []
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            data_start = _next_record_start(mm, 0, size, quotechar)
+
+            ranges = []
+            start = data_start
+            while start < size:
+                target = min(start + range_size, size)
+                end = _next_record_start(mm, start, size, quotechar, target)
+                ranges.append((start, end))
+                start = end
+
+    return data_start, ranges
+
+
+"""
+Return the offset just after the first record-ending newline at or after target,
+scanning from start (which must be a record boundary) to keep track of quotes.
+"""
+def _next_record_start(mm, start, size, quotechar, target=None):
+    target = start if target is None else target
+
+    # Quote parity between the record boundary at start and the target offset
+    in_quotes = False
+    position = start
+    while position < target:
+        block_end = min(position + SCAN_BLOCK_SIZE, target)
+        if mm[position:block_end].count(quotechar) % 2:
+            in_quotes = not in_quotes
+        position = block_end
+
+    # Walk forward line by line until a newline is found outside quotes
+    while position < size:
+        newline = mm.find(b'\n', position)
+        if newline == -1:
+            return size
+        if mm[position:newline].count(quotechar) % 2:
+            in_quotes = not in_quotes
+        if not in_quotes:
+            return newline + 1
+        position = newline + 1
+    return size
+
+
+"""
+Worker function: parse one byte range of the CSV file.
+Every range gets the column types dtypes (see conform_dtypes).
+Returns (df, texts, rows). texts holds one entry per formatter: the range rendered
+by that formatter, or None. df is only returned when some writer needs the
+parsed DataFrame itself (a formatter of None).
+"""
+def _parse_range(task):
+    input_path, start, end, columns, dtypes, formatters = task
+
+    with open(input_path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            data = mm[start:end]
+
+    df = pd.read_csv(io.BytesIO(data), header=None, names=columns + [EXTRA_COLUMN], index_col=False)
+    drop_extra_column(df, f" after byte {start}")
+    conform_dtypes(df, dtypes)
+
+    texts = []
+    for formatter in formatters:
+        if formatter is None:
+            texts.append(None)
+        else:
+            function, options = formatter
+            texts.append(function(df, **options))
+
+    needs_frame = any(formatter is None for formatter in formatters)
+    return (df if needs_frame else None), texts, len(df)
+
+
+"""
+Parse a CSV file in parallel byte ranges and feed the results to writers in file order.
+Writers that can format rows by themselves (CSV, JSON Lines) get text rendered by the
+workers, so serialisation also runs on every core; other writers get DataFrames.
+stage is an optional ConversionResult.stage: waiting for the workers is timed as
+the read stage and writing as the write stage. checkpoint is an optional function
+called with the rows written and the input offset reached after every range, and after
+every DEFAULT_CHUNKSIZE rows given to DataFrame writers (e.g. XLSX), which are slow
+enough to need it; if it raises ConversionCancelled, the worker processes are
+terminated before it propagates.
+The column types are those of the first sample_rows rows, parsed like the first chunk
+of the sequential reader, so both give the same output.
+"""
+def write_csv_in_parallel(input_path, writers, jobs=None, range_size=RANGE_SIZE, stage=None, checkpoint=None,
+                          sample_rows=DEFAULT_CHUNKSIZE):
+    jobs = resolve_jobs(jobs)
+    stage = stage or (lambda name: nullcontext())
+    columns = list(pd.read_csv(input_path, nrows=0).columns)
+    head = pd.read_csv(input_path, header=None, skiprows=1, nrows=sample_rows, names=columns + [EXTRA_COLUMN],
+                       index_col=False)
+    dtypes = dict(drop_extra_column(head).dtypes)
+    data_start, ranges = split_byte_ranges(input_path, range_size)
+
+    # Every writer starts with the header row, even if the file has no data rows
+    header = pd.DataFrame(columns=columns)
+    for writer in writers:
+        writer.write(header)
+
+    formatters = [writer.get_formatter() for writer in writers]
+    tasks = [(input_path, start, end, columns, dtypes, formatters) for start, end in ranges]
+    print(f"Parsing {len(tasks)} byte ranges with {jobs} worker processes...")
+
+    executor = ProcessPoolExecutor(max_workers=jobs)
+    try:
+        # Keep at most two ranges per worker in flight to bound memory use
+        pending = deque()
+        task_iter = iter(tasks)
+        for task in task_iter:
+            pending.append(executor.submit(_parse_range, task))
+            if len(pending) >= jobs * 2:
+                break
+
+        written = 0
+        for start, end in ranges:
+            with stage('read'):
+                df, texts, rows = pending.popleft().result()
+            next_task = next(task_iter, None)
+            if next_task is not None:
+                pending.append(executor.submit(_parse_range, next_task))
+
+            with stage('write'):
+                for writer, text in zip(writers, texts):
+                    if text is not None:
+                        writer.write_formatted(text, rows)
+
+            # DataFrame writers get the range in chunks, so the checkpoint also runs within it
+            frame_writers = [writer for writer, text in zip(writers, texts) if text is None]
+            for offset in range(0, rows if frame_writers else 0, DEFAULT_CHUNKSIZE):
+                chunk = df.iloc[offset:offset + DEFAULT_CHUNKSIZE]
+                with stage('write'):
+                    for writer in frame_writers:
+                        writer.write(chunk)
+                if checkpoint is not None:
+                    # The input offset is estimated from the share of the range's rows written
+                    done = offset + len(chunk)
+                    checkpoint(written + done, start + (end - start) * done // rows)
+            written += rows
+            if checkpoint is not None:
+                checkpoint(written, end)
+    except ConversionCancelled:
+        # Ranges still being parsed would otherwise keep their cores busy until they finish
+        terminate_pool(executor)
+        raise
+    finally:
+        executor.shutdown()
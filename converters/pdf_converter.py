@@ -1,64 +1,333 @@
 # PDF Converter module - converts PDF files to other formats
 
-# Import libraries for PDF handling
-try:
-    from pdf2docx import Converter
-    HAS_PDF2DOCX = True
-except ImportError:
-    HAS_PDF2DOCX = False
+# Import find_spec to check for pdf2docx without importing it
+from importlib.util import find_spec
+
+# pdf2docx pulls in PyMuPDF and OpenCV, so it is only imported when a layout conversion runs
+HAS_PDF2DOCX = find_spec('pdf2docx') is not None
 
 # Import the base converter class 
-from .base_converter import BaseConverter
+from .base_converter import PREVIEW_PAGES, BaseConverter
 import os
 
+# Import json module to write one JSON record per page
+import json
+
+# Import islice to stop after the pages of a preview
+from itertools import islice
+
+# Import the extensions that are written as JSON Lines
+from .writers import JSON_LINES_EXTENSIONS
+
+# Import the streaming Word writer used by the text-only conversion
+from .docx_writer import DOCXStreamWriter
+
+# Import the helpers for stream outputs
+from .streams import describe, open_output
+
+# Import the process pool that parses page ranges in parallel
+from concurrent.futures import ProcessPoolExecutor
+
+# Import cancellation, which has to stop the worker processes as well
+from .progress import ConversionCancelled, terminate_pool
+
+"""
+Smallest number of pages worth handing to a separate worker process.
+Every worker re-opens the PDF and re-reads its fonts, so tiny shards cost more than they save.
+"""
+MIN_PAGES_PER_WORKER = 8
+
+
+"""
+Worker function: parse one page range [start, end) with pdf2docx.
+Returns the parsed page layouts in pdf2docx's store() format so the main
+process can restore them and build one Word document in page order.
+"""
+def _parse_page_range(task):
+    from pdf2docx import Converter
+
+    input_path, start, end, settings = task
+    converter = Converter(stream=input_path) if isinstance(input_path, bytes) else Converter(input_path)
+    try:
+        converter.load_pages(start, end)
+        converter.parse_document(**settings).parse_pages(**settings)
+        return converter.store()
+    finally:
+        converter.close()
+
+
+"""
+Conversion modes accepted by PDFConverter.
+"""
+PDF_MODES = ['auto', 'fast', 'layout']
+
+"""
+Number of pages inspected by triage_pdf().
+"""
+TRIAGE_PAGES = 3
+
+"""
+Pages with fewer text characters than this are treated as having no text layer.
+"""
+MIN_TEXT_CHARS_PER_PAGE = 20
+
+"""
+Largest share of the page area covered by images that still counts as a text document.
+"""
+MAX_IMAGE_COVERAGE = 0.25
+
+"""
+Number of straight ruling lines or rectangles on a page that hints at a drawn table.
+"""
+TABLE_RULING_HINT = 12
+
+
+"""
+Result of triage_pdf(): what the first pages of a PDF contain and which mode suits it.
+"""
+class PDFTriage:
+
+    def __init__(self, pages_probed, text_chars, image_coverage, table_hint):
+        self.pages_probed = pages_probed
+        self.text_chars = text_chars
+        self.image_coverage = image_coverage
+        self.table_hint = table_hint
+
+    """
+    True if the probed pages carry a real text layer (scans have next to no text).
+    """
+    @property
+    def has_text_layer(self):
+        return self.text_chars >= MIN_TEXT_CHARS_PER_PAGE * self.pages_probed
+
+    """
+    'fast' for born-digital text without tables or large images, otherwise 'layout'.
+    """
+    @property
+    def mode(self):
+        if self.has_text_layer and self.image_coverage <= MAX_IMAGE_COVERAGE and not self.table_hint:
+            return 'fast'
+        return 'layout'
+
+    def __str__(self):
+        return (f"{self.pages_probed} page(s) probed, "
+                f"{'text layer' if self.has_text_layer else 'no text layer'}, "
+                f"{self.image_coverage:.0%} images, "
+                f"{'table hints' if self.table_hint else 'no tables'}")
+
+
+"""
+Open a PDF with PyMuPDF from a file path or from the bytes of the file.
+"""
+def open_pdf(input_path):
+    import fitz  # PyMuPDF
+
+    if isinstance(input_path, bytes):
+        return fitz.open(stream=input_path, filetype='pdf')
+    return fitz.open(input_path)
+
+
+"""
+Inspect the first pages of a PDF without converting it: the amount of text in the
+text layer, the share of the page area covered by images, and ruling lines that
+hint at tables. input_path is a file path or the PDF's bytes.
+Returns a PDFTriage, or None if PyMuPDF is not installed.
+"""
+def triage_pdf(input_path, pages=TRIAGE_PAGES):
+    try:
+        import fitz  # PyMuPDF
+    except ImportError:
+        return None
+
+    text_chars = 0
+    image_area = 0.0
+    page_area = 0.0
+    table_hint = False
+    with open_pdf(input_path) as pdf_doc:
+        probed = min(pages, len(pdf_doc))
+        for page_num in range(probed):
+            page = pdf_doc[page_num]
+            text_chars += len(page.get_text().strip())
+            page_area += abs(page.rect)
+
+            # Image placements only; the images themselves are not decoded
+            for image in page.get_image_info():
+                image_area += abs(fitz.Rect(image['bbox']) & page.rect)
+
+            if _count_ruling_lines(page) >= TABLE_RULING_HINT:
+                table_hint = True
+
+    coverage = min(image_area / page_area, 1.0) if page_area else 0.0
+    return PDFTriage(probed, text_chars, coverage, table_hint)
+
+
+"""
+Count the horizontal/vertical line segments and rectangles drawn on a page.
+"""
+def _count_ruling_lines(page):
+    count = 0
+    for path in page.get_drawings():
+        for item in path['items']:
+            if item[0] == 're':
+                count += 1
+            elif item[0] == 'l':
+                start, end = item[1], item[2]
+                if abs(start.x - end.x) < 1 or abs(start.y - end.y) < 1:
+                    count += 1
+    return count
+
+
+"""
+Number of pages read before the PDF is reopened by iter_pdf_pages().
+MuPDF keeps every page object it has parsed until the document is closed,
+so reopening now and then keeps memory flat on very long PDFs.
+"""
+REOPEN_EVERY_PAGES = 200
+
+
+"""
+Yield (page_number, page) for every page of a PDF (a file path or the PDF's bytes),
+opened with PyMuPDF. Each page is only valid until the next one is requested.
+"""
+def iter_pdf_pages(input_path):
+    pdf_doc = open_pdf(input_path)
+    try:
+        for page_num in range(len(pdf_doc)):
+            if page_num and page_num % REOPEN_EVERY_PAGES == 0:
+                pdf_doc.close()
+                pdf_doc = open_pdf(input_path)
+            yield page_num, pdf_doc[page_num]
+    finally:
+        pdf_doc.close()
+
+
+"""
+Yield the text of each text block on a PyMuPDF page, in reading order.
+Lines inside a block keep their line breaks; image blocks and empty blocks are skipped.
+"""
+def iter_text_blocks(page):
+    import fitz  # PyMuPDF
+
+    # get_text('blocks') would be simpler, but it leaks a little memory on every page
+    # in some PyMuPDF releases, which adds up over thousands of pages
+    page_dict = page.get_text('dict', flags=fitz.TEXTFLAGS_TEXT)
+    for block in page_dict['blocks']:
+        # Type 0 is a text block; the text flags above already leave images out
+        if block['type'] != 0:
+            continue
+        lines = [''.join(span['text'] for span in line['spans']) for line in block['lines']]
+        text = '\n'.join(lines).strip()
+        if text:
+            yield text
+
+
+"""
+Split page_count pages into at most `shards` contiguous (start, end) ranges of similar size.
+"""
+def split_page_ranges(page_count, shards):
+    shards = max(1, min(shards, page_count))
+    size, extra = divmod(page_count, shards)
+    ranges = []
+    start = 0
+    for index in range(shards):
+        end = start + size + (1 if index < extra else 0)
+        ranges.append((start, end))
+        start = end
+    return ranges
+
 """
 Converter class for handling PDF file conversions.
     Currently converts PDF files to Word (.docx) format.
 """
 class PDFConverter(BaseConverter):
 
+    """
+    Initializes the converter with an input file path.
+    jobs is the number of worker processes that convert page ranges in parallel.
+    The default (None) uses one worker per CPU core, but never less than
+    MIN_PAGES_PER_WORKER pages per worker; 1 converts on a single core.
+    mode is 'fast' (text only, PyMuPDF), 'layout' (full pdf2docx conversion),
+    or 'auto' to let a quick probe of the first pages choose between them.
+    compresslevel is the level of compressed outputs such as data.json.gz (None for the default).
+    profile=True writes a cProfile/tracemalloc report next to the output (see profiling.py).
+    """
+    def __init__(self, input_path, jobs=None, mode='auto', compresslevel=None, profile=False):
+        super().__init__(input_path, compresslevel=compresslevel, profile=profile)
+        self.jobs = jobs
+        self.mode = mode
+        # The decompressed bytes of a compressed input, once pdf_source() has read them
+        self._pdf_data = None
+
     """
     Return the file formats that PDF files can be converted to.
     """
     def get_supported_formats(self):
-        # PDF can be converted to this format
-        return ['.docx']
+        # PDF can be converted to these formats
+        return ['.docx', '.txt'] + JSON_LINES_EXTENSIONS
 
     """ 
-    Convert a PDF file to Word format (.docx).
+    Convert a PDF file to Word format (.docx), plain text (.txt),
+    or JSON Lines with one record per page (.jsonl/.ndjson).
     """
-    def convert(self, output_path):
+    def _convert(self, output_path):
         try:
             # Store the output path for later use
             self.output_path = output_path
             
             # Check if the input file exists before attempting to convert
             if not self.validate_input():
-                print(f"Error: Input file '{self.input_path}' does not exist.")
+                self.report_error(f"Error: Input file '{self.input_path}' does not exist.")
                 return False
             
-            # Verify that the output file has a .docx extension
-            if not output_path.endswith('.docx'):
-                print("Error: Output file must have a .docx extension")
+            # Verify that the output format is supported
+            file_extension = self.get_output_extension(output_path)
+            if file_extension not in self.get_supported_formats():
+                self.report_error(f"Error: Unsupported output format '{file_extension}'")
                 print(f"Supported formats: {', '.join(self.get_supported_formats())}")
                 return False
             
-            if not HAS_PDF2DOCX:
-                print("Error: pdf2docx library is not installed")
-                print("Install it with: pip install pdf2docx")
+            # Text outputs are read straight from the text layer, without a Word intermediate
+            if file_extension != '.docx':
+                print(f"Reading PDF file: {self.input_name}")
+                print(f"Extracting text to {file_extension.lstrip('.').upper()} format...")
+                pages = self.convert_to_text(output_path, lines=file_extension in JSON_LINES_EXTENSIONS)
+                print(f"Extracted {pages} page(s)")
+                print(f"Conversion successful! File saved to: {describe(output_path, '<stdout>')}")
+                return True
+            
+            if self.mode not in PDF_MODES:
+                self.report_error(f"Error: Unknown PDF mode '{self.mode}'. Use one of: {', '.join(PDF_MODES)}")
                 return False
             
-            print(f"Reading PDF file: {self.input_path}")
+            print(f"Reading PDF file: {self.input_name}")
             print(f"This may take a moment depending on the file size...")
             
+            # Decide up front between the cheap text-only path and the full layout conversion
+            mode = self.mode
+            if mode == 'auto':
+                with self.result.stage('read'):
+                    triage = triage_pdf(self.pdf_source())
+                mode = triage.mode if triage is not None else 'layout'
+                if triage is not None:
+                    print(f"Triage: {triage}")
+                print(f"Selected {mode} mode")
+            
+            if mode == 'fast':
+                self.convert_text_only(output_path)
+                print(f"Conversion successful (text-based)! File saved to: {describe(output_path, '<stdout>')}")
+                return True
+            
+            if not HAS_PDF2DOCX:
+                self.report_error("Error: pdf2docx library is not installed")
+                print("Install it with: pip install pdf2docx")
+                return False
+            
             # Use pdf2docx with error handling for compatibility issues
             print("Converting PDF to Word format...")
             
             try:
                 # Try the standard conversion method
-                converter = Converter(self.input_path)
-                converter.convert(output_path, start=0, end=None)
-                converter.close()
+                self.convert_layout(output_path)
                 
             except Exception as e:
                 # If standard method fails due to compatibility, try alternative approach
@@ -68,25 +337,8 @@ class PDFConverter(BaseConverter):
                     
                     # Try with PyMuPDF directly for text extraction
                     try:
-                        import fitz  # PyMuPDF
-                        from docx import Document
-                        
-                        # Extract text from PDF
-                        pdf_text = ""
-                        pdf_doc = fitz.open(self.input_path)
-                        for page_num in range(len(pdf_doc)):
-                            page = pdf_doc[page_num]
-                            pdf_text += f"--- Page {page_num + 1} ---\n"
-                            pdf_text += page.get_text() + "\n"
-                        pdf_doc.close()
-                        
-                        # Create Word document with extracted text
-                        doc = Document()
-                        doc.add_heading('PDF Content', level=1)
-                        doc.add_paragraph(pdf_text)
-                        doc.save(output_path)
-                        
-                        print(f"Conversion successful (text-based)! File saved to: {output_path}")
+                        self.convert_text_only(output_path)
+                        print(f"Conversion successful (text-based)! File saved to: {describe(output_path, '<stdout>')}")
                         return True
                         
                     except Exception as alt_e:
@@ -95,13 +347,13 @@ class PDFConverter(BaseConverter):
                 else:
                     raise
             
-            print(f"Conversion successful! File saved to: {output_path}")
+            print(f"Conversion successful! File saved to: {describe(output_path, '<stdout>')}")
             return True
             
         except Exception as e:
             # If any error occurs during conversion, catch and print the error message
             error_msg = str(e)
-            print(f"Error during PDF conversion: {error_msg}")
+            self.report_error(f"Error during PDF conversion: {error_msg}")
             
             # Provide helpful guidance based on error type
             if "get_area" in error_msg.lower() or "Rect" in error_msg:
@@ -110,3 +362,157 @@ class PDFConverter(BaseConverter):
                 print("For better PDF conversion, try: pip install --upgrade pdf2docx PyMuPDF")
             
             return False
+
+    """
+    Convert the PDF to Word by extracting its text layer with PyMuPDF.
+    Much faster than the layout conversion, but keeps only the text.
+    Pages are read and written one at a time, so memory stays at about one page
+    and time grows linearly with the page count. Every text block on a page
+    becomes its own paragraph, and every page after the first starts with a page break.
+    """
+    def convert_text_only(self, output_path):
+        result = self.result
+        result.pages = 0
+        with DOCXStreamWriter(output_path, compression=self.get_output_compression(output_path),
+                              compresslevel=self.compresslevel) as writer:
+            writer.add_heading('PDF Content', level=1)
+            for page_num, page in result.timed(iter_pdf_pages(self.pdf_source()), 'read'):
+                with result.stage('read'):
+                    blocks = list(iter_text_blocks(page))
+                with result.stage('write'):
+                    if page_num:
+                        writer.add_page_break()
+                    for block in blocks:
+                        writer.add_paragraph(block)
+                result.pages += 1
+                self.report_progress(pages=result.pages, total_pages=page.parent.page_count)
+
+    """
+    Write the text layer of the PDF to output_path one page at a time.
+    With lines=False the result is plain text with a form feed between pages;
+    with lines=True it is JSON Lines with one {"page": n, "text": ...} record per page.
+    Returns the number of pages written.
+    """
+    def convert_to_text(self, output_path, lines=False):
+        result = self.result
+        result.pages = 0
+        # newline='' keeps the '\n' separators exactly as written on every platform
+        with open_output(output_path, 'w', encoding='utf-8', newline='',
+                         compression=self.get_output_compression(output_path), compresslevel=self.compresslevel) as f:
+            for page_num, page in result.timed(iter_pdf_pages(self.pdf_source()), 'read'):
+                with result.stage('read'):
+                    text = page.get_text('text')
+                if lines:
+                    with result.stage('transform'):
+                        text = json.dumps({'page': page_num + 1, 'text': text}, ensure_ascii=False) + '\n'
+                elif page_num:
+                    text = '\f' + text
+                with result.stage('write'):
+                    f.write(text)
+                result.pages += 1
+                self.report_progress(pages=result.pages, total_pages=page.parent.page_count)
+        return result.pages
+
+    """
+    Return the text layer of the first limit pages, each under a page heading.
+    PyMuPDF only parses the pages that are asked for, so the rest of the PDF is not read.
+    """
+    def preview(self, limit=PREVIEW_PAGES):
+        pages = iter_pdf_pages(self.pdf_source())
+        try:
+            return '\n\n'.join(f"--- Page {page_num + 1} ---\n{page.get_text('text').strip()}"
+                               for page_num, page in islice(pages, limit))
+        finally:
+            pages.close()
+
+    """
+    Return what PyMuPDF and pdf2docx should open: the file path, or the bytes of a
+    stream or compressed input (both libraries need the whole PDF in memory to open a stream).
+    A compressed input is decompressed once and the bytes are kept, like InputStream.read_all().
+    """
+    def pdf_source(self):
+        if self.input_compression is not None:
+            if self._pdf_data is None:
+                with self.open_input() as f:
+                    self._pdf_data = f.read()
+            return self._pdf_data
+        return self.input_stream.read_all() if self.input_stream is not None else self.input_path
+
+    """
+    Return the number of worker processes to use for a document with page_count pages.
+    """
+    def resolve_jobs(self, page_count):
+        if self.jobs is not None and self.jobs > 0:
+            return min(self.jobs, max(page_count, 1))
+        by_pages = max(1, page_count // MIN_PAGES_PER_WORKER)
+        return min(os.cpu_count() or 1, by_pages)
+
+    """
+    Run pdf2docx's parse_pages() on one page at a time, so progress can be reported
+    and cancellation checked between pages. pdf2docx only parses the pages whose
+    skip_parsing flag is off, so all but the current page are switched off meanwhile.
+    """
+    def parse_pages_one_by_one(self, converter, settings):
+        pages = [page for page in converter.pages if not page.skip_parsing]
+        try:
+            for page in pages:
+                page.skip_parsing = True
+            for number, page in enumerate(pages, start=1):
+                page.skip_parsing = False
+                converter.parse_pages(**settings)
+                page.skip_parsing = True
+                self.report_progress(pages=number, total_pages=len(pages))
+        finally:
+            for page in pages:
+                page.skip_parsing = False
+
+    """
+    Convert the PDF layout to Word with pdf2docx.
+    With more than one worker, contiguous page ranges are parsed in separate
+    processes and their layouts are merged in page order into one document.
+    """
+    def convert_layout(self, output_path):
+        from pdf2docx import Converter
+
+        result = self.result
+        with result.stage('read'):
+            source = self.pdf_source()
+            converter = Converter(stream=source) if isinstance(source, bytes) else Converter(source)
+        try:
+            page_count = len(converter.fitz_doc)
+            result.pages = page_count
+            jobs = self.resolve_jobs(page_count)
+            settings = converter.default_settings
+
+            if jobs <= 1:
+                # The steps of pdf2docx's Converter.convert(), timed one by one
+                with result.stage('read'):
+                    converter.load_pages(0, None)
+                with result.stage('transform'):
+                    converter.parse_document(**settings)
+                    self.parse_pages_one_by_one(converter, settings)
+            else:
+                print(f"Converting {page_count} pages with {jobs} worker processes...")
+                ranges = split_page_ranges(page_count, jobs)
+                executor = ProcessPoolExecutor(max_workers=jobs)
+                try:
+                    with result.stage('transform'):
+                        futures = [executor.submit(_parse_page_range, (source, start, end, settings))
+                                   for start, end in ranges]
+                        # Results are restored in submission order, i.e. in page order
+                        for (start, end), future in zip(ranges, futures):
+                            converter.restore(future.result())
+                            self.report_progress(pages=end, total_pages=page_count)
+                except ConversionCancelled:
+                    # The other ranges would otherwise keep their cores busy until they are parsed
+                    terminate_pool(executor)
+                    raise
+                finally:
+                    executor.shutdown()
+
+            with result.stage('write'), open_output(output_path, 'wb',
+                                                    compression=self.get_output_compression(output_path),
+                                                    compresslevel=self.compresslevel) as f:
+                converter.make_docx(f, **settings)
+        finally:
+            converter.close()
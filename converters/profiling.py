@@ -0,0 +1,135 @@
+# Profiling module - opt-in cProfile and tracemalloc capture of one conversion
+# With profile=True a converter runs under cProfile and tracemalloc. Memory is measured
+# per stage (read, transform, write), snapshots are taken when the conversion first
+# moves into each stage, and a .prof file plus a short text report are written next
+# to the output file
+
+# Import cProfile and pstats modules to profile function calls
+import cProfile
+import pstats
+
+# Import io module to render the pstats report into a string
+import io
+
+# Import tracemalloc module to trace memory allocations
+import tracemalloc
+
+"""
+Number of functions and allocation sites listed in the text report.
+"""
+PROFILE_TOP = 20
+
+"""
+Allocations made by the profiler itself are left out of the snapshots.
+"""
+SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+]
+
+
+"""
+Collects cProfile and tracemalloc data for one conversion.
+start() and stop() surround the conversion; ConversionResult.stage() calls
+enter_stage() and exit_stage() around every stage it times.
+Work done in worker processes (jobs > 1) is not seen by the profiler.
+"""
+class Profiler:
+
+    def __init__(self, output_path, top=PROFILE_TOP):
+        self.output_path = output_path
+        self.top = top
+        self.stage_peaks = {}
+        self.snapshots = []
+        self._profile = cProfile.Profile()
+        self._started_tracemalloc = False
+        self._seen_stages = set()
+
+    """
+    Start profiling and tracing memory allocations.
+    """
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self.snapshots.append(('start', _take_snapshot()))
+        self._profile.enable()
+
+    """
+    Stop profiling and take the final memory snapshot.
+    """
+    def stop(self):
+        self._profile.disable()
+        self.snapshots.append(('end', _take_snapshot()))
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+
+    """
+    Called when a stage starts. The first time the conversion moves into a stage,
+    a memory snapshot is taken; the peak counter is reset so exit_stage() sees the
+    peak of this stage alone.
+    """
+    def enter_stage(self, name):
+        if name not in self._seen_stages:
+            self._seen_stages.add(name)
+            # The snapshot itself is not part of the profile
+            self._profile.disable()
+            self.snapshots.append((f'before {name}', _take_snapshot()))
+            self._profile.enable()
+        tracemalloc.reset_peak()
+
+    """
+    Called when a stage ends; records the highest traced memory seen in the stage.
+    """
+    def exit_stage(self, name):
+        peak = tracemalloc.get_traced_memory()[1]
+        self.stage_peaks[name] = max(self.stage_peaks.get(name, 0), peak)
+
+    """
+    Write <output>.prof (load it with pstats or snakeviz) and <output>.profile.txt
+    with the result, the top functions by cumulative time, the memory peak of every
+    stage and the allocation sites that grew the most. Returns both paths.
+    """
+    def write_report(self, result):
+        prof_path = self.output_path + '.prof'
+        report_path = self.output_path + '.profile.txt'
+        self._profile.dump_stats(prof_path)
+
+        stream = io.StringIO()
+        stats = pstats.Stats(self._profile, stream=stream)
+        stats.sort_stats('cumulative').print_stats(self.top)
+
+        lines = [f"Profile of {result.converter_name}: {result.input_path} -> {self.output_path}", '']
+        lines.append(result.format())
+        lines += ['', 'Traced memory peak per stage:']
+        for name, peak in self.stage_peaks.items():
+            lines.append(f"  {name:<10} {peak / 1e6:10.1f} MB")
+
+        lines += ['', f"Top {self.top} allocation sites (growth between snapshots):"]
+        lines += self._allocation_report()
+
+        lines += ['', f"Top {self.top} functions by cumulative time:", stream.getvalue().strip()]
+
+        with open(report_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        return [prof_path, report_path]
+
+    """
+    For every snapshot after the first, list the source lines whose allocations grew
+    the most since the previous snapshot.
+    """
+    def _allocation_report(self):
+        lines = []
+        for (_, previous), (label, snapshot) in zip(self.snapshots, self.snapshots[1:]):
+            lines.append(f"  up to {label}:")
+            differences = snapshot.compare_to(previous, 'lineno')[:self.top]
+            for difference in differences:
+                if difference.size_diff <= 0:
+                    continue
+                frame = difference.traceback[0]
+                lines.append(f"    {difference.size_diff / 1e6:+9.2f} MB  {frame.filename}:{frame.lineno}")
+        return lines
+
+
+def _take_snapshot():
+    return tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
@@ -0,0 +1,196 @@
+# Progress module - progress reports and cooperative cancellation of conversions
+# convert() takes an on_progress callback and a CancellationToken. Converters call
+# report_progress() between chunks, pages or batches of lines: it updates the
+# conversion's ConversionProgress (rows, bytes and pages done against the known totals),
+# passes it to the callback and raises ConversionCancelled once the token is cancelled.
+# BaseConverter then deletes the partial output and returns a result with status 'cancelled'
+# (partial outputs of failed conversions are deleted the same way)
+
+# Import io module for the byte-counting reader
+import io
+
+# Import os module to delete partial outputs
+import os
+
+# Import threading module for the token's flag, which is set from other threads
+import threading
+
+# Import the stream check; partial output written to a stream cannot be taken back
+from .streams import is_stream
+
+"""
+Least number of seconds between two calls of a progress callback. Cancellation is
+still checked at every report, so throttling the callback never delays a cancel.
+"""
+PROGRESS_INTERVAL = 0.1
+
+
+"""
+Raised at a converter's next checkpoint after its CancellationToken was cancelled.
+Like KeyboardInterrupt it derives from BaseException, so the converters' own
+'except Exception' error handling lets it through to BaseConverter.run_conversion().
+"""
+class ConversionCancelled(BaseException):
+    pass
+
+
+"""
+Flag that asks a running conversion to stop. Create one, pass it to convert(), and call
+cancel() from any thread; the conversion stops at its next chunk or page.
+"""
+class CancellationToken:
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    """
+    Raise ConversionCancelled if cancel() was called.
+    """
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise ConversionCancelled('Conversion cancelled')
+
+
+"""
+How far a conversion has got. rows, bytes_done and pages count the work done so far;
+total_bytes and total_pages are None until the converter knows them. Which counters
+move depends on the input: tables report rows and bytes, PDFs pages, DOCX files
+paragraphs (rows) and bytes of the document's XML.
+"""
+class ConversionProgress:
+
+    def __init__(self, total_bytes=None, total_pages=None):
+        self.rows = 0
+        self.bytes_done = 0
+        self.pages = 0
+        self.total_bytes = total_bytes
+        self.total_pages = total_pages
+
+    """
+    Fraction of the work done between 0 and 1, or None if there is no known total.
+    Pages are the better measure where there are any; bytes are used otherwise.
+    """
+    @property
+    def fraction(self):
+        if self.total_pages:
+            return min(1.0, self.pages / self.total_pages)
+        if self.total_bytes:
+            return min(1.0, self.bytes_done / self.total_bytes)
+        return None
+
+    def to_dict(self):
+        return {
+            'rows': self.rows,
+            'bytes_done': self.bytes_done,
+            'total_bytes': self.total_bytes,
+            'pages': self.pages,
+            'total_pages': self.total_pages,
+            'fraction': self.fraction,
+        }
+
+    def __str__(self):
+        parts = []
+        if self.total_pages:
+            parts.append(f"{self.pages:,} of {self.total_pages:,} pages")
+        if self.rows:
+            parts.append(f"{self.rows:,} rows")
+        if self.total_bytes and not self.total_pages:
+            parts.append(f"{self.bytes_done / 1e6:.1f} of {self.total_bytes / 1e6:.1f} MB")
+        if self.fraction is not None:
+            parts.append(f"{self.fraction:.0%}")
+        return ', '.join(parts) or 'starting'
+
+
+"""
+Counts the bytes read through the file objects it wraps. total is the number of bytes
+expected, if known.
+"""
+class ByteCounter:
+
+    def __init__(self, total=None):
+        self.count = 0
+        self.total = total
+
+    """
+    Return a buffered reader over the binary file object raw that adds every byte read
+    to count. Closing the reader closes raw.
+    """
+    def wrap(self, raw):
+        return io.BufferedReader(_CountingReader(raw, self))
+
+
+class _CountingReader(io.RawIOBase):
+
+    def __init__(self, raw, counter):
+        super().__init__()
+        self._raw = raw
+        self._counter = counter
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self._raw.read(len(buffer))
+        buffer[:len(data)] = data
+        self._counter.count += len(data)
+        return len(data)
+
+    def close(self):
+        if not self.closed:
+            self._raw.close()
+        super().close()
+
+
+"""
+Stop a ProcessPoolExecutor at once: queued tasks are dropped and the worker processes
+are terminated, so a cancelled conversion does not keep the CPU busy with work whose
+result nobody will read. The executor cannot be used afterwards.
+"""
+def terminate_pool(executor):
+    # The executor does not offer a way to stop running tasks; its worker processes do
+    processes = list((getattr(executor, '_processes', None) or {}).values())
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+
+
+"""
+Return what the output files look like before a conversion, to be passed to
+remove_partial_outputs(): for every output path, its (inode, size, modification time),
+or None if it does not exist. Streams are left out.
+"""
+def snapshot_outputs(output_paths):
+    snapshot = {}
+    for path in output_paths:
+        if not is_stream(path):
+            try:
+                stat = os.stat(path)
+                snapshot[path] = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+            except OSError:
+                snapshot[path] = None
+    return snapshot
+
+
+"""
+Delete the files a failed or cancelled conversion left half-written. Streams are
+left alone. With a snapshot from snapshot_outputs(), only files that were created or
+written since are deleted, so an output the conversion never opened (e.g. one that
+failed on a missing input, or was cancelled before it started) is kept.
+"""
+def remove_partial_outputs(output_paths, snapshot=None):
+    for path in output_paths:
+        if is_stream(path) or not os.path.isfile(path):
+            continue
+        if snapshot is not None and snapshot_outputs([path]).get(path) == snapshot.get(path):
+            continue
+        try:
+            os.remove(path)
+        except OSError as e:
+            print(f"Warning: could not remove partial output '{path}': {str(e)}")
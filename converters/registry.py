@@ -0,0 +1,107 @@
+# Registry module - maps input file extensions to converter classes
+# Every converter is declared here by module and class name together with its
+# input and output formats, so the formats can be listed without importing
+# pandas, python-docx or pdf2docx. A converter module is only imported the first
+# time its class is actually needed
+
+# Import importlib to load converter modules on first use
+import importlib
+
+# Import os module for file extension handling
+import os
+
+# Import split_compression so report.csv.gz is read by the CSV converter
+from .compression import split_compression
+
+
+"""
+Declaration of one converter: a display name, where the class lives,
+and the file extensions it reads and writes.
+executor tells where asynchronous conversions should run: 'thread' for converters
+whose work mostly happens outside the GIL (pandas' C parser, file I/O), 'process'
+for converters that run Python code for most of their time and would hold the GIL.
+"""
+class ConverterSpec:
+
+    def __init__(self, name, module, class_name, input_formats, output_formats, executor='thread'):
+        self.name = name
+        self.module = module
+        self.class_name = class_name
+        self.input_formats = input_formats
+        self.output_formats = output_formats
+        self.executor = executor
+        self._class = None
+
+    """
+    Import the converter module (once) and return the converter class.
+    """
+    def load(self):
+        if self._class is None:
+            module = importlib.import_module(self.module, __package__)
+            self._class = getattr(module, self.class_name)
+        return self._class
+
+    """
+    Return True if the converter writes output_format, e.g. '.json' or '.json.gz'.
+    Every output format can also be compressed.
+    """
+    def can_write(self, output_format):
+        return split_compression(output_format.lower())[0] in self.output_formats
+
+    def __repr__(self):
+        return f"ConverterSpec({self.name!r}, {self.module!r}, {self.class_name!r})"
+
+
+"""
+All available converters. The output formats must match what each class
+returns from get_supported_formats().
+"""
+CONVERTERS = [
+    ConverterSpec('CSV', '.csv_converter', 'CSVConverter',
+                  ['.csv'], ['.xlsx', '.json', '.jsonl', '.ndjson', '.html', '.csv']),
+    # pdf2docx's layout analysis is pure Python, so PDF conversions run in processes
+    ConverterSpec('PDF', '.pdf_converter', 'PDFConverter',
+                  ['.pdf'], ['.docx', '.txt', '.jsonl', '.ndjson'], executor='process'),
+    ConverterSpec('DOCX', '.docx_converter', 'DOCXConverter',
+                  ['.docx'], ['.txt']),
+    ConverterSpec('TXT', '.txt_converter', 'TXTConverter',
+                  ['.txt'], ['.csv', '.xlsx', '.json', '.jsonl', '.ndjson']),
+]
+
+
+"""
+Return the ConverterSpec for an input file path or extension, or None if no converter reads it.
+A compression suffix is skipped: 'report.csv.gz' and '.csv.gz' are read by the CSV converter.
+"""
+def get_spec(input_path):
+    name = split_compression(input_path)[0]
+    extension = os.path.splitext(name)[1].lower() or name.lower()
+    for spec in CONVERTERS:
+        if extension in spec.input_formats:
+            return spec
+    return None
+
+
+"""
+Return the converter class for an input file, importing it on first use.
+Returns None if no converter reads files with that extension.
+"""
+def get_converter_class(input_path):
+    spec = get_spec(input_path)
+    return spec.load() if spec is not None else None
+
+
+"""
+Create a converter for input_path, passing options to its constructor.
+Returns None if no converter reads files with that extension.
+"""
+def create_converter(input_path, **options):
+    converter_class = get_converter_class(input_path)
+    return converter_class(input_path, **options) if converter_class is not None else None
+
+
+"""
+Return every input extension that has a converter.
+"""
+def get_input_formats():
+    return [extension for spec in CONVERTERS for extension in spec.input_formats]
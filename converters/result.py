@@ -0,0 +1,274 @@
+# Result module - structured outcome of a conversion
+# BaseConverter.convert() returns a ConversionResult that records the status and error,
+# how long the read, transform and write stages took, bytes in/out, rows or pages
+# processed and peak memory. Observers receive every result, so the metrics can be
+# forwarded to any collector
+
+# Import os module for file sizes
+import os
+
+# Import threading module to tell conversions that overlap in one process apart
+import threading
+
+# Import time module to measure stage and wall times
+import time
+
+# Import contextmanager to time stages with a with-block
+from contextlib import contextmanager
+
+"""
+The stages every conversion is split into, in order.
+read: parsing the input; transform: converting it to the output's structure;
+write: serialising and writing the output. Streaming converters alternate between
+the stages, so each one holds the total time spent in it.
+"""
+STAGES = ['read', 'transform', 'write']
+
+
+"""
+Outcome and metrics of one conversion. A result is truthy when the conversion
+succeeded, so code that treated convert() as returning True/False keeps working.
+"""
+class ConversionResult:
+
+    def __init__(self, converter_name, input_path, output_paths):
+        self.converter_name = converter_name
+        self.input_path = input_path
+        self.output_paths = list(output_paths)
+        self.status = 'running'
+        self.error = None
+        self.stages = {stage: 0.0 for stage in STAGES}
+        self.wall_seconds = 0.0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.rows = None
+        self.pages = None
+        # Peak resident set size of the process (see start_peak_memory); None if unknown or
+        # another conversion ran in the same process at the same time
+        self.peak_memory = None
+        self.cached = False
+        # Profiler attached while a conversion runs with profile=True, and the report files it wrote
+        self.profiler = None
+        self.profile_paths = []
+
+    @property
+    def ok(self):
+        return self.status == 'success'
+
+    def __bool__(self):
+        return self.ok
+
+    @property
+    def output_path(self):
+        return self.output_paths[0] if self.output_paths else None
+
+    """
+    Context manager that adds the time spent in its block to a stage.
+    """
+    @contextmanager
+    def stage(self, name):
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.enter_stage(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+            if profiler is not None:
+                profiler.exit_stage(name)
+
+    """
+    Iterate over iterable, adding the time spent producing each item to a stage.
+    """
+    def timed(self, iterable, name):
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    """
+    Return the result as a plain dictionary (e.g. to log it as JSON).
+    """
+    def to_dict(self):
+        return {
+            'converter': self.converter_name,
+            'input_path': self.input_path,
+            'output_paths': self.output_paths,
+            'status': self.status,
+            'error': self.error,
+            'cached': self.cached,
+            'wall_seconds': self.wall_seconds,
+            'stages': dict(self.stages),
+            'bytes_in': self.bytes_in,
+            'bytes_out': self.bytes_out,
+            'rows': self.rows,
+            'pages': self.pages,
+            'peak_memory': self.peak_memory,
+            'profile_paths': self.profile_paths,
+        }
+
+    """
+    Render the result as a few human-readable lines.
+    """
+    def format(self):
+        status = 'success' + (' (from cache)' if self.cached else '') if self.ok else self.status
+        lines = [f"Status: {status} in {self.wall_seconds:.2f} s"]
+        if self.error:
+            lines.append(f"Error: {self.error}")
+        lines.append('Stages: ' + ', '.join(f"{name} {seconds:.2f} s" for name, seconds in self.stages.items()))
+        data = f"Data: {_format_bytes(self.bytes_in)} in, {_format_bytes(self.bytes_out)} out"
+        if self.rows is not None:
+            data += f", {self.rows:,} rows"
+        if self.pages is not None:
+            data += f", {self.pages:,} pages"
+        lines.append(data)
+        if self.peak_memory is not None:
+            lines.append(f"Peak memory: {_format_bytes(self.peak_memory)}")
+        return '\n'.join(lines)
+
+    def __str__(self):
+        return self.format().replace('\n', '; ')
+
+    def __repr__(self):
+        return f"ConversionResult({self.converter_name!r}, {self.input_path!r}, status={self.status!r})"
+
+
+"""
+Base class for objects that want to see every conversion.
+Override the methods you need and register the observer with add_observer(),
+or for a single converter with converter.observers.append(observer).
+"""
+class ConversionObserver:
+
+    """
+    Called before the conversion starts; result has no metrics yet.
+    """
+    def on_start(self, result):
+        pass
+
+    """
+    Called after the conversion finished, successfully or not.
+    """
+    def on_finish(self, result):
+        pass
+
+
+# Observers that receive the results of all converters
+_observers = []
+
+
+"""
+Register an observer for all conversions.
+"""
+def add_observer(observer):
+    _observers.append(observer)
+
+
+"""
+Unregister an observer added with add_observer().
+"""
+def remove_observer(observer):
+    _observers.remove(observer)
+
+
+"""
+Return the observers registered for all conversions.
+"""
+def get_observers():
+    return list(_observers)
+
+
+"""
+Conversions running in this process, and those that overlapped another one. The peak
+resident set size belongs to the whole process, and resetting it resets it for every
+thread, so a conversion that ran alongside another (the async API and the GUI job
+queue run conversions on threads) has no peak memory of its own.
+"""
+_peak_lock = threading.Lock()
+_peak_running = set()
+_peak_overlapped = set()
+
+
+"""
+Start measuring the peak memory of a conversion: reset the counter if no other
+conversion is running in this process. Returns the token for stop_peak_memory().
+"""
+def start_peak_memory():
+    token = object()
+    with _peak_lock:
+        if _peak_running:
+            _peak_overlapped.update(_peak_running)
+            _peak_overlapped.add(token)
+        else:
+            reset_peak_memory()
+        _peak_running.add(token)
+    return token
+
+
+"""
+Stop measuring the conversion of token. Returns the peak resident set size of the
+process while it ran, or None if another conversion ran in the process meanwhile
+(or the peak is unknown).
+"""
+def stop_peak_memory(token):
+    with _peak_lock:
+        _peak_running.discard(token)
+        if token in _peak_overlapped:
+            _peak_overlapped.discard(token)
+            return None
+        return read_peak_memory()
+
+
+"""
+Reset the peak memory counter of this process, if the platform allows it.
+Linux resets the peak resident set size when '5' is written to /proc/self/clear_refs.
+Returns True if the counter was reset.
+"""
+def reset_peak_memory():
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+"""
+Return the peak resident set size of this process in bytes, or None if unknown.
+"""
+def read_peak_memory():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+        import sys
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+        return peak if sys.platform == 'darwin' else peak * 1024
+    except ImportError:
+        return None
+
+
+"""
+Return the total size of the files that exist among paths.
+"""
+def total_file_size(paths):
+    return sum(os.path.getsize(path) for path in paths if os.path.isfile(path))
+
+
+def _format_bytes(size):
+    if size >= 1e6:
+        return f"{size / 1e6:.1f} MB"
+    if size >= 1e3:
+        return f"{size / 1e3:.1f} KB"
+    return f"{size} B"
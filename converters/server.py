@@ -0,0 +1,503 @@
+# Server module - local HTTP conversion service
+# Runs the converters as a shared service on localhost, built on the standard library's
+# http.server. Uploads are streamed to disk in blocks and converted by a process pool that
+# is started (and has imported every converter) before the first request. The number of
+# accepted but unfinished jobs is bounded: when the queue is full new uploads get
+# 429 Too Many Requests. Results are downloaded in blocks, never read into memory whole
+#
+#   GET    /formats            converters and their input/output formats
+#   POST   /jobs?filename=data.csv&to=.json   upload a file (body) and queue its conversion
+#   GET    /jobs/<id>          job status, with the ConversionResult once it has finished
+#   GET    /jobs/<id>/result   download the converted file
+#   DELETE /jobs/<id>          cancel a queued job, or delete a finished one and its files
+
+# Import json module for the request and response bodies
+import json
+
+# Import os module for file operations and path handling
+import os
+
+# Import shutil module to remove job directories
+import shutil
+
+# Import tempfile module for the default work directory
+import tempfile
+
+# Import threading module to guard the job table across request threads
+import threading
+
+# Import time module for job timestamps
+import time
+
+# Import uuid module for job ids
+import uuid
+
+# Import the process pool that runs the conversions, and the error of a pool whose worker died
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Import the standard library HTTP server
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Import urllib.parse to read the query string and to encode download file names
+from urllib.parse import parse_qs, quote, urlsplit
+
+# Import the start method that is safe next to the request threads
+from .async_api import get_mp_context
+
+# Import the batch worker function, which converts one file in a worker process
+from .batch import _convert_task
+
+# Import the default size budget of the conversion cache
+from .cache import DEFAULT_MAX_BYTES
+
+# Import split_extension to keep the compression suffix of uploads and outputs
+from .compression import split_extension
+
+# Import the registry that is exposed by /formats
+from .registry import CONVERTERS, get_spec
+
+"""
+Default address, number of queued jobs (beyond one running job per worker),
+upload size limit and the time finished jobs are kept.
+"""
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8000
+DEFAULT_QUEUE_SIZE = 16
+DEFAULT_MAX_UPLOAD_BYTES = 1024 * 1024 * 1024
+DEFAULT_JOB_TTL = 3600
+
+"""
+Size of the blocks in which uploads and downloads are copied.
+"""
+COPY_BLOCK_SIZE = 1024 * 1024
+
+"""
+Content types of the output formats.
+"""
+CONTENT_TYPES = {
+    '.csv': 'text/csv; charset=utf-8',
+    '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    '.html': 'text/html; charset=utf-8',
+    '.json': 'application/json',
+    '.jsonl': 'application/x-ndjson',
+    '.ndjson': 'application/x-ndjson',
+    '.txt': 'text/plain; charset=utf-8',
+    '.xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    '.gz': 'application/gzip',
+    '.bz2': 'application/x-bzip2',
+    '.xz': 'application/x-xz',
+    '.zst': 'application/zstd',
+}
+
+
+"""
+Reduce a file name from a client to its base name without control characters, quotes or
+backslashes, so it is safe in a path and in a header. Returns '' if nothing is left.
+"""
+def safe_filename(filename):
+    name = os.path.basename(filename.replace('\\', '/'))
+    return ''.join(char for char in name if char.isprintable() and char not in '"\\')
+
+
+"""
+Return the Content-Disposition header value of a download named filename: an ASCII
+filename for old clients and the full name encoded as in RFC 5987.
+"""
+def content_disposition(filename):
+    name = safe_filename(filename) or 'output'
+    fallback = name.encode('ascii', 'replace').decode('ascii').replace('?', '_')
+    if fallback == name:
+        return f'attachment; filename="{name}"'
+    return f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{quote(name, safe='')}"
+
+
+"""
+One uploaded file and its conversion.
+"""
+class Job:
+
+    def __init__(self, job_id, directory, filename, input_path, output_path):
+        self.id = job_id
+        self.directory = directory
+        self.filename = filename
+        self.input_path = input_path
+        self.output_path = output_path
+        self.created = time.time()
+        self.finished = None
+        self.future = None
+        # The BatchItem returned by the worker
+        self.item = None
+        self.error = None
+
+    """
+    queued, running, success, failed or cancelled. Clients only see a job once its
+    upload has been read and submitted, so it always has a future by then.
+    """
+    @property
+    def status(self):
+        if self.future.cancelled():
+            return 'cancelled'
+        if not self.future.done():
+            return 'running' if self.future.running() else 'queued'
+        return 'success' if self.item is not None and self.item.ok else 'failed'
+
+    """
+    Return the job as a dictionary for the status endpoint.
+    """
+    def to_dict(self):
+        status = self.status
+        data = {
+            'id': self.id,
+            'status': status,
+            'filename': self.filename,
+            'output_format': split_extension(self.output_path)[1],
+            'created': self.created,
+            'finished': self.finished,
+            'result_url': f'/jobs/{self.id}/result',
+        }
+        if self.item is not None and self.item.result is not None:
+            data['result'] = self.item.result.to_dict()
+        if status == 'failed':
+            data['error'] = self.error or (self.item.result.error if self.item and self.item.result else None)
+            data['log'] = self.item.log if self.item is not None else ''
+        return data
+
+
+"""
+The conversion service behind the HTTP handler: a warm process pool and a bounded job table.
+At most workers + queue_size jobs are accepted and unfinished at a time; reserve() fails
+beyond that. Finished jobs and their files are removed after job_ttl seconds.
+If a worker process dies (killed for running out of memory, or crashed in a native
+parser), the jobs in its pool fail and a new pool takes the next jobs.
+"""
+class ConversionService:
+
+    def __init__(self, workers=None, queue_size=DEFAULT_QUEUE_SIZE, work_dir=None, cache_dir=None,
+                 cache_max_bytes=DEFAULT_MAX_BYTES, max_upload_bytes=DEFAULT_MAX_UPLOAD_BYTES,
+                 job_ttl=DEFAULT_JOB_TTL):
+        self.workers = workers if workers and workers > 0 else os.cpu_count() or 1
+        self.capacity = self.workers + queue_size
+        self.max_upload_bytes = max_upload_bytes
+        self.job_ttl = job_ttl
+        self.cache_options = {'directory': cache_dir, 'max_bytes': cache_max_bytes} if cache_dir else None
+        self._own_work_dir = work_dir is None
+        self.work_dir = tempfile.mkdtemp(prefix='file-converter-') if work_dir is None else work_dir
+        os.makedirs(self.work_dir, exist_ok=True)
+        self.jobs = {}
+        self._reserved = 0
+        self._lock = threading.Lock()
+        self._pool = self._start_pool()
+
+    def _start_pool(self):
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=get_mp_context(), initializer=_warm_worker)
+
+    """
+    Replace pool, which a dead worker has broken, with a new pool unless that was done
+    already. Returns the current pool.
+    """
+    def _replace_pool(self, pool):
+        with self._lock:
+            if self._pool is pool:
+                print("A worker process died; starting a new worker pool")
+                self._pool = self._start_pool()
+                pool.shutdown(wait=False)
+            return self._pool
+
+    """
+    Start every worker process now, so the first requests do not pay for starting
+    processes and importing pandas and PyMuPDF.
+    """
+    def warm_up(self):
+        # Overlapping tasks make the pool start all of its workers
+        futures = [self._pool.submit(time.sleep, 0.2) for _ in range(self.workers)]
+        for future in futures:
+            future.result()
+
+    """
+    Take a queue slot for a new job. Returns False if the queue is full.
+    """
+    def reserve(self):
+        with self._lock:
+            if self._reserved >= self.capacity:
+                return False
+            self._reserved += 1
+            return True
+
+    """
+    Give back a slot taken with reserve().
+    """
+    def release(self):
+        with self._lock:
+            self._reserved -= 1
+
+    """
+    Create a job directory for an upload named filename that is converted to output_format.
+    """
+    def create_job(self, filename, output_format):
+        job_id = uuid.uuid4().hex
+        directory = os.path.join(self.work_dir, job_id)
+        # The output has its own directory so it cannot overwrite the upload (data.csv -> data.csv)
+        os.makedirs(os.path.join(directory, 'output'))
+        # The compression suffix stays on the upload, so data.csv.gz is read as a compressed CSV
+        stem, extension = split_extension(safe_filename(filename))
+        return Job(job_id, directory, filename, os.path.join(directory, 'input' + extension.lower()),
+                   os.path.join(directory, 'output', (stem or 'output') + output_format))
+
+    """
+    Queue the conversion of an uploaded job. Its slot is given back when the job finishes.
+    """
+    def submit(self, job):
+        size = os.path.getsize(job.input_path)
+        task = (job.input_path, job.output_path, size, self.cache_options, False, None)
+        with self._lock:
+            self.jobs[job.id] = job
+            pool = self._pool
+        try:
+            job.future = pool.submit(_convert_task, task)
+        except BrokenProcessPool:
+            # A worker died after the previous jobs had finished
+            pool = self._replace_pool(pool)
+            job.future = pool.submit(_convert_task, task)
+        job.future.add_done_callback(lambda future: self._finish(job, future, pool))
+
+    def _finish(self, job, future, pool):
+        job.finished = time.time()
+        if not future.cancelled():
+            try:
+                job.item = future.result()
+            except BrokenProcessPool:
+                job.error = "Worker failed: the worker process died during the conversion"
+                self._replace_pool(pool)
+            except Exception as e:
+                job.error = f"Worker failed: {str(e)}"
+        self.release()
+
+    """
+    Return the job with job_id, or None. Expired jobs are removed first.
+    """
+    def get(self, job_id):
+        self.prune()
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    """
+    Cancel a queued job or delete a finished one. Returns False if the job is running.
+    """
+    def delete(self, job):
+        if not job.future.done() and not job.future.cancel():
+            return False
+        with self._lock:
+            self.jobs.pop(job.id, None)
+        shutil.rmtree(job.directory, ignore_errors=True)
+        return True
+
+    """
+    Remove finished jobs older than job_ttl together with their files.
+    """
+    def prune(self):
+        expired_before = time.time() - self.job_ttl
+        with self._lock:
+            expired = [job for job in self.jobs.values() if job.finished and job.finished < expired_before]
+            for job in expired:
+                del self.jobs[job.id]
+        for job in expired:
+            shutil.rmtree(job.directory, ignore_errors=True)
+
+    """
+    Stop the worker pool and remove the work directory if the service created it.
+    """
+    def close(self):
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        if self._own_work_dir:
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+
+
+"""
+Pool initializer: import every converter (and pdf2docx) once per worker process.
+"""
+def _warm_worker():
+    for spec in CONVERTERS:
+        try:
+            spec.load()
+        except ImportError:
+            continue
+        if spec.name == 'PDF':
+            from .pdf_converter import HAS_PDF2DOCX
+            if HAS_PDF2DOCX:
+                import pdf2docx  # noqa: F401
+
+
+"""
+Return the converters and their formats, as served by /formats.
+"""
+def list_formats():
+    return [{'name': spec.name, 'input_formats': spec.input_formats, 'output_formats': spec.output_formats}
+            for spec in CONVERTERS]
+
+
+"""
+HTTP request handler of the conversion service (see the routes at the top of this module).
+"""
+class ConversionRequestHandler(BaseHTTPRequestHandler):
+
+    server_version = 'file-converter'
+    # Keep-alive connections; every response has a Content-Length
+    protocol_version = 'HTTP/1.1'
+
+    @property
+    def service(self):
+        return self.server.service
+
+    def do_GET(self):
+        parts = self._path_parts()
+        if parts == ['formats']:
+            self._send_json(200, list_formats())
+        elif len(parts) in (2, 3) and parts[0] == 'jobs':
+            job = self.service.get(parts[1])
+            if job is None:
+                self._send_error(404, f"Unknown job '{parts[1]}'")
+            elif len(parts) == 2:
+                self._send_json(200, job.to_dict())
+            elif parts[2] == 'result':
+                self._send_result(job)
+            else:
+                self._send_error(404, 'Not found')
+        else:
+            self._send_error(404, 'Not found')
+
+    def do_POST(self):
+        if self._path_parts() != ['jobs']:
+            self._send_error(404, 'Not found')
+            return
+
+        query = parse_qs(urlsplit(self.path).query)
+        filename = query.get('filename', [''])[0]
+        output_format = query.get('to', [''])[0].lower()
+        if output_format and not output_format.startswith('.'):
+            output_format = '.' + output_format
+        spec = get_spec(filename) if filename else None
+        if spec is None:
+            self._send_error(415, f"No converter for '{filename}'; pass the upload's name as ?filename=")
+            return
+        if not spec.can_write(output_format):
+            self._send_error(415, f"{spec.name} cannot be converted to '{output_format}'. "
+                                  f"Supported formats: {', '.join(spec.output_formats)}")
+            return
+
+        length = self.headers.get('Content-Length')
+        if length is None or not length.isdigit():
+            self._send_error(411, 'Content-Length is required')
+            return
+        length = int(length)
+        if length > self.service.max_upload_bytes:
+            self._send_error(413, f"Upload is larger than {self.service.max_upload_bytes} bytes")
+            return
+
+        # Refuse before reading the body, so a full queue costs the client nothing to retry
+        if not self.service.reserve():
+            self._send_error(429, 'The conversion queue is full, retry later', {'Retry-After': '1'})
+            return
+
+        job = None
+        try:
+            job = self.service.create_job(filename, output_format)
+            with open(job.input_path, 'wb') as f:
+                remaining = length
+                while remaining:
+                    block = self.rfile.read(min(COPY_BLOCK_SIZE, remaining))
+                    if not block:
+                        raise ConnectionError('upload ended early')
+                    f.write(block)
+                    remaining -= len(block)
+            self.service.submit(job)
+        except Exception as e:
+            self.service.release()
+            if job is not None:
+                shutil.rmtree(job.directory, ignore_errors=True)
+            self._send_error(400, f"Upload failed: {str(e)}")
+            return
+
+        self._send_json(202, job.to_dict(), {'Location': f'/jobs/{job.id}'})
+
+    def do_DELETE(self):
+        parts = self._path_parts()
+        job = self.service.get(parts[1]) if len(parts) == 2 and parts[0] == 'jobs' else None
+        if job is None:
+            self._send_error(404, 'Not found')
+        elif not self.service.delete(job):
+            self._send_error(409, 'The job is running')
+        else:
+            self._send_json(200, {'id': job.id, 'deleted': True})
+
+    """
+    Stream the converted file of a finished job to the client.
+    """
+    def _send_result(self, job):
+        status = job.status
+        if status != 'success':
+            self._send_json(409, job.to_dict())
+            return
+        extension = os.path.splitext(job.output_path)[1]
+        with open(job.output_path, 'rb') as f:
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPES.get(extension, 'application/octet-stream'))
+            self.send_header('Content-Length', str(os.fstat(f.fileno()).st_size))
+            self.send_header('Content-Disposition', content_disposition(os.path.basename(job.output_path)))
+            self.end_headers()
+            shutil.copyfileobj(f, self.wfile, COPY_BLOCK_SIZE)
+
+    def _path_parts(self):
+        return [part for part in urlsplit(self.path).path.split('/') if part]
+
+    def _send_json(self, code, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, code, message, headers=None):
+        if self.command == 'POST':
+            # The upload body was not read, so the connection cannot be reused
+            self.close_connection = True
+        self._send_json(code, {'error': message}, headers)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+"""
+Threaded HTTP server that hands requests to a ConversionService.
+"""
+class ConversionServer(ThreadingHTTPServer):
+
+    daemon_threads = True
+
+    def __init__(self, address, service, verbose=False):
+        super().__init__(address, ConversionRequestHandler)
+        self.service = service
+        self.verbose = verbose
+
+
+"""
+Run the service on host:port until interrupted. options go to ConversionService.
+"""
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, verbose=False, **options):
+    service = ConversionService(**options)
+    print(f"Starting {service.workers} worker process(es)...")
+    service.warm_up()
+    server = ConversionServer((host, port), service, verbose=verbose)
+    print(f"Serving conversions on http://{host}:{server.server_address[1]} "
+          f"(queue: {service.capacity} jobs, work directory: {service.work_dir})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Shutting down...")
+    finally:
+        server.server_close()
+        service.close()
@@ -0,0 +1,192 @@
+# Sniffer module - detects the layout of delimited text files from a small sample
+# The detected layout lets TXTConverter hand the file to pandas' fast C parser
+# (or the fixed-width reader) in a single pass, instead of guessing with regexes
+
+# Import codecs module for byte order marks and incremental decoding
+import codecs
+
+# Import csv module for quote-aware splitting of the sample lines
+import csv
+
+# Import io module to read the sample text like a file
+import io
+
+# Import re module to find the column names in a fixed-width header
+import re
+
+"""
+Number of bytes read from the head of the file to detect its layout.
+"""
+SAMPLE_SIZE = 64 * 1024
+
+"""
+Maximum number of sample lines that are examined.
+"""
+MAX_SAMPLE_LINES = 200
+
+"""
+Single-character delimiters that are tried, in order of preference.
+"""
+DELIMITERS = ['\t', ',', '|', ';']
+
+# Layout names for columns separated by runs of spaces, and for fixed-width columns
+WHITESPACE = 'whitespace'
+FIXED_WIDTH = 'fixed'
+
+
+"""
+Layout of a structured text file as detected by sniff_text_format().
+delimiter is one of DELIMITERS, WHITESPACE or FIXED_WIDTH.
+header tells whether the first line holds the column names.
+colspecs holds the (start, end) character positions of each column for FIXED_WIDTH.
+"""
+class TextFormat:
+
+    def __init__(self, delimiter, columns, header=True, colspecs=None):
+        self.delimiter = delimiter
+        self.columns = columns
+        self.header = header
+        self.colspecs = colspecs
+
+    def __repr__(self):
+        return (f"TextFormat(delimiter={self.delimiter!r}, columns={self.columns}, "
+                f"header={self.header}, colspecs={self.colspecs})")
+
+
+"""
+Byte order marks and the encodings they identify.
+UTF-32 marks are listed first because the UTF-32-LE mark starts with the UTF-16-LE mark.
+"""
+BYTE_ORDER_MARKS = [
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+
+"""
+Return up to sample_size bytes from the head of input_path, which is a file path
+or a streams.InputStream (whose sample is not consumed).
+"""
+def read_sample(input_path, sample_size=SAMPLE_SIZE):
+    if hasattr(input_path, 'sample'):
+        return input_path.sample(sample_size)
+    with open(input_path, 'rb') as f:
+        return f.read(sample_size)
+
+
+"""
+Detect the encoding of a text file from the bytes at its head.
+A byte order mark wins; otherwise NUL bytes in every other position mean UTF-16,
+a sample that decodes as UTF-8 means UTF-8, and anything else is read as latin-1.
+The decision is made once, so the file never has to be read a second time.
+"""
+def detect_encoding(input_path, sample_size=SAMPLE_SIZE):
+    sample = read_sample(input_path, sample_size)
+
+    for bom, encoding in BYTE_ORDER_MARKS:
+        if sample.startswith(bom):
+            return encoding
+
+    # ASCII text stored as UTF-16 without a BOM has a NUL byte next to every character
+    if len(sample) >= 4:
+        even_nuls = sample[0::2].count(0)
+        odd_nuls = sample[1::2].count(0)
+        if odd_nuls > len(sample) * 0.4 and even_nuls == 0:
+            return 'utf-16-le'
+        if even_nuls > len(sample) * 0.4 and odd_nuls == 0:
+            return 'utf-16-be'
+
+    try:
+        # final=False tolerates a multi-byte character cut in half at the end of the sample
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return 'latin-1'
+
+
+"""
+Read the head of a text file and detect its delimiter and header row.
+Returns a TextFormat, or None if the file does not look like a table
+(fewer than two lines, or no consistent column layout).
+"""
+def sniff_text_format(input_path, encoding='utf-8', sample_size=SAMPLE_SIZE):
+    # One byte more than the sample tells whether the sample is the whole file
+    sample = read_sample(input_path, sample_size + 1)
+    truncated = len(sample) > sample_size
+    sample = sample[:sample_size]
+
+    text = sample.decode(encoding, errors='replace')
+    # Drop the last line if the sample cut it in half
+    if truncated and '\n' in text:
+        text = text[:text.rindex('\n')]
+
+    lines = [line for line in text.splitlines() if line.strip()][:MAX_SAMPLE_LINES]
+    if len(lines) < 2:
+        return None
+
+    # Pick the delimiter that splits every sample line into the same, largest number of fields
+    best = None
+    for delimiter in DELIMITERS + [WHITESPACE]:
+        rows = _split_lines(lines, delimiter)
+        counts = {len(row) for row in rows}
+        if len(counts) == 1 and len(rows[0]) >= 2:
+            if best is None or len(rows[0]) > best[1]:
+                best = (delimiter, len(rows[0]), rows[0])
+
+    if best is not None:
+        delimiter, columns, first_row = best
+        return TextFormat(delimiter, columns, header=_looks_like_header(first_row))
+
+    # No delimiter works, so look for columns aligned under the names in a header row
+    colspecs = _fixed_width_colspecs(lines)
+    if colspecs is not None:
+        first_row = [lines[0][start:end].strip() for start, end in colspecs]
+        if _looks_like_header(first_row):
+            return TextFormat(FIXED_WIDTH, len(colspecs), header=True, colspecs=colspecs)
+
+    return None
+
+
+"""
+Split sample lines into fields with the given delimiter.
+"""
+def _split_lines(lines, delimiter):
+    if delimiter == WHITESPACE:
+        return [line.split() for line in lines]
+    # The csv module keeps quoted fields that contain the delimiter together
+    return list(csv.reader(io.StringIO('\n'.join(lines)), delimiter=delimiter))
+
+
+"""
+A first row that contains a number is data, not column names.
+"""
+def _looks_like_header(first_row):
+    for field in first_row:
+        try:
+            float(field)
+            return False
+        except ValueError:
+            continue
+    return True
+
+
+"""
+Use the words of the first line as column names and check that every sample line
+is blank just before each of them. Returns the (start, end) span of each column,
+or None if the lines are not aligned in at least two columns. Requiring a header
+keeps log files with aligned timestamps from being cut into bogus columns.
+"""
+def _fixed_width_colspecs(lines):
+    starts = [match.start() for match in re.finditer(r'\S+', lines[0])]
+    if len(starts) < 2:
+        return None
+
+    for start in starts[1:]:
+        if any(start - 1 < len(line) and line[start - 1] != ' ' for line in lines):
+            return None
+
+    # Each column runs up to the start of the next one; the last one to the end of the line
+    return [(start, end) for start, end in zip(starts, starts[1:] + [None])]
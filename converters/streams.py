@@ -0,0 +1,258 @@
+# Streams module - lets converters read from and write to file-like objects
+# Besides a file path, a converter's input and output can be a binary file-like object
+# (an upload, a socket file, io.BytesIO) or '-' for stdin/stdout. Readers that accept
+# file objects (pandas, zipfile, PyMuPDF) are given the stream directly, so the data
+# never makes a round-trip through a temporary file
+
+# Import io module for the stream wrappers
+import io
+
+# Import os module for path handling
+import os
+
+# Import sys module for stdin and stdout
+import sys
+
+# Import the compression helpers for outputs such as data.json.gz
+from .compression import open_compressed, resolve_level, split_compression
+
+"""
+The name that stands for stdin (as input) or stdout (as output).
+"""
+STDIO = '-'
+
+
+"""
+Return True if target is '-' or a file-like object rather than a file path.
+"""
+def is_stream(target):
+    if isinstance(target, (str, bytes, os.PathLike)):
+        return target == STDIO
+    return hasattr(target, 'read') or hasattr(target, 'write')
+
+
+"""
+Return a printable name for a path or stream; stdio_name is used for '-'.
+"""
+def describe(target, stdio_name='<stdio>'):
+    if target == STDIO:
+        return stdio_name
+    if not is_stream(target):
+        return os.fspath(target)
+    name = getattr(target, 'name', None)
+    return name if isinstance(name, str) else f'<{type(target).__name__}>'
+
+
+"""
+Return the lower-case extension that selects the output format of target.
+output_format (e.g. '.json' or 'json') wins; otherwise the extension of the path,
+or of the name of a file object. A compression suffix is skipped, so 'data.json.gz'
+and '.json.gz' both give '.json'. Returns '' when the format cannot be told.
+"""
+def get_extension(target, output_format=None):
+    if output_format:
+        return split_compression('.' + output_format.lower().lstrip('.'))[0]
+    name = _get_name(target)
+    return os.path.splitext(split_compression(name)[0])[1].lower() if name is not None else ''
+
+
+"""
+Return the compression of target ('gzip', 'bz2', 'xz' or 'zstd') as told by the
+compression suffix of output_format or, without output_format, of target's name;
+None if the output is not compressed.
+"""
+def get_compression(target, output_format=None):
+    if output_format:
+        return split_compression(output_format.lower())[1]
+    name = _get_name(target)
+    return split_compression(name)[1] if name is not None else None
+
+
+"""
+Return the file name of a path or file object, or None for '-' and nameless streams.
+"""
+def _get_name(target):
+    name = getattr(target, 'name', None) if is_stream(target) else target
+    if target == STDIO or not isinstance(name, (str, os.PathLike)):
+        return None
+    return os.fspath(name)
+
+
+"""
+Open target for writing. A path is opened as a file; for '-' (stdout) or a binary
+file-like object a wrapper is returned whose close() flushes but leaves the stream
+open, so the caller stays in charge of it. mode is 'w' (text) or 'wb'.
+With compression (see compression.py) the output is compressed as it is written,
+at compresslevel or the compression's default level.
+"""
+def open_output(target, mode='w', encoding='utf-8', newline=None, compression=None, compresslevel=None):
+    if compression is not None:
+        # An invalid level fails before the output file is created
+        compresslevel = resolve_level(compression, compresslevel)
+    elif not is_stream(target):
+        if 'b' in mode:
+            return open(target, mode)
+        return open(target, mode, encoding=encoding, newline=newline)
+
+    if is_stream(target):
+        stream = _BorrowedStream(sys.stdout.buffer if target == STDIO else target)
+    else:
+        stream = open(target, 'wb')
+    if compression is not None:
+        stream = open_compressed(stream, compression, compresslevel)
+    if 'b' in mode:
+        return stream
+    return io.TextIOWrapper(stream, encoding=encoding, newline=newline, write_through=True)
+
+
+"""
+A converter input given as '-' (stdin) or a binary file-like object.
+Sniffers look at sample() before the input is parsed; reader() then returns the
+input from its start. Seekable streams are rewound for every reader. A stream that
+cannot seek (a pipe) is read only once: its sample is kept and replayed in front of
+the rest, and a second reader() raises ValueError.
+"""
+class InputStream:
+
+    def __init__(self, source):
+        self.stream = sys.stdin.buffer if source == STDIO else source
+        self.name = describe(source, '<stdin>')
+        self._start = self.stream.tell() if _is_seekable(self.stream) else None
+        self._head = b''
+        self._eof = False
+        self._consumed = False
+        self._data = None
+
+    """
+    Return up to size bytes from the head of the input without consuming them.
+    """
+    def sample(self, size):
+        if self._start is not None:
+            self.stream.seek(self._start)
+            data = self.stream.read(size)
+            self.stream.seek(self._start)
+            return data
+        if self._consumed:
+            raise ValueError(f"{self.name} was already read")
+        while len(self._head) < size and not self._eof:
+            data = self.stream.read(size - len(self._head))
+            if not data:
+                self._eof = True
+            self._head += data
+        return self._head[:size]
+
+    """
+    Return a buffered binary file object that reads the input from its start.
+    Closing it leaves the underlying stream open.
+    """
+    def reader(self):
+        if self._start is not None:
+            self.stream.seek(self._start)
+            return io.BufferedReader(_BorrowedStream(self.stream))
+        if self._consumed:
+            raise ValueError(f"{self.name} cannot be read twice because it does not support seeking")
+        self._consumed = True
+        head, self._head = self._head, b''
+        return io.BufferedReader(_BorrowedStream(self.stream, head))
+
+    """
+    Return the whole input as bytes (for readers such as PyMuPDF that take a buffer).
+    The bytes are kept, so later calls do not read the stream again.
+    """
+    def read_all(self):
+        if self._data is None:
+            with self.reader() as f:
+                self._data = f.read()
+        return self._data
+
+    """
+    Return an InputStream that can be read any number of times: this one if it can
+    seek, otherwise one over the whole input read into memory.
+    """
+    def replayable(self):
+        if self._start is not None:
+            return self
+        stream = InputStream(io.BytesIO(self.read_all()))
+        stream.name = self.name
+        return stream
+
+    """
+    Return a seekable binary file object with the input, as zipfile needs one.
+    Seekable streams are used in place; others are read into memory.
+    """
+    def seekable_file(self):
+        if self._start is not None:
+            self.stream.seek(self._start)
+            return _BorrowedStream(self.stream)
+        return io.BytesIO(self.read_all())
+
+
+def _is_seekable(stream):
+    try:
+        return stream.seekable()
+    except (AttributeError, ValueError):
+        return False
+
+
+"""
+Return True if stream can do operation ('read' or 'write'); file objects tell it
+through readable()/writable(), minimal file-likes just have the method.
+"""
+def _supports(stream, operation):
+    check = getattr(stream, operation + 'able', None)
+    if check is not None:
+        try:
+            return check()
+        except ValueError:
+            return False
+    return hasattr(stream, operation)
+
+
+"""
+Raw stream that passes reads, writes and seeks to a stream it does not own:
+closing it only flushes. Optional head bytes are returned before the stream's own data.
+"""
+class _BorrowedStream(io.RawIOBase):
+
+    def __init__(self, stream, head=b''):
+        super().__init__()
+        self._stream = stream
+        self._head = head
+
+    def readable(self):
+        return _supports(self._stream, 'read')
+
+    def writable(self):
+        return _supports(self._stream, 'write')
+
+    def seekable(self):
+        return not self._head and _is_seekable(self._stream)
+
+    def readinto(self, buffer):
+        if self._head:
+            size = min(len(buffer), len(self._head))
+            buffer[:size] = self._head[:size]
+            self._head = self._head[size:]
+            return size
+        data = self._stream.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def write(self, data):
+        self._stream.write(data)
+        return len(data)
+
+    def tell(self):
+        return self._stream.tell()
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        return self._stream.seek(offset, whence)
+
+    def flush(self):
+        if not self.closed and hasattr(self._stream, 'flush'):
+            self._stream.flush()
+
+    def close(self):
+        if not self.closed:
+            self.flush()
+        super().close()
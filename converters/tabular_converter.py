@@ -0,0 +1,170 @@
+# Tabular Converter module - shared base class for converters whose input is a table (CSV, TXT)
+
+# Import ExitStack so every opened writer is closed even if one of them fails
+from contextlib import ExitStack
+
+# Import the base converter class and the default size of a preview
+from .base_converter import PREVIEW_ROWS, BaseConverter
+
+# Import the streaming writers that receive the table chunk by chunk
+from .writers import DEFAULT_CHUNKSIZE, get_writer
+
+# Import describe to name stream outputs in progress messages
+from .streams import describe
+
+"""
+Widest column shown in a preview, in characters.
+"""
+PREVIEW_COLUMN_WIDTH = 40
+
+"""
+Base class for converters that read their input as a table of rows.
+Subclasses only implement read_chunks(); parsing happens once per conversion and
+every chunk is fed to all requested output writers in the same pass.
+"""
+class TabularConverter(BaseConverter):
+
+    # Name of the input format, used in progress and error messages
+    format_name = 'tabular'
+
+    # Whether JSON output escapes non-ASCII characters
+    force_ascii = True
+
+    # Extra lines printed after a conversion error to help the user
+    error_hints = []
+
+    """
+    Initializes the converter with an input file path.
+    chunksize is the number of rows parsed at a time.
+    xlsx_engine selects the constant-memory Excel backend ('openpyxl' or 'xlsxwriter').
+    compresslevel is the level of compressed outputs such as data.json.gz (None for the default).
+    profile=True writes a cProfile/tracemalloc report next to the output (see profiling.py).
+    """
+    def __init__(self, input_path, chunksize=DEFAULT_CHUNKSIZE, xlsx_engine='openpyxl', compresslevel=None,
+                 profile=False):
+        super().__init__(input_path, compresslevel=compresslevel, profile=profile)
+        self.chunksize = chunksize
+        self.xlsx_engine = xlsx_engine
+
+    """
+    Generator that parses the input file and yields it as pandas DataFrame chunks.
+    Every subclass must implement this method.
+    """
+    def read_chunks(self):
+        raise NotImplementedError
+
+    """
+    Return the first limit rows of the table as text, as the converter parses them.
+    The reader is asked for one chunk of limit rows and closed, so the rest of the
+    file is never read.
+    """
+    def preview(self, limit=PREVIEW_ROWS):
+        chunksize, self.chunksize = self.chunksize, limit
+        try:
+            chunks = self.read_chunks()
+            try:
+                chunk = next(chunks, None)
+            finally:
+                chunks.close()
+                self.close_inputs()
+        finally:
+            self.chunksize = chunksize
+        if chunk is None or chunk.empty:
+            return '(no rows)'
+        return chunk.to_string(index=False, max_colwidth=PREVIEW_COLUMN_WIDTH)
+
+    """
+    Parse the input and feed every chunk to all writers.
+    Parsing is timed as the read stage, rendering chunks to text as the transform
+    stage and writing as the write stage.
+    Progress is reported and cancellation checked after every chunk.
+    Subclasses can override this to parse in a different way (e.g. in parallel).
+    """
+    def write_chunks(self, writers):
+        formatters = [writer.get_formatter() for writer in writers]
+        for chunk in self.result.timed(self.read_chunks(), 'read'):
+            for writer, formatter in zip(writers, formatters):
+                # The first chunk always goes through write(), which also writes the CSV header
+                if formatter is None or not writer.rows_written:
+                    with self.result.stage('write'):
+                        writer.write(chunk)
+                else:
+                    function, options = formatter
+                    with self.result.stage('transform'):
+                        text = function(chunk, **options)
+                    with self.result.stage('write'):
+                        writer.write_formatted(text, len(chunk))
+            self.report_progress(rows=writers[0].rows_written)
+
+    """
+    Convert the input file to a single output format.
+    """
+    def _convert(self, output_path):
+        return self._convert_many([output_path])
+
+    """
+    Convert the input file to several output formats while parsing it only once.
+    Stream outputs must have a file name that tells their format. on_progress and
+    cancel_token work as in convert().
+    Returns a ConversionResult, which is truthy if every output file was written successfully.
+    """
+    def convert_many(self, output_paths, on_progress=None, cancel_token=None):
+        self.output_format = None
+        self.on_progress = on_progress
+        self.cancel_token = cancel_token
+        return self.run_conversion(output_paths, lambda: self._convert_many(output_paths))
+
+    """
+    Does the work of convert_many() and returns True or False.
+    """
+    def _convert_many(self, output_paths):
+        try:
+            # Store the output path for later use (the first one for multiple outputs)
+            self.output_path = output_paths[0] if output_paths else None
+
+            # Check if the input file exists before attempting to convert
+            if not self.validate_input():
+                self.report_error(f"Error: Input file '{self.input_path}' does not exist.")
+                return False
+
+            # Check every output format up front, before any parsing work is done
+            writers = []
+            for output_path in output_paths:
+                file_extension = self.get_output_extension(output_path)
+                if file_extension not in self.get_supported_formats():
+                    self.report_error(f"Error: Unsupported output format '{file_extension}'")
+                    print(f"Supported formats: {', '.join(self.get_supported_formats())}")
+                    return False
+                writers.append(get_writer(output_path, force_ascii=self.force_ascii, xlsx_engine=self.xlsx_engine,
+                                          output_format=file_extension,
+                                          compression=self.get_output_compression(output_path),
+                                          compresslevel=self.compresslevel))
+
+            if not writers:
+                self.report_error("Error: No output files were given")
+                return False
+
+            formats = ', '.join(self.get_output_extension(path).lstrip('.').upper() for path in output_paths)
+            print(f"Reading {self.format_name} file: {self.input_name}")
+            print(f"Converting to {formats} format...")
+
+            # Parse the input once and hand every chunk to all writers
+            with ExitStack() as stack:
+                for writer in writers:
+                    stack.enter_context(writer)
+                self.write_chunks(writers)
+                # Closing the writers (e.g. saving the Excel workbook) is part of the write stage
+                with self.result.stage('write'):
+                    stack.close()
+            self.result.rows = max(writer.rows_written for writer in writers)
+
+            for output_path in output_paths:
+                print(f"Conversion successful! File saved to: {describe(output_path, '<stdout>')}")
+            return True
+
+        except Exception as e:
+            # If any error occurs during conversion, catch and print the error message
+            self.report_error(f"Error during {self.format_name} conversion: {str(e)}")
+            for hint in self.error_hints:
+                print(hint)
+            return False
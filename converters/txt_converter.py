@@ -1,109 +1,177 @@
 # TXT Converter module - converts plain text files to other formats
 
+# Import io module to decode a binary input as text
+import io
+
 # Import pandas library for working with data files
 import pandas as pd
 
-# Import base converter class that we created earlier
-from .base_converter import BaseConverter
+# Import the tabular base class that streams chunks to the output writers
+from .tabular_converter import TabularConverter
+
+# Import the sniffer that detects the delimiter and header row from a sample
+from .sniffer import FIXED_WIDTH, WHITESPACE, detect_encoding, sniff_text_format
 
-# Import os module for file operations and path handling
-import os
+# Import the spare column that catches lines with more fields than the layout
+from .parallel import EXTRA_COLUMN
 
 """
 Converter class for handling plain text (.txt) file conversions.
-Can convert text files to CSV, Excel, or JSON formats.
+Can convert text files to CSV, Excel, JSON, or JSON Lines formats.
 Assumes the text file has structured data with delimiters (like spaces or tabs).
 """
-class TXTConverter(BaseConverter):
+class TXTConverter(TabularConverter):
+
+    format_name = 'TXT'
+
+    # Keep non-English characters readable in JSON output
+    force_ascii = False
+
+    error_hints = [
+        "Make sure your text file has structured data with clear delimiters",
+        "(like spaces, tabs, or commas separating columns)",
+    ]
 
     """
     Return the file formats that text files can be converted to.
     """
     def get_supported_formats(self):
         # TXT can be converted to these formats
-        return ['.csv', '.xlsx', '.json']
+        return ['.csv', '.xlsx', '.json', '.jsonl', '.ndjson']
 
     """
-    Convert a plain text file to another format (CSV, Excel, or JSON).
+    Parse the text file and yield it as DataFrame chunks.
+    A sample from the head of the file decides the layout, which is checked against the
+    whole file before anything is written; a file it does not fit is read as plain text.
     """
-    def convert(self, output_path):
-        try:
-            # Stores the output path for later use
-            self.output_path = output_path
-            
-            # Checks if the input file exists before attempting to convert
-            if not self.validate_input():
-                print(f"Error: Input file '{self.input_path}' does not exist.")
-                return False
-            
-            print(f"Reading text file: {self.input_path}")
-            
-            # Try to parse the text file as structured data first (whitespace-delimited)
-            # '\\s+' is a regular expression that matches one or more whitespace characters
-            delimiter = '\\s+'
-            df = None
+    def read_chunks(self):
+        # Streams are sniffed through their InputStream, which keeps the sample for the parser,
+        # and compressed inputs through a sample of their decompressed head
+        source = self.sample_source()
+
+        # Decide the encoding once from the head of the file (byte order mark or byte sniff)
+        encoding = detect_encoding(source)
+
+        # Try to parse the text file as structured data first
+        text_format = sniff_text_format(source, encoding=encoding)
+        if text_format is not None and self.input_stream is not None:
+            # The layout check and the plain text fallback read the input again, which a
+            # stream that cannot seek (such as stdin) only allows if it is kept in memory
+            self.input_stream = self.input_stream.replayable()
+        if text_format is not None and not self.layout_fits(text_format, encoding):
+            print(f"Found lines that do not fit the {self.describe_format(text_format)} of the head of the file")
+            text_format = None
+        if text_format is not None:
+            chunks = self.read_structured_chunks(text_format, encoding)
             try:
-                df = pd.read_csv(self.input_path, sep=delimiter, engine='python')
+                first_chunk = next(chunks, None)
             except Exception:
                 # If pandas cannot parse the file as structured data, fall back to plain text
-                df = None
-
-            # Fallback: treat the file as unstructured plain text and split into lines
-            if df is None or df.empty:
-                try:
-                    with open(self.input_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                except Exception:
-                    # Try reading with locale/default encoding if utf-8 fails
-                    with open(self.input_path, 'r', encoding='latin-1') as f:
-                        content = f.read()
-
-                # Split into lines; keep non-empty lines to make CSV/XLSX rows
-                lines = content.splitlines()
-                if len(lines) == 0:
-                    print("Warning: input TXT is empty")
-                    df = pd.DataFrame({'text': []})
-                else:
-                    df = pd.DataFrame({'text': lines})
-            
-            # Extracts the file extension from the output path
-            # For example: 'myfile.csv' -> '.csv'
-            # os.path.splitext() returns a tuple: (filename, extension)
-            file_extension = os.path.splitext(output_path)[1].lower()
-            
-            # Converts to the appropriate format based on the file extension
-            if file_extension == '.csv':
-                # Converts to CSV format
-                print("Converting to CSV format...")
-                # index=False means don't save the row numbers as a column
-                df.to_csv(output_path, index=False)
-                
-            elif file_extension == '.xlsx':
-                # Converts to Excel format
-                print("Converting to Excel format...")
-                # index=False means don't save the row numbers as a column
-                # engine='openpyxl' tells pandas to use the openpyxl library for Excel files
-                df.to_excel(output_path, index=False, engine='openpyxl')
-                
-            elif file_extension == '.json':
-                # Converts to JSON format
-                print("Converting to JSON format...")
-                # orient='records' means each row becomes a separate object
-                # indent=2 makes the JSON file readable with proper indentation
-                df.to_json(output_path, orient='records', indent=2, force_ascii=False)
-                
-            else:
-                # If the file extension is not supported, show an error
-                print(f"Error: Unsupported output format '{file_extension}'")
-                print(f"Supported formats: {', '.join(self.get_supported_formats())}")
-                return False
-            
-            print(f"Conversion successful! File saved to: {output_path}")
+                first_chunk = None
+
+            if first_chunk is not None and not first_chunk.empty:
+                yield first_chunk
+                yield from chunks
+                return
+
+        # Fallback: treat the file as unstructured plain text
+        yield from self.read_plain_text_chunks(encoding)
+
+    """
+    Parse a structured text file in chunks with the layout found by the sniffer.
+    Delimited files go to pandas' C parser, fixed-width files to pandas' fixed-width reader.
+    """
+    def read_structured_chunks(self, text_format, encoding='utf-8'):
+        print(f"Detected {self.describe_format(text_format)}")
+
+        # Undecodable bytes further into the file are replaced instead of failing the conversion
+        options = {'chunksize': self.chunksize, 'encoding': encoding, 'encoding_errors': 'replace'}
+        if text_format.header:
+            options['header'] = 0
+        else:
+            # Files without a header row get numbered column names
+            options['header'] = None
+            options['names'] = [f'column{i}' for i in range(1, text_format.columns + 1)]
+
+        if text_format.delimiter == FIXED_WIDTH:
+            reader = pd.read_fwf(self.input_source(), colspecs=text_format.colspecs, **options)
+        elif text_format.delimiter == WHITESPACE:
+            # '\\s+' is a regular expression that matches one or more whitespace characters
+            # The C engine handles this separator natively, without the slow python engine
+            reader = pd.read_csv(self.input_source(), sep='\\s+', engine='c', **options)
+        else:
+            reader = pd.read_csv(self.input_source(), sep=text_format.delimiter, engine='c', **options)
+
+        with reader:
+            for chunk in reader:
+                yield chunk
+
+    """
+    Return True if no line of the file has more fields than text_format, the layout
+    found in the sample, so a table conversion cannot fail part way through the file.
+    The lines are parsed with one spare column, which gets a value from a line that is
+    too long (pandas would drop its extra fields at the start of a chunk). Fixed-width
+    lines always fit, as they are cut at the column positions.
+    """
+    def layout_fits(self, text_format, encoding='utf-8'):
+        if text_format.delimiter == FIXED_WIDTH:
             return True
-            
-        except Exception as e:
-            # If any error occurs during conversion, catch and print the error message
-            print(f"Error during TXT conversion: {str(e)}")
-            print("Make sure your text file has structured data with clear delimiters")
-            print("(like spaces, tabs, or commas separating columns)")
+
+        sep = '\\s+' if text_format.delimiter == WHITESPACE else text_format.delimiter
+        names = [f'column{i}' for i in range(1, text_format.columns + 1)] + [EXTRA_COLUMN]
+        try:
+            with pd.read_csv(self.input_source(), sep=sep, engine='c', chunksize=self.chunksize, encoding=encoding,
+                             encoding_errors='replace', header=None, skiprows=1 if text_format.header else 0,
+                             names=names, index_col=False) as reader:
+                for chunk in reader:
+                    if chunk[EXTRA_COLUMN].notna().any():
+                        return False
+                    if self.cancel_token is not None:
+                        self.cancel_token.raise_if_cancelled()
+        except ValueError:
+            # pandas' parser errors are ValueErrors
             return False
+        finally:
+            # Progress counts the bytes of the conversion itself, which reads the input again
+            if self._input_counter is not None:
+                self._input_counter.count = 0
+        return True
+
+    """
+    Return a readable description of a detected layout, used in progress messages.
+    """
+    def describe_format(self, text_format):
+        names = {
+            '\t': 'tab-separated',
+            ',': 'comma-separated',
+            '|': 'pipe-separated',
+            ';': 'semicolon-separated',
+            WHITESPACE: 'whitespace-separated',
+            FIXED_WIDTH: 'fixed-width',
+        }
+        header = 'with' if text_format.header else 'without'
+        return f"{text_format.columns} {names[text_format.delimiter]} columns ({header} header row)"
+
+    """
+    Read the file as unstructured plain text with one row per line in a 'text' column.
+    Lines are read one at a time and yielded in chunks of self.chunksize rows,
+    so only one chunk of a large log file is held in memory.
+    """
+    def read_plain_text_chunks(self, encoding='utf-8'):
+        lines = []
+        yielded = False
+
+        # errors='replace' keeps a stray invalid byte from forcing a second read of the file
+        with io.TextIOWrapper(self.open_input(), encoding=encoding, errors='replace') as f:
+            for line in f:
+                lines.append(line.rstrip('\n'))
+                if len(lines) >= self.chunksize:
+                    yield pd.DataFrame({'text': lines})
+                    lines = []
+                    yielded = True
+
+        if not lines and not yielded:
+            print("Warning: input TXT is empty")
+        # The last partial chunk (or an empty table for an empty file)
+        if lines or not yielded:
+            yield pd.DataFrame({'text': lines})
@@ -0,0 +1,563 @@
+# Watch module - keeps an output folder in step with an input folder
+# Files dropped into the input folder are converted into the output folder as soon as
+# they have stopped changing for a short while (debounce). Changes are picked up with
+# inotify on Linux and by polling the folder's modification times elsewhere.
+# A manifest in the output folder records the size, modification time, content hash and
+# output of every converted input, so after a restart only new or changed files are
+# converted again: unchanged files are recognised by their size and modification time
+# alone, and a file that was only touched is recognised by its hash
+
+# Import contextlib and ctypes to call inotify through the C library
+import contextlib
+import ctypes
+import ctypes.util
+
+# Import hashlib module to hash the input files
+import hashlib
+
+# Import json module to read and write the manifest
+import json
+
+# Import os module for file operations and path handling
+import os
+
+# Import select module to wait for inotify events with a timeout
+import select
+
+# Import struct module to decode inotify events
+import struct
+
+# Import sys module to detect the platform
+import sys
+
+# Import tempfile module to write the manifest atomically
+import tempfile
+
+# Import time module for the debounce and polling intervals
+import time
+
+# Import the process pool that runs the conversions, and the error of a pool whose worker died
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Import the batch worker and helpers shared with batch mode
+from .batch import (BatchItem, BatchSummary, _convert_task, get_output_path, normalize_format,
+                    print_item)
+
+# Import the hashing block size and default budget of the conversion cache
+from .cache import DEFAULT_MAX_BYTES, HASH_BLOCK_SIZE
+
+# Import the registry that maps input extensions to converters
+from .registry import get_spec
+
+"""
+Seconds a file must stay unchanged before it is converted, and between two scans
+of the folder when polling.
+"""
+DEFAULT_DEBOUNCE = 1.0
+DEFAULT_POLL_INTERVAL = 1.0
+
+"""
+File name of the manifest in the output folder; bump MANIFEST_VERSION when its format changes.
+"""
+MANIFEST_NAME = '.file-converter-manifest.json'
+MANIFEST_VERSION = 1
+
+"""
+Least number of seconds between two saves of the manifest while conversions finish.
+"""
+MANIFEST_SAVE_INTERVAL = 2.0
+
+"""
+inotify flags (see inotify(7)) and the layout of an event.
+"""
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+INOTIFY_EVENT = struct.Struct('iIII')
+
+
+"""
+Return the SHA-256 hex digest of a file's content.
+"""
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+"""
+The record of converted inputs, stored as JSON. Entries are keyed by the input's
+path relative to the watched folder and hold its size, mtime_ns, sha256, output
+path, output format and whether the conversion succeeded. Failed conversions are
+recorded too, so an unchanged broken file is not retried on every restart.
+"""
+class Manifest:
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self.dirty = False
+        if os.path.isfile(path):
+            try:
+                with open(path, encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == MANIFEST_VERSION:
+                    self.entries = data['files']
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Warning: ignoring unreadable manifest {path}: {str(e)}")
+
+    def get(self, relative):
+        return self.entries.get(relative)
+
+    def set(self, relative, entry):
+        self.entries[relative] = entry
+        self.dirty = True
+
+    def remove(self, relative):
+        if self.entries.pop(relative, None) is not None:
+            self.dirty = True
+
+    """
+    Write the manifest if it changed: to a temporary file that is renamed into place,
+    so a crash never leaves a half-written manifest behind.
+    """
+    def save(self):
+        if not self.dirty:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.manifest-', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'version': MANIFEST_VERSION, 'files': self.entries}, f)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(temp_path)
+            raise
+        self.dirty = False
+
+
+"""
+Finds changes by scanning the whole folder every poll_interval seconds.
+wait() returns None when the folder should be scanned, otherwise an empty set.
+"""
+class PollingWatcher:
+
+    def __init__(self, poll_interval=DEFAULT_POLL_INTERVAL):
+        self.poll_interval = poll_interval
+        self._next_scan = time.monotonic() + poll_interval
+
+    def wait(self, timeout):
+        now = time.monotonic()
+        time.sleep(max(0.0, min(timeout, self._next_scan - now)))
+        if time.monotonic() < self._next_scan:
+            return set()
+        self._next_scan = time.monotonic() + self.poll_interval
+        return None
+
+    def close(self):
+        pass
+
+
+"""
+Finds changes with Linux inotify. wait() returns the paths that changed, or None when
+the folder must be scanned again (a new subdirectory, or the kernel's event queue overflowed).
+"""
+class InotifyWatcher:
+
+    def __init__(self, directory, recursive, libc):
+        self.recursive = recursive
+        self._libc = libc
+        self._watches = {}
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise _errno_error('inotify_init1')
+        try:
+            self._add_tree(directory)
+        except OSError:
+            self.close()
+            raise
+
+    def wait(self, timeout):
+        if not select.select([self._fd], [], [], timeout)[0]:
+            return set()
+        paths = set()
+        rescan = False
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+                name = data[offset + INOTIFY_EVENT.size:offset + INOTIFY_EVENT.size + length].rstrip(b'\0')
+                offset += INOTIFY_EVENT.size + length
+                if mask & IN_Q_OVERFLOW:
+                    rescan = True
+                    continue
+                if mask & IN_IGNORED:
+                    self._watches.pop(wd, None)
+                    continue
+                directory = self._watches.get(wd)
+                if directory is None or not name:
+                    continue
+                path = os.path.join(directory, os.fsdecode(name))
+                if mask & IN_ISDIR:
+                    if self.recursive and mask & (IN_CREATE | IN_MOVED_TO):
+                        # Files may have landed in the directory before its watch was added
+                        with contextlib.suppress(OSError):
+                            self._add_tree(path)
+                        rescan = True
+                    continue
+                paths.add(path)
+        return None if rescan else paths
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def _add_tree(self, directory):
+        self._add(directory)
+        if self.recursive:
+            for root, names, _ in os.walk(directory):
+                for name in names:
+                    self._add(os.path.join(root, name))
+
+    def _add(self, directory):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            raise _errno_error(f"inotify_add_watch({directory})")
+        self._watches[wd] = directory
+
+
+"""
+Return an InotifyWatcher for directory, or a PollingWatcher when inotify is not
+available (not Linux, or out of inotify watches) or polling=True.
+"""
+def create_watcher(directory, recursive=False, poll_interval=DEFAULT_POLL_INTERVAL, polling=False):
+    libc = None if polling else _load_inotify()
+    if libc is not None:
+        try:
+            return InotifyWatcher(directory, recursive, libc)
+        except OSError as e:
+            print(f"Warning: inotify unavailable ({str(e)}), polling every {poll_interval:g} s instead")
+    return PollingWatcher(poll_interval)
+
+
+def _load_inotify():
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+    except OSError:
+        return None
+    return libc if hasattr(libc, 'inotify_init1') else None
+
+
+def _errno_error(call):
+    code = ctypes.get_errno()
+    return OSError(code, f"{call}: {os.strerror(code)}")
+
+
+"""
+Worker function: hash the input and convert it unless its content is what was converted
+before (previous_hash) and the output is still there. Returns (sha256, BatchItem or None).
+"""
+def _watch_task(task):
+    input_path, output_path, size, cache_options, profile, compresslevel, previous_hash = task
+    try:
+        digest = hash_file(input_path)
+    except OSError as e:
+        return None, BatchItem(input_path, output_path, size, False, 0.0, f"Error: {str(e)}\n")
+    if digest == previous_hash and os.path.isfile(output_path):
+        return digest, None
+    return digest, _convert_task((input_path, output_path, size, cache_options, profile, compresslevel))
+
+
+"""
+Converts the files of input_dir into output_dir as they appear or change. See watch_folder().
+"""
+class FolderWatch:
+
+    def __init__(self, input_dir, output_dir, target_format, jobs=None, recursive=False,
+                 debounce=DEFAULT_DEBOUNCE, cache_dir=None, cache_max_bytes=DEFAULT_MAX_BYTES,
+                 manifest_path=None, profile=False, compresslevel=None):
+        self.input_dir = input_dir
+        self.output_dir = output_dir
+        self.target_format = normalize_format(target_format)
+        self.jobs = jobs if jobs and jobs > 0 else os.cpu_count() or 1
+        self.recursive = recursive
+        self.debounce = debounce
+        self.profile = profile
+        self.compresslevel = compresslevel
+        self.cache_options = {'directory': cache_dir, 'max_bytes': cache_max_bytes} if cache_dir else None
+        self.manifest = Manifest(manifest_path or os.path.join(output_dir, MANIFEST_NAME))
+        self.items = []
+        self.skipped = set()
+        # relative path -> ((size, mtime_ns), monotonic time the file was first seen like that)
+        self._pending = {}
+        # future -> (relative path, (size, mtime_ns), output path, executor it was submitted to)
+        self._running = {}
+        self._executor = None
+        self._last_save = time.monotonic()
+
+    """
+    Watch until stop() is called from another thread or, with once=True, until every
+    file that is in the folder at the start has been handled. Returns a BatchSummary.
+    If a worker process dies, the files whose conversions it took down are not recorded
+    in the manifest, so they are tried again when they change or the watch restarts,
+    and a new pool takes over.
+    """
+    def run(self, watcher, once=False):
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._stopped = False
+        start = time.perf_counter()
+        changes = None
+        self._executor = ProcessPoolExecutor(max_workers=self.jobs)
+        try:
+            while not self._stopped:
+                if changes is None:
+                    self.scan()
+                else:
+                    for path in changes:
+                        self.check(path)
+                self._dispatch()
+                self._collect()
+                if once and not self._pending and not self._running:
+                    break
+                changes = watcher.wait(self._wait_timeout())
+        finally:
+            for future in self._running:
+                future.cancel()
+            self.manifest.save()
+            self._executor.shutdown()
+        return BatchSummary(self.items, sorted(self.skipped), time.perf_counter() - start, self.jobs)
+
+    """
+    Ask run() to return after its current step.
+    """
+    def stop(self):
+        self._stopped = True
+
+    """
+    Check every file in the folder, and forget manifest entries of files that are gone.
+    """
+    def scan(self):
+        seen = set()
+        for path in self._list_files():
+            seen.add(os.path.relpath(path, self.input_dir))
+            self.check(path)
+        for relative in list(self.manifest.entries):
+            if relative not in seen:
+                self.manifest.remove(relative)
+
+    """
+    Look at one input path that may have been created, changed or deleted, and queue it
+    for conversion if the manifest does not already cover its current size and mtime
+    (with an output that still exists, or a failure).
+    """
+    def check(self, path):
+        relative = os.path.relpath(path, self.input_dir)
+        if not self._is_candidate(path):
+            return
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            self._pending.pop(relative, None)
+            self.manifest.remove(relative)
+            return
+        signature = (stat.st_size, stat.st_mtime_ns)
+        entry = self.manifest.get(relative)
+        # An unchanged file is skipped if it was converted, or if it failed and would fail again
+        if (entry is not None and (entry['size'], entry['mtime_ns']) == signature
+                and entry['format'] == self.target_format
+                and (not entry['ok'] or os.path.isfile(entry['output']))):
+            self._pending.pop(relative, None)
+            return
+        if relative not in self._pending or self._pending[relative][0] != signature:
+            # A file that was last modified long ago is already settled
+            settled = time.time() - stat.st_mtime_ns / 1e9 >= self.debounce
+            since = time.monotonic() - (self.debounce if settled else 0)
+            self._pending[relative] = (signature, since)
+
+    def _list_files(self):
+        if self.recursive:
+            for root, names, files in os.walk(self.input_dir):
+                # Do not descend into the output folder when it lies inside the input folder
+                names[:] = [name for name in names if not self._is_output_dir(os.path.join(root, name))]
+                for name in files:
+                    yield os.path.join(root, name)
+        else:
+            for entry in os.scandir(self.input_dir):
+                if entry.is_file():
+                    yield entry.path
+
+    def _is_output_dir(self, path):
+        return os.path.abspath(path) == os.path.abspath(self.output_dir)
+
+    def _is_candidate(self, path):
+        name = os.path.basename(path)
+        # Hidden files include partial downloads, editor swap files and the manifest
+        if name.startswith('.') or name.endswith('~'):
+            return False
+        if os.path.abspath(path).startswith(os.path.abspath(self.output_dir) + os.sep):
+            return False
+        spec = get_spec(path)
+        if spec is None or not spec.can_write(self.target_format):
+            if path not in self.skipped and os.path.isfile(path):
+                self.skipped.add(path)
+                print(f"- skipped {path} (no converter to {self.target_format})")
+            return False
+        return True
+
+    """
+    Submit the pending files that have not changed for debounce seconds.
+    """
+    def _dispatch(self):
+        now = time.monotonic()
+        running = {relative for relative, _, _, _ in self._running.values()}
+        for relative, (signature, since) in list(self._pending.items()):
+            if now - since < self.debounce or relative in running:
+                continue
+            input_path = os.path.join(self.input_dir, relative)
+            try:
+                stat = os.stat(input_path)
+            except FileNotFoundError:
+                del self._pending[relative]
+                continue
+            if (stat.st_size, stat.st_mtime_ns) != signature:
+                # Still being written without events in between (e.g. a slow copy): wait again
+                self._pending[relative] = ((stat.st_size, stat.st_mtime_ns), now)
+                continue
+
+            del self._pending[relative]
+            entry = self.manifest.get(relative)
+            output_path = self._output_path(relative, entry)
+            previous_hash = None
+            if entry is not None and entry['ok'] and entry['format'] == self.target_format:
+                previous_hash = entry['sha256']
+            task = (input_path, output_path, stat.st_size, self.cache_options, self.profile, self.compresslevel,
+                    previous_hash)
+            executor = self._executor
+            try:
+                future = executor.submit(_watch_task, task)
+            except BrokenProcessPool:
+                # A worker died and its conversions have not been collected yet
+                executor = self._replace_pool(executor)
+                future = executor.submit(_watch_task, task)
+            self._running[future] = (relative, signature, output_path, executor)
+
+    """
+    Record the conversions that have finished in the manifest.
+    """
+    def _collect(self):
+        for future in [future for future in self._running if future.done()]:
+            relative, signature, output_path, executor = self._running.pop(future)
+            if future.cancelled():
+                continue
+            try:
+                digest, item = future.result()
+            except BrokenProcessPool:
+                print(f"✗ {os.path.join(self.input_dir, relative)} (a worker process died; "
+                      f"it is tried again when it changes or the watch restarts)")
+                self._replace_pool(executor)
+                continue
+            if item is not None:
+                self.items.append(item)
+                print_item(item)
+            if digest is None:
+                continue
+            self.manifest.set(relative, {
+                'size': signature[0],
+                'mtime_ns': signature[1],
+                'sha256': digest,
+                'output': output_path,
+                'format': self.target_format,
+                'ok': item.ok if item is not None else True,
+            })
+        if self.manifest.dirty and (not self._running or
+                                    time.monotonic() - self._last_save >= MANIFEST_SAVE_INTERVAL):
+            self.manifest.save()
+            self._last_save = time.monotonic()
+
+    """
+    Replace executor, which a dead worker has broken, with a new pool unless that was
+    done already. Returns the current pool.
+    """
+    def _replace_pool(self, executor):
+        if self._executor is executor:
+            print("A worker process died; starting a new worker pool")
+            executor.shutdown(wait=False)
+            self._executor = ProcessPoolExecutor(max_workers=self.jobs)
+        return self._executor
+
+    """
+    The output path of an input: the one it had before, or a new one that no other input uses.
+    """
+    def _output_path(self, relative, entry):
+        if entry is not None and entry['format'] == self.target_format:
+            return entry['output']
+        used_outputs = {other['output'] for other in self.manifest.entries.values()}
+        used_outputs.update(output_path for _, _, output_path, _ in self._running.values())
+        return get_output_path(os.path.join(self.input_dir, relative), self.input_dir, self.output_dir,
+                               self.target_format, used_outputs)
+
+    """
+    How long the watcher may block: until the next pending file settles, and briefly
+    while conversions run so finished ones are recorded promptly.
+    """
+    def _wait_timeout(self):
+        timeout = self.debounce
+        if self._pending:
+            now = time.monotonic()
+            timeout = min(max(0.0, since + self.debounce - now) for _, since in self._pending.values())
+        if self._running:
+            timeout = min(timeout, 0.05)
+        return timeout
+
+
+"""
+Watch input_dir and convert every supported file to target_format in output_dir
+when it appears or changes, with jobs worker processes (None uses one per CPU core).
+A file is converted once it has not changed for debounce seconds. Changes come from
+inotify where available, otherwise from scanning the folder every poll_interval
+seconds (polling=True forces this). The manifest (default: output_dir/MANIFEST_NAME)
+lets a restart skip every file that was already converted.
+With once=True the function returns after converting the files already in the folder.
+Returns a BatchSummary of the conversions that ran.
+"""
+def watch_folder(input_dir, output_dir, target_format, jobs=None, recursive=False,
+                 debounce=DEFAULT_DEBOUNCE, poll_interval=DEFAULT_POLL_INTERVAL, polling=False,
+                 cache_dir=None, cache_max_bytes=DEFAULT_MAX_BYTES, manifest_path=None,
+                 profile=False, once=False, compresslevel=None):
+    folder_watch = FolderWatch(input_dir, output_dir, target_format, jobs=jobs, recursive=recursive,
+                               debounce=debounce, cache_dir=cache_dir, cache_max_bytes=cache_max_bytes,
+                               manifest_path=manifest_path, profile=profile, compresslevel=compresslevel)
+    if not os.path.isdir(input_dir):
+        raise NotADirectoryError(f"Input directory '{input_dir}' does not exist")
+    watcher = PollingWatcher(poll_interval) if once else create_watcher(input_dir, recursive, poll_interval,
+                                                                          polling)
+    if not once:
+        kind = 'inotify' if isinstance(watcher, InotifyWatcher) else f"polling every {poll_interval:g} s"
+        print(f"Watching {input_dir} -> {output_dir} ({folder_watch.target_format}, {kind}, "
+              f"{folder_watch.jobs} worker process(es)); press Ctrl+C to stop")
+    try:
+        return folder_watch.run(watcher, once=once)
+    finally:
+        watcher.close()
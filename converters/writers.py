@@ -0,0 +1,439 @@
+# Writers module - incremental output writers shared by the tabular converters
+# A writer receives a table one pandas DataFrame chunk at a time, so converters can
+# stream large inputs to disk without ever holding the whole table in memory
+
+# Import the helpers that let a writer's output be a stream instead of a file
+from .streams import get_extension, open_output
+
+"""
+Default number of rows read per chunk by the streaming converters.
+Peak memory is bounded by this value instead of by the input file size.
+"""
+DEFAULT_CHUNKSIZE = 50000
+
+"""
+File extensions that are written as newline-delimited JSON (one record per line).
+"""
+JSON_LINES_EXTENSIONS = ['.jsonl', '.ndjson']
+
+"""
+Maximum number of rows (including the header row) on a single Excel worksheet.
+"""
+EXCEL_MAX_ROWS = 1048576
+
+
+"""
+Base class for all chunk writers.
+Subclasses open the output in open(), append one DataFrame chunk per write() call,
+and finish the file in close(). Writers can be used as context managers; when
+the conversion fails or is cancelled inside the with block, abort() is called
+instead of close(), so a truncated output is never finished to look complete.
+"""
+class ChunkWriter:
+
+    """
+    Initializes the writer with the path of the file to create,
+    or a binary file-like object (or '-' for stdout) to write to.
+    """
+    def __init__(self, output_path):
+        self.output_path = output_path
+        self.rows_written = 0
+        # Compression of the output and its level (see compression.py), set by get_writer()
+        self.compression = None
+        self.compresslevel = None
+
+    """
+    Open the output file. Called once before the first chunk.
+    """
+    def open(self):
+        pass
+
+    """
+    Open the output for writing with streams.open_output(), compressed if the writer
+    has a compression.
+    """
+    def open_file(self, mode, **options):
+        return open_output(self.output_path, mode, compression=self.compression,
+                           compresslevel=self.compresslevel, **options)
+
+    """
+    Append one DataFrame chunk to the output.
+    """
+    def write(self, df):
+        raise NotImplementedError
+
+    """
+    Finish and close the output file.
+    """
+    def close(self):
+        pass
+
+    """
+    Close the output without finishing it, after the conversion failed or was
+    cancelled; the converter deletes the partial file afterwards. Writers whose
+    close() finishes the file (a closing bracket, tag or an expensive save) skip that here.
+    """
+    def abort(self):
+        self.close()
+
+    """
+    Return (function, options) that renders a DataFrame chunk to this writer's text
+    format without needing the writer itself, or None if the writer cannot do that.
+    Parallel parsers call the function in worker processes and pass the text
+    to write_formatted().
+    """
+    def get_formatter(self):
+        return None
+
+    """
+    Append a chunk that was already rendered by the function from get_formatter().
+    """
+    def write_formatted(self, text, rows):
+        raise NotImplementedError
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+        return False
+
+
+"""
+Writes DataFrame chunks as JSON records.
+With lines=False the output is a single valid JSON array with one record per line;
+with lines=True the output is newline-delimited JSON (JSON Lines).
+"""
+class JSONWriter(ChunkWriter):
+
+    def __init__(self, output_path, lines=False, force_ascii=True):
+        super().__init__(output_path)
+        self.lines = lines
+        self.force_ascii = force_ascii
+        self._file = None
+
+    def open(self):
+        # newline='' keeps the '\n' separators exactly as written on every platform
+        self._file = self.open_file('w', encoding='utf-8', newline='')
+        if not self.lines:
+            self._file.write('[')
+
+    def write(self, df):
+        self.write_formatted(format_json_records(df, self.lines, self.force_ascii), len(df))
+
+    def get_formatter(self):
+        return format_json_records, {'lines': self.lines, 'force_ascii': self.force_ascii}
+
+    def write_formatted(self, text, rows):
+        if not text:
+            return
+        if not self.lines:
+            # Every record after the very first one needs a comma separator
+            if self.rows_written:
+                self._file.write(',')
+            self._file.write('\n  ')
+        self._file.write(text)
+        self.rows_written += rows
+
+    def close(self):
+        if self._file is None:
+            return
+        if not self.lines:
+            # Put the closing bracket on its own line unless the array is empty
+            self._file.write('\n]' if self.rows_written else ']')
+        self._file.close()
+        self._file = None
+
+    def abort(self):
+        # Without the closing bracket a truncated array is not valid JSON
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+"""
+Render a DataFrame chunk as JSON records, one record per line.
+For JSON Lines every record ends with a newline; for a JSON array the records
+are joined with the commas and indentation that JSONWriter uses.
+"""
+def format_json_records(df, lines=False, force_ascii=True):
+    if df.empty:
+        return ''
+
+    # pandas escapes newlines inside values, so every record is exactly one line
+    # Split on '\n' only: str.splitlines() would also split on raw U+2028 characters
+    text = df.to_json(orient='records', lines=True, force_ascii=force_ascii)
+    records = [record for record in text.split('\n') if record]
+
+    if lines:
+        return '\n'.join(records) + '\n'
+    return ',\n  '.join(records)
+
+
+"""
+Render a DataFrame chunk as CSV rows without a header.
+"""
+def format_csv_rows(df):
+    return df.to_csv(index=False, header=False)
+
+
+"""
+Writes DataFrame chunks as CSV. The header row is written with the first chunk only.
+"""
+class CSVWriter(ChunkWriter):
+
+    def __init__(self, output_path):
+        super().__init__(output_path)
+        self._file = None
+        self._header_written = False
+
+    def open(self):
+        # newline='' lets pandas control the line endings, as the csv module requires
+        self._file = self.open_file('w', encoding='utf-8', newline='')
+
+    def write(self, df):
+        df.to_csv(self._file, header=not self._header_written, index=False)
+        self._header_written = True
+        self.rows_written += len(df)
+
+    def get_formatter(self):
+        return format_csv_rows, {}
+
+    def write_formatted(self, text, rows):
+        # Formatted chunks carry no header, so the header must come from a write() first
+        self._file.write(text)
+        self.rows_written += rows
+
+    def close(self):
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+
+
+"""
+Writes DataFrame chunks as a single HTML table.
+Every chunk is rendered by pandas and becomes its own <tbody> section,
+which keeps the same markup as DataFrame.to_html() without buffering the table.
+"""
+class HTMLWriter(ChunkWriter):
+
+    def __init__(self, output_path):
+        super().__init__(output_path)
+        self._file = None
+        self._started = False
+
+    def open(self):
+        self._file = self.open_file('w', encoding='utf-8')
+
+    def write(self, df):
+        if self._started and df.empty:
+            return
+
+        # Missing values of nullable integer columns (see parallel.conform_dtypes) would
+        # render as <NA> instead of NaN like in every other column
+        nullable = [column for column, dtype in df.dtypes.items() if dtype.kind in 'iu' and df[column].hasnans]
+        if nullable:
+            df = df.astype({column: object for column in nullable})
+            df[nullable] = df[nullable].where(df[nullable].notna(), float('nan'))
+
+        # The first chunk renders the <thead>, later chunks only their rows
+        lines = df.to_html(index=False, header=not self._started).split('\n')
+        if not self._started:
+            # Keep the opening <table> tag from the first chunk only
+            self._file.write(lines[0] + '\n')
+            self._started = True
+        # Drop the <table> and </table> lines that wrap every rendered chunk
+        self._file.write('\n'.join(lines[1:-1]) + '\n')
+        self.rows_written += len(df)
+
+    def close(self):
+        if self._file is None:
+            return
+        if not self._started:
+            self._file.write('<table border="1" class="dataframe">\n')
+        self._file.write('</table>')
+        self._file.close()
+        self._file = None
+
+    def abort(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+"""
+Writes DataFrame chunks to an Excel workbook without building it in memory.
+Rows are appended through a write-only (constant memory) backend, so memory use
+stays flat no matter how many rows are written. When a sheet reaches Excel's row
+limit the writer rolls over to 'Sheet2', 'Sheet3', and so on, repeating the header.
+"""
+class XLSXWriter(ChunkWriter):
+
+    def __init__(self, output_path, engine='openpyxl', max_rows=EXCEL_MAX_ROWS):
+        super().__init__(output_path)
+        if engine not in XLSX_ENGINES:
+            raise ValueError(f"Unknown XLSX engine '{engine}'. Available engines: {', '.join(XLSX_ENGINES)}")
+        self.engine = engine
+        self.max_rows = max_rows
+        self.sheet_count = 0
+        self._backend = None
+        self._file = None
+        self._header = None
+        # Number of rows (including the header) on the current sheet
+        self._sheet_rows = 0
+
+    def open(self):
+        # Both backends write the workbook to a file object as well as to a path
+        self._file = self.open_file('wb')
+        self._backend = XLSX_ENGINES[self.engine](self._file)
+
+    def write(self, df):
+        if self._header is None:
+            self._header = [str(column) for column in df.columns]
+            self._add_sheet()
+
+        # Missing values become empty cells, and numpy scalars become plain Python values
+        values = df.astype(object).where(df.notna(), None)
+        for row in values.itertuples(index=False, name=None):
+            if self._sheet_rows >= self.max_rows:
+                self._add_sheet()
+            self._backend.append(row)
+            self._sheet_rows += 1
+            self.rows_written += 1
+
+    def close(self):
+        if self._backend is None:
+            return
+        # A workbook needs at least one sheet, even when the input had no columns
+        if self.sheet_count == 0:
+            self._header = []
+            self._add_sheet()
+        self._backend.close()
+        self._backend = None
+        self._file.close()
+        self._file = None
+
+    def abort(self):
+        if self._backend is None:
+            return
+        self._backend.abort()
+        self._backend = None
+        self._file.close()
+        self._file = None
+
+    def _add_sheet(self):
+        self.sheet_count += 1
+        self._backend.add_sheet(f"Sheet{self.sheet_count}")
+        self._backend.append(self._header, header=True)
+        self._sheet_rows = 1
+
+
+"""
+XLSX backend that uses openpyxl's write-only workbook mode.
+"""
+class _OpenpyxlBackend:
+
+    def __init__(self, output_path):
+        from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Font
+
+        self.output_path = output_path
+        self._workbook = Workbook(write_only=True)
+        self._sheet = None
+        self._cell_class = WriteOnlyCell
+        self._header_font = Font(bold=True)
+
+    def add_sheet(self, title):
+        self._sheet = self._workbook.create_sheet(title)
+
+    def append(self, row, header=False):
+        if header:
+            row = [self._header_cell(value) for value in row]
+        self._sheet.append(row)
+
+    def _header_cell(self, value):
+        cell = self._cell_class(self._sheet, value=value)
+        cell.font = self._header_font
+        return cell
+
+    def close(self):
+        self._workbook.save(self.output_path)
+
+    def abort(self):
+        # Nothing reaches the output before save(), the slow part of closing, so the
+        # sheets' temporary files only need to be finished (openpyxl deletes them at exit)
+        for sheet in self._workbook.worksheets:
+            sheet.close()
+
+
+"""
+XLSX backend that uses xlsxwriter's constant_memory mode (optional dependency).
+"""
+class _XlsxWriterBackend:
+
+    def __init__(self, output_path):
+        try:
+            import xlsxwriter
+        except ImportError:
+            raise ImportError("The 'xlsxwriter' engine requires xlsxwriter. Install it with: pip install xlsxwriter")
+
+        self._workbook = xlsxwriter.Workbook(output_path, {'constant_memory': True})
+        self._header_format = self._workbook.add_format({'bold': True})
+        self._sheet = None
+        self._row = 0
+
+    def add_sheet(self, title):
+        self._sheet = self._workbook.add_worksheet(title)
+        self._row = 0
+
+    def append(self, row, header=False):
+        self._sheet.write_row(self._row, 0, row, self._header_format if header else None)
+        self._row += 1
+
+    def close(self):
+        self._workbook.close()
+
+    def abort(self):
+        # xlsxwriter has to be closed either way to remove its temporary files
+        self._workbook.close()
+
+
+"""
+Available XLSX backends, keyed by the engine name passed to XLSXWriter.
+"""
+XLSX_ENGINES = {
+    'openpyxl': _OpenpyxlBackend,
+    'xlsxwriter': _XlsxWriterBackend,
+}
+
+
+"""
+Create the streaming writer that matches the extension of output_path
+(or output_format, for a stream without a file name).
+compression (e.g. 'gzip') compresses the output at compresslevel as it is written.
+Returns None if the extension has no streaming writer.
+"""
+def get_writer(output_path, force_ascii=True, xlsx_engine='openpyxl', output_format=None,
+               compression=None, compresslevel=None):
+    file_extension = get_extension(output_path, output_format)
+    if file_extension == '.json':
+        writer = JSONWriter(output_path, lines=False, force_ascii=force_ascii)
+    elif file_extension in JSON_LINES_EXTENSIONS:
+        writer = JSONWriter(output_path, lines=True, force_ascii=force_ascii)
+    elif file_extension == '.xlsx':
+        writer = XLSXWriter(output_path, engine=xlsx_engine)
+    elif file_extension == '.csv':
+        writer = CSVWriter(output_path)
+    elif file_extension == '.html':
+        writer = HTMLWriter(output_path)
+    else:
+        return None
+    writer.compression = compression
+    writer.compresslevel = compresslevel
+    return writer
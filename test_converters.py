@@ -54,6 +54,22 @@ def create_test_docx():
     return docx_path
 
 
+def create_test_pdf(pages=4):
+    """Create a multi-page test PDF file using PyMuPDF."""
+    import fitz
+    
+    pdf_path = os.path.join(tempfile.gettempdir(), "test_input.pdf")
+    doc = fitz.open()
+    for page_number in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Page {page_number + 1} heading", fontsize=16)
+        page.insert_text((72, 100), f"This is the text of page {page_number + 1}.", fontsize=11)
+    doc.save(pdf_path)
+    doc.close()
+    print(f"✓ Created test PDF: {pdf_path}")
+    return pdf_path
+
+
 def test_csv_converter():
     """Test CSV converter."""
     print("\n--- Testing CSV Converter ---")
@@ -74,6 +90,262 @@ def test_csv_converter():
         return False
 
 
+def test_csv_streaming_json():
+    """Test chunked CSV to JSON and JSON Lines conversion."""
+    import json
+    
+    print("\n--- Testing CSV Streaming JSON ---")
+    csv_path = create_test_csv()
+    output_json = os.path.join(tempfile.gettempdir(), "output_test.json")
+    output_jsonl = os.path.join(tempfile.gettempdir(), "output_test.jsonl")
+    
+    try:
+        # A chunk size smaller than the file forces several chunks to be written
+        converter = CSVConverter(csv_path, chunksize=2)
+        if not converter.convert(output_json) or not converter.convert(output_jsonl):
+            print("✗ CSV streaming JSON conversion failed")
+            return False
+        
+        with open(output_json, encoding='utf-8') as f:
+            records = json.load(f)
+        with open(output_jsonl, encoding='utf-8') as f:
+            lines = [json.loads(line) for line in f]
+        
+        if [r['Name'] for r in records] == ['Alice', 'Bob', 'Charlie'] and lines == records:
+            print(f"✓ CSV streaming JSON conversion successful: {output_json}, {output_jsonl}")
+            return True
+        else:
+            print("✗ CSV streaming JSON output does not match the input rows")
+            return False
+    except Exception as e:
+        print(f"✗ CSV streaming JSON error: {e}")
+        return False
+
+
+
+
+def test_csv_chunk_types():
+    """Test that a column is written the same way in every chunk, whatever later chunks hold."""
+    print("\n--- Testing CSV Chunk Types ---")
+    csv_path = os.path.join(tempfile.gettempdir(), "test_chunk_types.csv")
+    output_csv = os.path.join(tempfile.gettempdir(), "output_test_chunk_types.csv")
+    output_jsonl = os.path.join(tempfile.gettempdir(), "output_test_chunk_types.jsonl")
+    # v has a blank only in the second chunk, f has integers only in the second chunk
+    with open(csv_path, 'w', encoding='utf-8') as f:
+        f.write("v,f,w\n1,1.5,a\n2,2.5,b\n,3,c\n4,4,d\n")
+    
+    try:
+        result = CSVConverter(csv_path, chunksize=2).convert_many([output_csv, output_jsonl])
+        with open(output_csv, encoding='utf-8') as f:
+            text = f.read()
+        with open(output_jsonl, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        
+        if (result and text == "v,f,w\n1,1.5,a\n2,2.5,b\n,3.0,c\n4,4.0,d\n"
+                and lines[2:] == ['{"v":null,"f":3.0,"w":"c"}', '{"v":4,"f":4.0,"w":"d"}']):
+            print("✓ Column types are the same in every chunk")
+            return True
+        else:
+            print(f"✗ Column types changed between chunks: {text!r}, {lines}")
+            return False
+    except Exception as e:
+        print(f"✗ CSV chunk types error: {e}")
+        return False
+
+def test_csv_failed_output_removed():
+    """Test that a decode error partway through the CSV leaves no truncated output behind."""
+    print("\n--- Testing CSV Failure Cleanup ---")
+    csv_path = os.path.join(tempfile.gettempdir(), "test_bad_encoding.csv")
+    with open(csv_path, 'wb') as f:
+        f.write(b"id,name\n")
+        for i in range(1000):
+            f.write(f"{i},name {i}\n".encode('utf-8'))
+        # Not valid UTF-8, after several chunks have been written
+        f.write(b"1000,name \xff\xfe\n")
+    outputs = [os.path.join(tempfile.gettempdir(), f"output_test_bad_encoding{extension}")
+               for extension in ('.json', '.jsonl', '.csv', '.xlsx')]
+    
+    try:
+        results = [CSVConverter(csv_path, chunksize=100).convert(path) for path in outputs]
+        left = [path for path in outputs if os.path.exists(path)]
+        if not any(results) and not left:
+            print("✓ Failed CSV conversions left no output")
+            return True
+        else:
+            print(f"✗ Unexpected results {[result.status for result in results]}, outputs left: {left}")
+            return False
+    except Exception as e:
+        print(f"✗ CSV failure cleanup error: {e}")
+        return False
+
+
+def test_csv_extra_fields():
+    """Test that a record with more fields than the header fails the conversion wherever it falls."""
+    print("\n--- Testing CSV Extra Fields ---")
+    csv_path = os.path.join(tempfile.gettempdir(), "test_extra_fields.csv")
+    output_json = os.path.join(tempfile.gettempdir(), "output_test_extra_fields.json")
+    
+    try:
+        failures = []
+        # Row 101 is the first record of a chunk of 10, 50 and 100 rows
+        for bad_row in (1, 50, 101):
+            rows = [f"{i},name {i}" for i in range(300)]
+            rows[bad_row - 1] = "1,2,3,4"
+            with open(csv_path, 'w', encoding='utf-8') as f:
+                f.write("id,name\n" + "\n".join(rows) + "\n")
+            for chunksize in (10, 50, 100):
+                for jobs in (1, 2):
+                    result = CSVConverter(csv_path, chunksize=chunksize, jobs=jobs).convert(output_json)
+                    if result or os.path.exists(output_json):
+                        failures.append((bad_row, chunksize, jobs))
+        
+        if not failures:
+            print("✓ Records with extra fields are rejected")
+            return True
+        else:
+            print(f"✗ Extra fields were dropped silently (row, chunksize, jobs): {failures}")
+            return False
+    except Exception as e:
+        print(f"✗ CSV extra fields error: {e}")
+        return False
+
+def test_xlsx_sheet_rollover():
+    """Test that the streaming XLSX writer splits rows across sheets."""
+    import pandas as pd
+    from converters.writers import XLSXWriter
+    
+    print("\n--- Testing XLSX Sheet Rollover ---")
+    output_xlsx = os.path.join(tempfile.gettempdir(), "output_test_rollover.xlsx")
+    df = pd.DataFrame({'Name': ['Alice', 'Bob', 'Charlie', 'Dana', 'Eve'], 'Age': [30, 25, 35, 41, 28]})
+    
+    try:
+        # Three rows per sheet = one header row plus two data rows
+        with XLSXWriter(output_xlsx, max_rows=3) as writer:
+            writer.write(df.iloc[:3])
+            writer.write(df.iloc[3:])
+        
+        sheets = pd.read_excel(output_xlsx, sheet_name=None)
+        if list(sheets) == ['Sheet1', 'Sheet2', 'Sheet3'] and pd.concat(sheets.values(), ignore_index=True).equals(df):
+            print(f"✓ XLSX sheet rollover successful: {output_xlsx}")
+            return True
+        else:
+            print("✗ XLSX sheet rollover produced unexpected sheets")
+            return False
+    except Exception as e:
+        print(f"✗ XLSX sheet rollover error: {e}")
+        return False
+
+
+def test_csv_convert_many():
+    """Test writing several formats from a single CSV parse."""
+    import pandas as pd
+    
+    print("\n--- Testing CSV convert_many ---")
+    csv_path = create_test_csv()
+    outputs = [os.path.join(tempfile.gettempdir(), f"output_test_many{ext}") for ext in ('.xlsx', '.json', '.html', '.csv')]
+    
+    try:
+        converter = CSVConverter(csv_path, chunksize=2)
+        result = converter.convert_many(outputs)
+        expected = pd.read_csv(csv_path)
+        tables = [
+            pd.read_excel(outputs[0]),
+            pd.read_json(outputs[1]),
+            pd.read_html(outputs[2])[0],
+            pd.read_csv(outputs[3]),
+        ]
+        if result and all(table.equals(expected) for table in tables):
+            print(f"✓ CSV convert_many successful: {', '.join(outputs)}")
+            return True
+        else:
+            print("✗ CSV convert_many output does not match the input rows")
+            return False
+    except Exception as e:
+        print(f"✗ CSV convert_many error: {e}")
+        return False
+
+
+def test_csv_parallel_ranges():
+    """Test parallel byte-range CSV parsing against the sequential reader."""
+    import pandas as pd
+    from converters.parallel import write_csv_in_parallel
+    from converters.writers import CSVWriter, JSONWriter
+    
+    print("\n--- Testing CSV Parallel Byte Ranges ---")
+    csv_path = os.path.join(tempfile.gettempdir(), "test_parallel.csv")
+    with open(csv_path, 'w', newline='') as f:
+        f.write("id,comment,score\n")
+        for i in range(200):
+            # Quoted fields with commas and newlines must never be split between ranges
+            f.write(f'{i},"line one, {i}\nline two",{i * 1.5}\n')
+    
+    output_csv = os.path.join(tempfile.gettempdir(), "output_parallel.csv")
+    output_jsonl = os.path.join(tempfile.gettempdir(), "output_parallel.jsonl")
+    
+    try:
+        # Tiny ranges force many boundaries to fall inside quoted fields
+        writers = [CSVWriter(output_csv), JSONWriter(output_jsonl, lines=True)]
+        for writer in writers:
+            writer.open()
+        write_csv_in_parallel(csv_path, writers, jobs=2, range_size=100)
+        for writer in writers:
+            writer.close()
+        
+        expected = pd.read_csv(csv_path)
+        if pd.read_csv(output_csv).equals(expected) and pd.read_json(output_jsonl, lines=True).equals(expected):
+            print(f"✓ CSV parallel byte ranges successful: {output_csv}, {output_jsonl}")
+            return True
+        else:
+            print("✗ CSV parallel byte ranges output does not match the input rows")
+            return False
+    except Exception as e:
+        print(f"✗ CSV parallel byte ranges error: {e}")
+        return False
+
+
+
+def test_csv_parallel_types():
+    """Test that parallel byte ranges give the column types of the sequential reader."""
+    from converters.parallel import write_csv_in_parallel
+    from converters.writers import CSVWriter, JSONWriter
+    
+    print("\n--- Testing CSV Parallel Column Types ---")
+    csv_path = os.path.join(tempfile.gettempdir(), "test_parallel_types.csv")
+    with open(csv_path, 'w', newline='') as f:
+        f.write("id,value,score\n")
+        for i in range(300):
+            # value is blank in a few ranges only, score is a whole number in a few ranges only
+            value = '' if 150 <= i < 160 else i
+            score = i * 2 if 200 <= i < 220 else i * 1.5
+            f.write(f"{i},{value},{score}\n")
+    
+    outputs = {}
+    try:
+        for mode in ('serial', 'parallel'):
+            paths = [os.path.join(tempfile.gettempdir(), f"output_types_{mode}{extension}")
+                     for extension in ('.csv', '.jsonl')]
+            if mode == 'serial':
+                ok = bool(CSVConverter(csv_path, chunksize=50).convert_many(paths))
+            else:
+                writers = [CSVWriter(paths[0]), JSONWriter(paths[1], lines=True)]
+                for writer in writers:
+                    writer.open()
+                write_csv_in_parallel(csv_path, writers, jobs=2, range_size=200, sample_rows=50)
+                for writer in writers:
+                    writer.close()
+                ok = True
+            outputs[mode] = [ok] + [open(path, encoding='utf-8').read() for path in paths]
+        
+        if outputs['serial'] == outputs['parallel'] and outputs['serial'][0]:
+            print("✓ Parallel output matches the sequential output")
+            return True
+        else:
+            print("✗ Parallel output differs from the sequential output")
+            return False
+    except Exception as e:
+        print(f"✗ CSV parallel column types error: {e}")
+        return False
+
 def test_docx_converter():
     """Test DOCX converter."""
     print("\n--- Testing DOCX Converter ---")
@@ -94,6 +366,837 @@ def test_docx_converter():
         return False
 
 
+
+def test_docx_corrupt():
+    """Test that a corrupt .docx fails before its output is created."""
+    print("\n--- Testing Corrupt DOCX ---")
+    docx_path = os.path.join(tempfile.gettempdir(), "test_corrupt.docx")
+    output_txt = os.path.join(tempfile.gettempdir(), "output_test_corrupt.txt")
+    with open(docx_path, 'wb') as f:
+        f.write(b"PK\x03\x04 this is not a zip archive")
+    
+    try:
+        for engine in ('stream', 'python-docx'):
+            if os.path.exists(output_txt):
+                os.remove(output_txt)
+            result = DOCXConverter(docx_path, engine=engine).convert(output_txt)
+            if result or os.path.exists(output_txt):
+                print(f"✗ Corrupt DOCX with the {engine} engine left an output behind")
+                return False
+        
+        # An existing output must not be truncated by a conversion that cannot read its input
+        with open(output_txt, 'w', encoding='utf-8') as f:
+            f.write('kept')
+        result = DOCXConverter(docx_path).convert(output_txt)
+        with open(output_txt, encoding='utf-8') as f:
+            kept = f.read() == 'kept'
+        if not result and kept:
+            print("✓ Corrupt DOCX failed without touching the output")
+            return True
+        else:
+            print("✗ Corrupt DOCX overwrote the existing output")
+            return False
+    except Exception as e:
+        print(f"✗ Corrupt DOCX error: {e}")
+        return False
+
+def test_docx_stream_tables():
+    """Test that the streaming DOCX engine keeps table text in document order."""
+    from docx import Document
+    
+    print("\n--- Testing DOCX Streaming Engine ---")
+    docx_path = os.path.join(tempfile.gettempdir(), "test_tables.docx")
+    output_txt = os.path.join(tempfile.gettempdir(), "output_test_tables.txt")
+    
+    doc = Document()
+    doc.add_paragraph("Before the table.")
+    table = doc.add_table(rows=2, cols=2)
+    table.cell(0, 0).text = "Name"
+    table.cell(0, 1).text = "City"
+    table.cell(1, 0).text = "Alice"
+    table.cell(1, 1).text = "Paris"
+    paragraph = doc.add_paragraph("After")
+    paragraph.add_run().add_tab()
+    paragraph.add_run("the table.")
+    doc.save(docx_path)
+    
+    try:
+        result = DOCXConverter(docx_path, engine='stream').convert(output_txt)
+        with open(output_txt, encoding='utf-8') as f:
+            text = f.read()
+        if result and text == "Before the table.\nName\tCity\nAlice\tParis\nAfter\tthe table.":
+            print(f"✓ DOCX streaming engine successful: {output_txt}")
+            return True
+        else:
+            print(f"✗ DOCX streaming engine produced unexpected text: {text!r}")
+            return False
+    except Exception as e:
+        print(f"✗ DOCX streaming engine error: {e}")
+        return False
+
+
+def test_pdf_parallel_pages():
+    """Test that page-parallel PDF conversion matches the single-process result."""
+    from docx import Document
+    
+    print("\n--- Testing PDF Page-Parallel Conversion ---")
+    pdf_path = create_test_pdf(pages=4)
+    output_single = os.path.join(tempfile.gettempdir(), "output_test_single.docx")
+    output_parallel = os.path.join(tempfile.gettempdir(), "output_test_parallel.docx")
+    
+    try:
+        single = PDFConverter(pdf_path, jobs=1, mode='layout').convert(output_single)
+        parallel = PDFConverter(pdf_path, jobs=2, mode='layout').convert(output_parallel)
+        single_text = [p.text for p in Document(output_single).paragraphs]
+        parallel_text = [p.text for p in Document(output_parallel).paragraphs]
+        if single and parallel and single_text == parallel_text and "Page 4 heading" in "\n".join(parallel_text):
+            print(f"✓ PDF page-parallel conversion successful: {output_parallel}")
+            return True
+        else:
+            print("✗ PDF page-parallel output differs from the single-process output")
+            return False
+    except Exception as e:
+        print(f"✗ PDF page-parallel conversion error: {e}")
+        return False
+
+
+def test_pdf_triage():
+    """Test that a plain text PDF is triaged to the fast text-only mode."""
+    from docx import Document
+    from converters.pdf_converter import triage_pdf
+    
+    print("\n--- Testing PDF Triage ---")
+    pdf_path = create_test_pdf(pages=4)
+    output_docx = os.path.join(tempfile.gettempdir(), "output_test_triage.docx")
+    
+    try:
+        triage = triage_pdf(pdf_path)
+        result = PDFConverter(pdf_path, mode='auto').convert(output_docx)
+        text = "\n".join(p.text for p in Document(output_docx).paragraphs)
+        if triage.mode == 'fast' and result and "Page 4 heading" in text:
+            print(f"✓ PDF triage picked {triage.mode} mode: {output_docx}")
+            return True
+        else:
+            print(f"✗ PDF triage picked {triage.mode} mode for a plain text PDF")
+            return False
+    except Exception as e:
+        print(f"✗ PDF triage error: {e}")
+        return False
+
+
+def test_pdf_text_only_stream():
+    """Test that the text-only PDF conversion writes one paragraph per block and page breaks."""
+    import zipfile
+    from docx import Document
+    
+    print("\n--- Testing PDF Text-Only Streaming ---")
+    pdf_path = create_test_pdf(pages=4)
+    output_docx = os.path.join(tempfile.gettempdir(), "output_test_text_only.docx")
+    
+    try:
+        result = PDFConverter(pdf_path, mode='fast').convert(output_docx)
+        paragraphs = [p.text for p in Document(output_docx).paragraphs if p.text]
+        with zipfile.ZipFile(output_docx) as archive:
+            page_breaks = archive.read('word/document.xml').decode('utf-8').count('w:type="page"')
+        if result and len(paragraphs) == 9 and paragraphs[-1] == "This is the text of page 4." and page_breaks == 3:
+            print(f"✓ PDF text-only streaming conversion successful: {output_docx}")
+            return True
+        else:
+            print(f"✗ PDF text-only output has {len(paragraphs)} paragraphs and {page_breaks} page breaks")
+            return False
+    except Exception as e:
+        print(f"✗ PDF text-only streaming error: {e}")
+        return False
+
+
+def test_pdf_to_text():
+    """Test direct PDF to TXT and JSON Lines conversion."""
+    import json
+    
+    print("\n--- Testing PDF to TXT/JSONL ---")
+    pdf_path = create_test_pdf(pages=4)
+    output_txt = os.path.join(tempfile.gettempdir(), "output_test_pdf.txt")
+    output_jsonl = os.path.join(tempfile.gettempdir(), "output_test_pdf.jsonl")
+    
+    try:
+        txt_result = PDFConverter(pdf_path).convert(output_txt)
+        jsonl_result = PDFConverter(pdf_path).convert(output_jsonl)
+        with open(output_txt, encoding='utf-8') as f:
+            pages = f.read().split('\f')
+        with open(output_jsonl, encoding='utf-8') as f:
+            records = [json.loads(line) for line in f]
+        if (txt_result and jsonl_result and len(pages) == 4 and "Page 4 heading" in pages[3]
+                and [record['page'] for record in records] == [1, 2, 3, 4]):
+            print(f"✓ PDF to TXT/JSONL conversion successful: {output_txt}, {output_jsonl}")
+            return True
+        else:
+            print("✗ PDF to TXT/JSONL output does not have one entry per page")
+            return False
+    except Exception as e:
+        print(f"✗ PDF to TXT/JSONL conversion error: {e}")
+        return False
+
+
+def test_lazy_registry():
+    """Test that startup imports no converter dependencies and the registry matches the converters."""
+    import subprocess
+    from converters.registry import CONVERTERS, get_converter_class
+    
+    print("\n--- Testing Lazy Converter Registry ---")
+    
+    try:
+        # A fresh interpreter shows what importing the package and the GUI really loads
+        code = "import sys, converters, ui.gui; print(sorted(m for m in ('pandas', 'docx', 'pdf2docx', 'fitz') if m in sys.modules))"
+        proc = subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(os.path.abspath(__file__)),
+                              capture_output=True, text=True)
+        loaded = proc.stdout.strip()
+        mismatched = [spec.name for spec in CONVERTERS
+                      if spec.load()("input").get_supported_formats() != spec.output_formats]
+        if loaded == "[]" and not mismatched and get_converter_class("data.CSV") is CSVConverter:
+            print("✓ Lazy converter registry successful")
+            return True
+        else:
+            print(f"✗ Startup loaded {loaded or proc.stderr}, format mismatches: {mismatched}")
+            return False
+    except Exception as e:
+        print(f"✗ Lazy converter registry error: {e}")
+        return False
+
+
+def test_batch_cli():
+    """Test headless batch conversion of a directory with the command line interface."""
+    import contextlib
+    import io
+    import multiprocessing
+    import shutil
+    from converters.__main__ import main as cli_main
+    
+    print("\n--- Testing Batch CLI ---")
+    input_dir = tempfile.mkdtemp(prefix="batch_in_")
+    output_dir = os.path.join(tempfile.mkdtemp(prefix="batch_out_"), "json")
+    shutil.copy(create_test_csv(), os.path.join(input_dir, "people.csv"))
+    shutil.copy(create_test_txt(), os.path.join(input_dir, "people.txt"))
+    shutil.copy(create_test_docx(), os.path.join(input_dir, "notes.docx"))
+    
+    try:
+        status = cli_main(["batch", input_dir, output_dir, "--to", ".json", "--jobs", "2"])
+        outputs = sorted(os.listdir(output_dir))
+        
+        # A worker that dies fails its file and the unfinished ones, but the batch still reports
+        # (the workers are forked, so they inherit the replaced method)
+        crashed = None
+        if multiprocessing.get_start_method() == "fork":
+            convert = TXTConverter.convert
+            TXTConverter.convert = lambda self, *args, **kwargs: os._exit(1)
+            log = io.StringIO()
+            try:
+                with contextlib.redirect_stdout(log):
+                    crashed = cli_main(["batch", input_dir, output_dir + "_crash", "--to", ".json", "--jobs", "1"])
+            finally:
+                TXTConverter.convert = convert
+            log = log.getvalue()
+            crashed = (crashed, "✗ " + os.path.join(input_dir, "people.txt") in log, "Failed: " in log)
+        
+        if status == 0 and outputs == ["people.json", "people_txt.json"] and crashed in (None, (1, True, True)):
+            print(f"✓ Batch CLI conversion successful: {output_dir}")
+            return True
+        else:
+            print(f"✗ Batch CLI returned {status} and wrote {outputs}, after a crash {crashed}")
+            return False
+    except Exception as e:
+        print(f"✗ Batch CLI error: {e}")
+        return False
+
+
+def test_conversion_cache():
+    """Test that repeated conversions are served from the cache and old entries are evicted."""
+    from converters.cache import ConversionCache
+    
+    print("\n--- Testing Conversion Cache ---")
+    csv_path = create_test_csv()
+    output_json = os.path.join(tempfile.gettempdir(), "output_test_cached.json")
+    output_html = os.path.join(tempfile.gettempdir(), "output_test_cached.html")
+    
+    try:
+        cache = ConversionCache(tempfile.mkdtemp(prefix="cache_"))
+        for output_path in (output_json, output_json, output_html):
+            converter = CSVConverter(csv_path)
+            converter.cache = cache
+            if not converter.convert(output_path):
+                print(f"✗ Cached conversion to {output_path} failed")
+                return False
+        served = open(output_json, encoding='utf-8').read()
+        
+        # The key follows the format and compression written, not the output name
+        output_data = os.path.join(tempfile.gettempdir(), "output_test_cached.data")
+        format_cache = ConversionCache(tempfile.mkdtemp(prefix="cache_"))
+        for output_path, output_format in ((output_data, ".json"), (output_data, ".html"),
+                                           (output_json + ".gz", None), (output_json + ".gzip", None),
+                                           (output_data, ".json.gz")):
+            converter = CSVConverter(csv_path)
+            converter.cache = format_cache
+            converter.convert(output_path, output_format=output_format)
+        formats = (format_cache.hits, format_cache.misses, open(output_data, "rb").read(2))
+        
+        # Stores that fit in the budget do not walk the cache directory again
+        walks = []
+        entries = cache.entries
+        cache.entries = lambda: walks.append(1) or entries()
+        for _ in range(3):
+            cache.put(cache.entry_path('0' * 64, '.json'), output_json)
+        cache.entries = entries
+        
+        # A budget smaller than both entries keeps only the most recently stored one
+        cache.max_bytes = os.path.getsize(output_html)
+        cache.evict()
+        stats = cache.stats()
+        if (stats['hits'] == 1 and stats['misses'] == 2 and stats['entries'] == 1 and walks == []
+                and stats['evictions'] == 2 and '"Name":"Alice"' in served and formats == (2, 3, b"\x1f\x8b")):
+            print(f"✓ Conversion cache successful: {stats}")
+            return True
+        else:
+            print(f"✗ Unexpected cache statistics: {stats}, {formats}")
+            return False
+    except Exception as e:
+        print(f"✗ Conversion cache error: {e}")
+        return False
+
+
+def test_conversion_result():
+    """Test that convert() returns a ConversionResult and notifies observers."""
+    from converters.result import ConversionObserver, add_observer, remove_observer
+    
+    print("\n--- Testing Conversion Result ---")
+    csv_path = create_test_csv()
+    output_json = os.path.join(tempfile.gettempdir(), "output_test_result.json")
+    
+    class Recorder(ConversionObserver):
+        def __init__(self):
+            self.events = []
+        
+        def on_start(self, result):
+            self.events.append(("start", result.status))
+        
+        def on_finish(self, result):
+            self.events.append(("finish", result.status))
+    
+    recorder = Recorder()
+    add_observer(recorder)
+    try:
+        result = CSVConverter(csv_path).convert(output_json)
+        failed = CSVConverter(csv_path).convert(output_json.replace(".json", ".pdf"))
+        events = list(recorder.events)
+        
+        # Conversions that overlap in one process share its peak memory, so neither reports one
+        inner = []
+        outer = CSVConverter(csv_path).convert(
+            output_json, on_progress=lambda progress: inner or inner.append(
+                CSVConverter(csv_path).convert(output_json.replace(".json", "_inner.json"))))
+        overlapped = [(bool(conversion), conversion.peak_memory) for conversion in [outer] + inner]
+        
+        if (result and result.rows == 3 and result.bytes_out == os.path.getsize(output_json)
+                and set(result.stages) == {"read", "transform", "write"} and result.peak_memory
+                and not failed and "Unsupported output format" in failed.error
+                and events == [("start", "running"), ("finish", "success"), ("start", "running"), ("finish", "failed")]
+                and overlapped == [(True, None), (True, None)]):
+            print(f"✓ Conversion result successful: {result}")
+            return True
+        else:
+            print(f"✗ Unexpected conversion result: {result!s} / {failed!s} / {events} / {overlapped}")
+            return False
+    except Exception as e:
+        print(f"✗ Conversion result error: {e}")
+        return False
+    finally:
+        remove_observer(recorder)
+
+
+def test_profiling_mode():
+    """Test that profile=True writes a .prof file and a text report next to the output."""
+    print("\n--- Testing Profiling Mode ---")
+    csv_path = create_test_csv()
+    output_json = os.path.join(tempfile.gettempdir(), "output_test_profile.json")
+    
+    try:
+        result = CSVConverter(csv_path, profile=True).convert(output_json)
+        prof_path, report_path = output_json + ".prof", output_json + ".profile.txt"
+        with open(report_path, encoding="utf-8") as f:
+            report = f.read()
+        if (result and result.profile_paths == [prof_path, report_path] and os.path.getsize(prof_path)
+                and "Traced memory peak per stage" in report and "functions by cumulative time" in report
+                and result.profiler is None and "profile" not in CSVConverter(csv_path, profile=True).get_options()):
+            print(f"✓ Profiling mode successful: {report_path}")
+            return True
+        else:
+            print(f"✗ Unexpected profiling output: {result.profile_paths}")
+            return False
+    except Exception as e:
+        print(f"✗ Profiling mode error: {e}")
+        return False
+
+
+def test_stream_io():
+    """Test converting from and to file-like objects, including a stream that cannot seek."""
+    import io
+    
+    print("\n--- Testing Stream I/O ---")
+    
+    class Pipe(io.RawIOBase):
+        """A readable stream without seek(), like stdin connected to a pipe."""
+        def __init__(self, data):
+            self._data = io.BytesIO(data)
+        
+        def readable(self):
+            return True
+        
+        def readinto(self, buffer):
+            return self._data.readinto(buffer)
+    
+    try:
+        with open(create_test_csv(), "rb") as f:
+            csv_bytes = f.read()
+        with open(create_test_txt(), "rb") as f:
+            txt_bytes = f.read()
+        with open(create_test_pdf(), "rb") as f:
+            pdf_bytes = f.read()
+        
+        json_out = io.BytesIO()
+        csv_result = CSVConverter(io.BytesIO(csv_bytes)).convert(json_out, output_format=".jsonl")
+        txt_out = io.BytesIO()
+        txt_result = TXTConverter(Pipe(txt_bytes)).convert(txt_out, output_format="csv")
+        # A line past the sniffed lines that pandas cannot parse makes the pipe fall back to plain text
+        lines = [f"{i}\tname{i}" for i in range(300)]
+        lines[250] = "too\tmany\tfields"
+        fallback_out = io.BytesIO()
+        fallback_result = TXTConverter(Pipe("\n".join(lines).encode("utf-8"))).convert(fallback_out,
+                                                                                       output_format="csv")
+        pdf_out = io.BytesIO()
+        pdf_result = PDFConverter(Pipe(pdf_bytes)).convert(pdf_out, output_format=".txt")
+        docx_out = io.BytesIO()
+        docx_result = PDFConverter(io.BytesIO(pdf_bytes), mode="fast").convert(docx_out, output_format=".docx")
+        
+        records = json_out.getvalue().decode("utf-8").splitlines()
+        if (csv_result and txt_result and pdf_result and docx_result and fallback_result and not json_out.closed
+                and fallback_out.getvalue().decode("utf-8").splitlines()[251] == "too\tmany\tfields"
+                and len(records) == 3 and '"Name":"Alice"' in records[0]
+                and txt_out.getvalue().decode("utf-8").splitlines()[1] == "Alice,30,NewYork"
+                and pdf_out.getvalue().count(b"\f") == 3 and pdf_result.pages == 4
+                and docx_out.getvalue()[:2] == b"PK" and csv_result.input_path == "<BytesIO>"):
+            print("✓ Stream I/O successful")
+            return True
+        else:
+            print(f"✗ Unexpected stream output: {csv_result!s} / {txt_result!s} / {fallback_result!s} / {pdf_result!s}")
+            return False
+    except Exception as e:
+        print(f"✗ Stream I/O error: {e}")
+        return False
+
+
+def test_async_api():
+    """Test the asyncio API: per-format concurrency limit, unknown formats and timeouts."""
+    import asyncio
+    import threading
+    from converters.async_api import AsyncConverter
+    from converters.result import ConversionObserver, add_observer, remove_observer
+    
+    print("\n--- Testing Async API ---")
+    csv_path = create_test_csv()
+    
+    class Concurrency(ConversionObserver):
+        def __init__(self):
+            self.lock = threading.Lock()
+            self.running = 0
+            self.peak = 0
+        
+        def on_start(self, result):
+            with self.lock:
+                self.running += 1
+                self.peak = max(self.peak, self.running)
+        
+        def on_finish(self, result):
+            with self.lock:
+                self.running -= 1
+    
+    async def run(observer):
+        async with AsyncConverter(limits={"CSV": 1}) as converter:
+            jobs = [(csv_path, os.path.join(tempfile.gettempdir(), f"output_test_async{i}.json")) for i in range(4)]
+            jobs.append((csv_path.replace(".csv", ".xyz"), "unused.json"))
+            add_observer(observer)
+            try:
+                results = await converter.convert_batch(jobs)
+            finally:
+                remove_observer(observer)
+            try:
+                await converter.convert(csv_path, jobs[0][1], timeout=0)
+                timed_out = False
+            except asyncio.TimeoutError:
+                timed_out = True
+            return results, timed_out
+    
+    try:
+        observer = Concurrency()
+        results, timed_out = asyncio.run(run(observer))
+        if (all(results[:4]) and not results[4] and "No converter" in results[4].error
+                and observer.peak == 1 and timed_out):
+            print("✓ Async API successful")
+            return True
+        else:
+            print(f"✗ Unexpected async results: {[str(result) for result in results]}, peak {observer.peak}")
+            return False
+    except Exception as e:
+        print(f"✗ Async API error: {e}")
+        return False
+
+
+def test_watch_folder():
+    """Test watch mode: the manifest skips converted files on restart and catches changed ones."""
+    import contextlib
+    import io
+    import json
+    import multiprocessing
+    import shutil
+    from converters.watch import FolderWatch, watch_folder
+    
+    print("\n--- Testing Watch Folder ---")
+    csv_path = create_test_csv()
+    input_dir = os.path.join(tempfile.gettempdir(), "test_watch_in")
+    output_dir = os.path.join(tempfile.gettempdir(), "test_watch_out")
+    for directory in (input_dir, output_dir):
+        shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(input_dir)
+    for name in ("a.csv", "b.csv", "c.csv"):
+        shutil.copy(csv_path, os.path.join(input_dir, name))
+    # A broken file fails once and is not retried until it changes
+    with open(os.path.join(input_dir, "broken.csv"), "w", encoding="utf-8") as f:
+        f.write("id,name\n1,2,3,4\n")
+    
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            summary = watch_folder(input_dir, output_dir, ".json", jobs=1, debounce=0, once=True)
+        return sorted(os.path.basename(item.input_path) for item in summary.items)
+    
+    try:
+        first = run()
+        restarted = run()
+        
+        # A check of the unchanged broken file in the same process does not queue it again
+        folder_watch = FolderWatch(input_dir, output_dir, ".json", jobs=1, debounce=0)
+        folder_watch.check(os.path.join(input_dir, "broken.csv"))
+        requeued = list(folder_watch._pending)
+        # Touched without a change, and changed
+        os.utime(os.path.join(input_dir, "a.csv"))
+        with open(os.path.join(input_dir, "b.csv"), "a") as f:
+            f.write("Dana,40,Boston\n")
+        changed = run()
+        with open(os.path.join(output_dir, "b.json"), encoding="utf-8") as f:
+            rows = json.load(f)
+        
+        # A worker that dies does not stop the watch, and its file is tried again on restart
+        # (the workers are forked, so they inherit the replaced method)
+        crashed = None
+        if multiprocessing.get_start_method() == "fork":
+            with open(os.path.join(input_dir, "c.csv"), "a") as f:
+                f.write("Dana,40,Boston\n")
+            convert = CSVConverter.convert
+            CSVConverter.convert = lambda self, *args, **kwargs: os._exit(1)
+            try:
+                crashed = run()
+            finally:
+                CSVConverter.convert = convert
+            crashed = (crashed, run())
+        
+        if (first == ["a.csv", "b.csv", "broken.csv", "c.csv"] and restarted == [] and requeued == []
+                and changed == ["b.csv"] and len(rows) == 4 and crashed in (None, ([], ["c.csv"]))):
+            print("✓ Watch folder successful")
+            return True
+        else:
+            print(f"✗ Unexpected watch runs: {first}, {restarted}, {requeued}, {changed}, {crashed}")
+            return False
+    except Exception as e:
+        print(f"✗ Watch folder error: {e}")
+        return False
+
+
+def test_http_service():
+    """Test the HTTP service: upload, status, streamed download, 429 when the queue is full and worker crashes."""
+    import json
+    import signal
+    import threading
+    import time
+    import urllib.error
+    import urllib.parse
+    import urllib.request
+    from converters.server import ConversionServer, ConversionService
+    
+    print("\n--- Testing HTTP Service ---")
+    csv_path = create_test_csv()
+    service = ConversionService(workers=1, queue_size=0)
+    server = ConversionServer(("127.0.0.1", 0), service)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    
+    def upload(filename="test.csv"):
+        with open(csv_path, "rb") as f:
+            request = urllib.request.Request(f"{url}/jobs?filename={urllib.parse.quote(filename)}&to=json",
+                                             data=f.read(), method="POST")
+        with urllib.request.urlopen(request) as response:
+            return response.status, json.load(response)
+    
+    def wait(job):
+        while job["status"] in ("queued", "running"):
+            time.sleep(0.05)
+            with urllib.request.urlopen(f"{url}/jobs/{job['id']}") as response:
+                job = json.load(response)
+        return job
+    
+    try:
+        status, job = upload()
+        job = wait(job)
+        with urllib.request.urlopen(f"{url}{job['result_url']}") as response:
+            rows = json.load(response)
+        
+        # A name with a line break cannot add headers, and a non-ASCII name is encoded
+        named = wait(upload("évil\r\nSet-Cookie: x=1.csv")[1])
+        with urllib.request.urlopen(f"{url}{named['result_url']}") as response:
+            disposition = response.headers.get_all("Content-Disposition")
+            injected = response.headers.get("Set-Cookie")
+        
+        # Hold the only queue slot so the next upload is refused
+        service.reserve()
+        try:
+            upload()
+            refused = None
+        except urllib.error.HTTPError as e:
+            refused = e.code
+        finally:
+            service.release()
+        
+        # A worker that dies fails the job it was to run, and a new pool runs the next one
+        pid = service._pool.submit(os.getpid).result()
+        blocker = service._pool.submit(time.sleep, 5)
+        _, crashed = upload()
+        os.kill(pid, signal.SIGKILL)
+        after_crash = [wait(crashed), wait(upload()[1])]
+        
+        if (status == 202 and job["status"] == "success" and len(rows) == 3 and refused == 429
+                and [job["status"] for job in after_crash] == ["failed", "success"] and injected is None
+                and disposition == ["attachment; filename=\"_vilSet-Cookie: x=1.json\"; "
+                                    "filename*=UTF-8''%C3%A9vilSet-Cookie%3A%20x%3D1.json"]):
+            print("✓ HTTP service successful")
+            return True
+        else:
+            print(f"✗ Unexpected service results: {status}, {job}, refused with {refused}, "
+                  f"after a crash {after_crash}, download headers {disposition}")
+            return False
+    except Exception as e:
+        print(f"✗ HTTP service error: {e}")
+        return False
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.close()
+
+
+def test_gui_job_queue():
+    """Test the GUI job queue: concurrent jobs report their progress as events, off the Tk thread."""
+    import time
+    from converters.registry import get_spec
+    from ui.job_queue import JobQueue
+    
+    print("\n--- Testing GUI Job Queue ---")
+    csv_path = create_test_csv()
+    pdf_path = create_test_pdf(pages=2)
+    job_queue = JobQueue(workers=2)
+    try:
+        jobs = [job_queue.submit(csv_path, os.path.join(tempfile.gettempdir(), f"output_test_queue{i}.json"),
+                                 get_spec(".csv")) for i in range(3)]
+        jobs.append(job_queue.submit(pdf_path, os.path.join(tempfile.gettempdir(), "output_test_queue.txt"),
+                                     get_spec(".pdf")))
+        events = []
+        deadline = time.time() + 60
+        while sum(1 for event, _ in events if event == "finished") < len(jobs) and time.time() < deadline:
+            events.extend(job_queue.drain())
+            time.sleep(0.05)
+        
+        running = [job.id for event, job in events if event == "running"]
+        if all(job.status == "success" for job in jobs) and sorted(running) == [job.id for job in jobs]:
+            print("✓ GUI job queue successful")
+            return True
+        else:
+            print(f"✗ Unexpected job states: {[(job.status, job.error) for job in jobs]}")
+            return False
+    except Exception as e:
+        print(f"✗ GUI job queue error: {e}")
+        return False
+    finally:
+        job_queue.shutdown()
+
+
+def test_progress_and_cancellation():
+    """Test progress reports against the input size, and cancelling a conversion between chunks."""
+    from converters.progress import CancellationToken
+    
+    print("\n--- Testing Progress and Cancellation ---")
+    csv_path = os.path.join(tempfile.gettempdir(), "test_progress.csv")
+    with open(csv_path, 'w') as f:
+        f.write("id,name\n")
+        for i in range(2000):
+            f.write(f"{i},name {i}\n")
+    
+    try:
+        reports = []
+        output_path = os.path.join(tempfile.gettempdir(), "output_test_progress.jsonl")
+        result = CSVConverter(csv_path, chunksize=100).convert(
+            output_path, on_progress=lambda progress: reports.append(progress.to_dict()))
+        if not result or not reports or reports[-1]['rows'] != 2000 or reports[-1]['fraction'] != 1.0:
+            print(f"✗ Unexpected progress reports: {reports[-1:]}")
+            return False
+        
+        # The token is cancelled from the first report, so the conversion stops after one chunk
+        token = CancellationToken()
+        cancelled_path = os.path.join(tempfile.gettempdir(), "output_test_cancelled.jsonl")
+        result = CSVConverter(csv_path, chunksize=100).convert(
+            cancelled_path, on_progress=lambda progress: token.cancel(), cancel_token=token)
+        # A token cancelled before the start leaves an existing output alone
+        with open(output_path, 'w') as f:
+            f.write('kept')
+        early = CSVConverter(csv_path).convert(output_path, cancel_token=token)
+        with open(output_path) as f:
+            kept = f.read() == 'kept'
+        if (not result and result.status == 'cancelled' and not os.path.exists(cancelled_path)
+                and early.status == 'cancelled' and kept):
+            print("✓ Progress and cancellation successful")
+            return True
+        else:
+            print(f"✗ Cancelled conversion ended as {result.status}, output kept: {os.path.exists(cancelled_path)}, "
+                  f"existing output kept: {kept}")
+            return False
+    except Exception as e:
+        print(f"✗ Progress and cancellation error: {e}")
+        return False
+
+
+def test_input_preview():
+    """Test previews: only the head of the input is read, off the calling thread, and cached per file."""
+    import time
+    from converters.registry import get_spec
+    from ui.preview import PreviewLoader
+    
+    print("\n--- Testing Input Preview ---")
+    csv_path = os.path.join(tempfile.gettempdir(), "test_preview.csv")
+    with open(csv_path, 'w') as f:
+        f.write("id,name\n")
+        for i in range(200000):
+            f.write(f"{i},name {i}\n")
+    docx_path = create_test_docx()
+    pdf_path = create_test_pdf(pages=4)
+    loader = PreviewLoader()
+    try:
+        if CSVConverter(csv_path).preview(limit=5).splitlines()[-1].split() != ['4', 'name', '4']:
+            print("✗ CSV preview does not end with the fifth row")
+            return False
+        
+        paths = [csv_path, docx_path, pdf_path]
+        cached = [loader.request(path, get_spec(path)) for path in paths]
+        results = {}
+        deadline = time.time() + 30
+        while len(results) < len(paths) and time.time() < deadline:
+            results.update((path, (text, error)) for path, text, error in loader.drain())
+            time.sleep(0.01)
+        
+        csv_lines = (results.get(csv_path, ('', None))[0] or '').splitlines()
+        checks = [
+            not any(cached),
+            len(csv_lines) == 51,
+            "first paragraph" in (results.get(docx_path, ('', None))[0] or ''),
+            "Page 2 heading" in (results.get(pdf_path, ('', None))[0] or ''),
+            "Page 3 heading" not in (results.get(pdf_path, ('', None))[0] or ''),
+            # The second request is answered from the cache
+            loader.request(csv_path, get_spec(csv_path)),
+        ]
+        if all(checks):
+            print("✓ Input preview successful")
+            return True
+        else:
+            print(f"✗ Unexpected previews: {checks}, {results}")
+            return False
+    except Exception as e:
+        print(f"✗ Input preview error: {e}")
+        return False
+    finally:
+        loader.shutdown()
+
+
+
+def test_compressed_io():
+    """Test compressed inputs and outputs: detected by magic bytes, read and written as streams."""
+    import bz2
+    import gzip
+    import io
+    import json
+    import lzma
+    from converters.registry import create_converter
+    from converters.txt_converter import TXTConverter
+    
+    print("\n--- Testing Compressed Inputs and Outputs ---")
+    temp_dir = tempfile.gettempdir()
+    text = "id,name\n" + "".join(f"{i},name {i}\n" for i in range(1000))
+    csv_path = os.path.join(temp_dir, "test_compressed.csv.gz")
+    with open(csv_path, 'wb') as f:
+        f.write(gzip.compress(text.encode('utf-8')))
+    # The suffix is wrong on purpose: the input is recognised by its magic bytes
+    txt_path = os.path.join(temp_dir, "test_compressed.txt.gz")
+    with open(txt_path, 'wb') as f:
+        f.write(bz2.compress(text.replace(',', '\t').encode('utf-8')))
+    json_path = os.path.join(temp_dir, "test_compressed.json.gz")
+    csv_output = os.path.join(temp_dir, "test_compressed_out.csv.xz")
+    level_output = os.path.join(temp_dir, "test_compressed_level.json.bz2")
+    if os.path.exists(level_output):
+        os.remove(level_output)
+    try:
+        ok = bool(create_converter(csv_path, compresslevel=1).convert(json_path))
+        with gzip.open(json_path, 'rt', encoding='utf-8') as f:
+            records = json.load(f)
+        
+        ok = ok and bool(TXTConverter(txt_path).convert(csv_output))
+        with lzma.open(csv_output, 'rt', encoding='utf-8') as f:
+            round_trip = f.read()
+        
+        # A compressed stream without a name, written to a stream with output_format
+        with open(txt_path, 'rb') as f:
+            source = io.BytesIO(f.read())
+        output = io.BytesIO()
+        stream_ok = bool(TXTConverter(source).convert(output, output_format='.jsonl.gz'))
+        lines = gzip.decompress(output.getvalue()).decode('utf-8').splitlines()
+        
+        # A compressed PDF is decompressed once, however often its bytes are needed
+        pdf_path = os.path.join(temp_dir, "test_compressed.pdf.gz")
+        with open(create_test_pdf(), 'rb') as source_pdf, open(pdf_path, 'wb') as f:
+            f.write(gzip.compress(source_pdf.read()))
+        pdf_converter = PDFConverter(pdf_path, jobs=1, mode='fast')
+        pdf_ok = (pdf_converter.pdf_source() is pdf_converter.pdf_source()
+                  and bool(pdf_converter.convert(os.path.join(temp_dir, "test_compressed_pdf.txt"))))
+        
+        checks = [
+            ok, stream_ok, pdf_ok,
+            len(records) == 1000 and records[-1] == {"id": 999, "name": "name 999"},
+            round_trip == text,
+            len(lines) == 1000,
+            TXTConverter(txt_path).preview(limit=2).splitlines()[-1].split() == ['1', 'name', '1'],
+            # An out-of-range level fails before the output is created
+            not create_converter(csv_path, compresslevel=42).convert(level_output),
+            not os.path.exists(level_output),
+        ]
+        if all(checks):
+            print("✓ Compressed inputs and outputs successful")
+            return True
+        else:
+            print(f"✗ Unexpected compressed conversions: {checks}")
+            return False
+    except Exception as e:
+        print(f"✗ Compressed I/O error: {e}")
+        return False
+
 def test_txt_converter():
     """Test TXT converter."""
     print("\n--- Testing TXT Converter ---")
@@ -114,6 +1217,104 @@ def test_txt_converter():
         return False
 
 
+def test_txt_delimiter_sniffing():
+    """Test that TXT layouts are detected from a sample of the file."""
+    import pandas as pd
+    
+    print("\n--- Testing TXT Delimiter Sniffing ---")
+    samples = {
+        # Tab-separated with a header row
+        "sniff_tab.txt": ("Name\tCity\nAlice\tNew York\nBob\tLos Angeles\n", ['Name', 'City'], 2),
+        # Pipe-separated without a header row
+        "sniff_pipe.txt": ("1|Alice\n2|Bob\n3|Charlie\n", ['column1', 'column2'], 3),
+        # Fixed-width columns with spaces inside the values
+        "sniff_fixed.txt": ("Name       City\nAlice Ray  New York\nBob        Los Angeles\n", ['Name', 'City'], 2),
+        # Unstructured log lines fall back to a single text column
+        "sniff_log.txt": ("server started on port 80\nrequest from 10.0.0.1 took 3 ms\n", ['text'], 2),
+    }
+    
+    try:
+        for name, (content, columns, rows) in samples.items():
+            txt_path = os.path.join(tempfile.gettempdir(), name)
+            output_csv = txt_path.replace('.txt', '.csv')
+            with open(txt_path, 'w') as f:
+                f.write(content)
+            
+            result = TXTConverter(txt_path).convert(output_csv)
+            df = pd.read_csv(output_csv)
+            if not result or list(df.columns) != columns or len(df) != rows:
+                print(f"✗ TXT sniffing produced the wrong table for {name}: {list(df.columns)}, {len(df)} rows")
+                return False
+        
+        print("✓ TXT delimiter sniffing successful")
+        return True
+    except Exception as e:
+        print(f"✗ TXT delimiter sniffing error: {e}")
+        return False
+
+
+
+def test_txt_layout_past_sample():
+    """Test that a line that breaks the sniffed layout after the sample makes the whole file plain text."""
+    import pandas as pd
+    from converters.sniffer import SAMPLE_SIZE
+    
+    print("\n--- Testing TXT Layout Past The Sample ---")
+    txt_path = os.path.join(tempfile.gettempdir(), "test_layout_past_sample.txt")
+    output_csv = os.path.join(tempfile.gettempdir(), "output_test_layout_past_sample.csv")
+    rows = [f"{i}\tname {i}\t{i * 1.5}" for i in range(5000)]
+    # Row 4000 starts a chunk of 1000 rows, far past the sample
+    rows[4000] = "this\tline\thas\ttoo\tmany fields"
+    with open(txt_path, 'w', encoding='utf-8') as f:
+        f.write("id\tname\tscore\n" + "\n".join(rows) + "\n")
+    
+    try:
+        result = TXTConverter(txt_path, chunksize=1000).convert(output_csv)
+        df = pd.read_csv(output_csv)
+        if (result and os.path.getsize(txt_path) > SAMPLE_SIZE and list(df.columns) == ['text']
+                and len(df) == 5001 and df['text'][4001] == rows[4000]):
+            print("✓ The whole file was converted as plain text")
+            return True
+        else:
+            print(f"✗ Unexpected conversion: {result.status}, columns {list(df.columns)}, {len(df)} rows")
+            return False
+    except Exception as e:
+        print(f"✗ TXT layout past the sample error: {e}")
+        return False
+
+def test_txt_plain_text_encodings():
+    """Test the streaming plain-text fallback with non-UTF-8 input."""
+    import pandas as pd
+    
+    print("\n--- Testing TXT Plain Text Encodings ---")
+    text = "Café opened\nNaïve résumé line\nLast line"
+    samples = {
+        "plain_latin1.txt": text.encode('latin-1'),
+        "plain_utf8_bom.txt": text.encode('utf-8-sig'),
+        "plain_utf16.txt": text.encode('utf-16'),
+    }
+    
+    try:
+        for name, content in samples.items():
+            txt_path = os.path.join(tempfile.gettempdir(), name)
+            output_csv = txt_path.replace('.txt', '.csv')
+            with open(txt_path, 'wb') as f:
+                f.write(content)
+            
+            # A chunk size of two rows forces the fallback to yield several chunks
+            result = TXTConverter(txt_path, chunksize=2).convert(output_csv)
+            df = pd.read_csv(output_csv)
+            if not result or list(df['text']) != text.split('\n'):
+                print(f"✗ TXT plain text fallback garbled {name}: {list(df.get('text', []))}")
+                return False
+        
+        print("✓ TXT plain text encodings successful")
+        return True
+    except Exception as e:
+        print(f"✗ TXT plain text encodings error: {e}")
+        return False
+
+
 def main():
     """Run all tests."""
     print("=" * 50)
@@ -125,12 +1326,70 @@ def main():
     # Test CSV Converter
     results.append(("CSV Converter", test_csv_converter()))
     
+    # Test CSV streaming JSON output
+    results.append(("CSV Streaming JSON", test_csv_streaming_json()))
+    
+    # Test that column types do not change between chunks
+    results.append(("CSV Chunk Types", test_csv_chunk_types()))
+    
+    # Test that a failed conversion leaves no partial output
+    results.append(("CSV Failure Cleanup", test_csv_failed_output_removed()))
+    
+    # Test that records with more fields than the header are not truncated
+    results.append(("CSV Extra Fields", test_csv_extra_fields()))
+    
+    # Test XLSX sheet rollover
+    results.append(("XLSX Sheet Rollover", test_xlsx_sheet_rollover()))
+    
+    # Test writing several outputs from one parse
+    results.append(("CSV convert_many", test_csv_convert_many()))
+    
+    # Test parallel byte-range parsing
+    results.append(("CSV Parallel Byte Ranges", test_csv_parallel_ranges()))
+    
+    # Test that parallel byte ranges keep the sequential column types
+    results.append(("CSV Parallel Column Types", test_csv_parallel_types()))
+    
     # Test DOCX Converter
     results.append(("DOCX Converter", test_docx_converter()))
     
+    # Test the streaming DOCX engine with a table
+    results.append(("DOCX Streaming Engine", test_docx_stream_tables()))
+    
+    # Test that a corrupt DOCX leaves no output behind
+    results.append(("Corrupt DOCX", test_docx_corrupt()))
+    
+    # Test page-parallel PDF conversion
+    results.append(("PDF Page-Parallel Conversion", test_pdf_parallel_pages()))
+    results.append(("PDF Triage", test_pdf_triage()))
+    results.append(("PDF Text-Only Streaming", test_pdf_text_only_stream()))
+    results.append(("PDF to TXT/JSONL", test_pdf_to_text()))
+    results.append(("Lazy Converter Registry", test_lazy_registry()))
+    results.append(("Batch CLI", test_batch_cli()))
+    results.append(("Conversion Cache", test_conversion_cache()))
+    results.append(("Conversion Result", test_conversion_result()))
+    results.append(("Profiling Mode", test_profiling_mode()))
+    results.append(("Stream I/O", test_stream_io()))
+    results.append(("Async API", test_async_api()))
+    results.append(("Watch Folder", test_watch_folder()))
+    results.append(("HTTP Service", test_http_service()))
+    results.append(("GUI Job Queue", test_gui_job_queue()))
+    results.append(("Progress and Cancellation", test_progress_and_cancellation()))
+    results.append(("Input Preview", test_input_preview()))
+    results.append(("Compressed I/O", test_compressed_io()))
+    
     # Test TXT Converter
     results.append(("TXT Converter", test_txt_converter()))
     
+    # Test TXT delimiter sniffing
+    results.append(("TXT Delimiter Sniffing", test_txt_delimiter_sniffing()))
+    
+    # Test that a layout break after the sample falls back to plain text
+    results.append(("TXT Layout Past The Sample", test_txt_layout_past_sample()))
+    
+    # Test the plain text fallback with different encodings
+    results.append(("TXT Plain Text Encodings", test_txt_plain_text_encodings()))
+    
     # Summary
     print("\n" + "=" * 50)
     print("Test Summary")
@@ -1,24 +1,26 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from tkinter.ttk import Combobox
-import threading
 import os
 from pathlib import Path
 import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from converters.csv_converter import CSVConverter
-from converters.pdf_converter import PDFConverter
-from converters.docx_converter import DOCXConverter
-from converters.txt_converter import TXTConverter
-from utils.file_utils import validate_file, get_output_path, get_file_extension, ensure_directory_exists
+# Converter classes are imported on first use, so the window opens without loading pandas or pdf2docx
+from converters.registry import CONVERTERS, get_spec
+from utils.file_utils import validate_file, get_output_path, get_file_extension
+from ui.job_queue import JobQueue
+from ui.preview import PreviewLoader
+
+# Milliseconds between two checks of the job queue's events
+POLL_INTERVAL_MS = 100
 
 
 class FileConverterGUI:
     def __init__(self, root):
         self.root = root
         self.root.title("File Converter")
-        self.root.geometry("800x700")
+        self.root.geometry("800x960")
         self.root.resizable(True, True)
         self.root.minsize(600, 500)
         
@@ -48,27 +50,31 @@ class FileConverterGUI:
         # Configure colors and fonts
         self.setup_styles()
         
-        # Converter mapping
-        self.converters = {
-            "CSV": CSVConverter,
-            "PDF": PDFConverter,
-            "DOCX": DOCXConverter,
-            "TXT": TXTConverter,
-        }
+        # Converter mapping (format name -> registry entry; the class is loaded on first use)
+        self.converters = {spec.name: spec for spec in CONVERTERS}
         
         # Input/Output format mappings
         self.format_options = {
-            "CSV": [".csv", ".xlsx", ".json", ".html"],
-            "PDF": [".docx"],
+            "CSV": [".csv", ".xlsx", ".json", ".jsonl", ".html"],
+            "PDF": [".docx", ".txt", ".jsonl"],
             "DOCX": [".txt"],
-            "TXT": [".csv", ".xlsx", ".json"],
+            "TXT": [".csv", ".xlsx", ".json", ".jsonl"],
         }
         
         self.input_file_path = tk.StringVar()
         self.output_file_path = tk.StringVar()
-        self.conversion_running = False
+        
+        # Conversions run on the queue's worker threads; only the Tk main loop touches widgets
+        self.job_queue = JobQueue()
+        # Job id -> Treeview row, and the jobs started with the Convert button (shown in a message box)
+        self.job_rows = {}
+        self.notify_jobs = set()
+        # Previews of the input file are read on a background thread as well
+        self.preview_loader = PreviewLoader()
         
         self.setup_ui()
+        self.root.after(POLL_INTERVAL_MS, self.process_job_events)
+        self.root.after(POLL_INTERVAL_MS, self.process_preview_results)
     
     def setup_styles(self):
         """Configure all style settings for GUI"""
@@ -98,6 +104,13 @@ class FileConverterGUI:
         
         # Progress bar
         self.style.configure("TProgressbar", background=self.success_color, troughcolor=self.bg_primary)
+        
+        # Job queue table
+        self.style.configure("Treeview", background=self.bg_primary, fieldbackground=self.bg_primary,
+                             foreground=self.text_primary, font=(self.font_family, 9), rowheight=22)
+        self.style.configure("Treeview.Heading", background=self.bg_secondary, foreground=self.text_primary,
+                             font=(self.font_family, 9, "bold"))
+        self.style.map("Treeview", background=[("selected", self.accent_color)])
 
     def apply_theme(self):
         """Apply colors to styles and widgets based on current theme."""
@@ -160,6 +173,20 @@ class FileConverterGUI:
         except Exception:
             pass
 
+        # Preview
+        try:
+            self.preview_text.config(bg=self.bg_primary, fg=self.text_primary, insertbackground=self.text_primary,
+                                     highlightbackground=self.border_color)
+        except Exception:
+            pass
+
+        # Queue buttons
+        try:
+            for button in (self.add_files_button, self.cancel_job_button, self.clear_jobs_button):
+                button.config(bg=self.bg_primary, fg=self.text_muted, font=(self.font_family, 9, "bold"))
+        except Exception:
+            pass
+
         # Buttons
         try:
             self.convert_button.config(bg=self.accent_color, fg=self.text_primary, font=(self.font_family, 11, "bold"))
@@ -307,7 +334,7 @@ class FileConverterGUI:
             font=(self.font_family, 10)
         )
         self.input_format_combo.grid(row=0, column=1, sticky=tk.W, padx=(10, 0), pady=8)
-        self.input_format_combo.bind("<<ComboboxSelected>>", self.update_output_formats)
+        self.input_format_combo.bind("<<ComboboxSelected>>", self.on_input_format_selected)
         
         # Output format with label
         self.output_format_label = tk.Label(settings_frame, text="Output Format:", font=(self.font_family, 10, "bold"), bg=self.bg_primary, fg=self.text_primary)
@@ -323,6 +350,32 @@ class FileConverterGUI:
         )
         self.output_format_combo.grid(row=1, column=1, sticky=tk.W, padx=(10, 0), pady=8)
         
+        # Preview Section: the head of the input file as the selected converter reads it
+        preview_frame = ttk.LabelFrame(content_frame, text="🔍 Preview", padding="15")
+        preview_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 15))
+        
+        preview_text_frame = ttk.Frame(preview_frame)
+        preview_text_frame.pack(fill=tk.BOTH, expand=True)
+        self.preview_text = tk.Text(
+            preview_text_frame,
+            height=6,
+            wrap=tk.NONE,
+            font=("Courier", 9),
+            bg=self.bg_primary,
+            fg=self.text_primary,
+            relief=tk.FLAT,
+            highlightthickness=1,
+            highlightbackground=self.border_color,
+            state=tk.DISABLED
+        )
+        preview_scrollbar = ttk.Scrollbar(preview_text_frame, orient=tk.VERTICAL, command=self.preview_text.yview)
+        preview_xscrollbar = ttk.Scrollbar(preview_frame, orient=tk.HORIZONTAL, command=self.preview_text.xview)
+        self.preview_text.configure(yscrollcommand=preview_scrollbar.set, xscrollcommand=preview_xscrollbar.set)
+        self.preview_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        preview_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        preview_xscrollbar.pack(fill=tk.X)
+        self.show_preview("Select an input file to preview it")
+        
         # Progress Section
         progress_frame = ttk.LabelFrame(content_frame, text="⏱️ Progress", padding="15")
         progress_frame.pack(fill=tk.X, pady=(0, 15))
@@ -340,6 +393,29 @@ class FileConverterGUI:
         self.progress_bar = ttk.Progressbar(progress_frame, mode="indeterminate", length=400)
         self.progress_bar.pack(fill=tk.X, pady=(0, 0))
         
+        # Queue Section: every queued, running and finished conversion
+        queue_frame = ttk.LabelFrame(content_frame, text="📋 Queue", padding="15")
+        queue_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 15))
+        
+        table_frame = ttk.Frame(queue_frame)
+        table_frame.pack(fill=tk.BOTH, expand=True)
+        self.job_table = ttk.Treeview(table_frame, columns=("file", "output", "status", "progress", "time"),
+                                      show="headings", height=6)
+        for column, heading, width in (("file", "File", 200), ("output", "Output", 200), ("status", "Status", 80),
+                                       ("progress", "Progress", 80), ("time", "Time", 70)):
+            self.job_table.heading(column, text=heading, anchor=tk.W)
+            self.job_table.column(column, width=width, anchor=tk.W, stretch=column in ("file", "output"))
+        job_scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.job_table.yview)
+        self.job_table.configure(yscrollcommand=job_scrollbar.set)
+        self.job_table.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        job_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        queue_buttons = ttk.Frame(queue_frame)
+        queue_buttons.pack(fill=tk.X, pady=(10, 0))
+        self.add_files_button = self.create_queue_button(queue_buttons, "➕ Add Files", self.add_files)
+        self.cancel_job_button = self.create_queue_button(queue_buttons, "⏹ Cancel Selected", self.cancel_selected_jobs)
+        self.clear_jobs_button = self.create_queue_button(queue_buttons, "🧹 Clear Finished", self.clear_finished_jobs)
+        
         # Buttons Section with enhanced styling
         button_frame = ttk.Frame(content_frame)
         button_frame.pack(fill=tk.X, pady=(15, 0))
@@ -402,6 +478,26 @@ class FileConverterGUI:
         # Ensure theme reflects initial state
         self.apply_theme()
 
+    def create_queue_button(self, parent, text, command):
+        """Create a small flat button for the queue panel."""
+        button = tk.Button(
+            parent,
+            text=text,
+            command=command,
+            bg=self.bg_primary,
+            fg=self.text_muted,
+            font=(self.font_family, 9, "bold"),
+            relief=tk.FLAT,
+            bd=0,
+            padx=10,
+            pady=6,
+            cursor="hand2"
+        )
+        button.pack(side=tk.LEFT, padx=(0, 10))
+        button.bind("<Enter>", lambda e: button.config(fg=self.text_primary))
+        button.bind("<Leave>", lambda e: button.config(fg=self.text_muted))
+        return button
+
     def toggle_theme(self):
         """Toggle between dark and light themes."""
         self.theme = "light" if self.theme == "dark" else "dark"
@@ -417,6 +513,7 @@ class FileConverterGUI:
                 ("PDF Files", "*.pdf"),
                 ("Word Files", "*.docx"),
                 ("Text Files", "*.txt"),
+                ("Compressed Files", "*.gz *.bz2 *.xz *.zst"),
             ]
         )
         
@@ -424,18 +521,13 @@ class FileConverterGUI:
             self.input_file_path.set(file_path)
             # Auto-detect input format from file extension
             file_ext = get_file_extension(file_path).lower()  # e.g., '.csv'
-            # Map the different extensions to converter types
-            ext_to_format = {
-                '.csv': 'CSV',
-                '.pdf': 'PDF',
-                '.docx': 'DOCX',
-                '.txt': 'TXT',
-            }
-            if file_ext in ext_to_format:
-                detected_format = ext_to_format[file_ext]
-                self.input_format_var.set(detected_format)
+            # Map the extension to a converter type
+            spec = get_spec(file_ext)
+            if spec is not None:
+                self.input_format_var.set(spec.name)
                 # Auto-update output formats based on detected input
                 self.update_output_formats()
+            self.request_preview()
     
     def select_output_file(self):
         """Open file dialog to select output file path."""
@@ -452,6 +544,39 @@ class FileConverterGUI:
         if file_path:
             self.output_file_path.set(file_path)
     
+    def on_input_format_selected(self, event=None):
+        """Update the output formats and the preview for the chosen input format."""
+        self.update_output_formats()
+        self.request_preview()
+    
+    def request_preview(self):
+        """Preview the input file with the selected input format's converter, off the Tk thread."""
+        input_file = self.input_file_path.get()
+        spec = self.converters.get(self.input_format_var.get())
+        if not input_file or spec is None:
+            return
+        if not self.preview_loader.request(input_file, spec):
+            self.show_preview(f"Loading preview of {os.path.basename(input_file)}...")
+    
+    def process_preview_results(self):
+        """Show finished previews of the current input file; runs on the Tk main loop every POLL_INTERVAL_MS."""
+        for path, text, error in self.preview_loader.drain():
+            # A preview of a file that is no longer selected is cached but not shown
+            if path != self.input_file_path.get():
+                continue
+            if error is not None:
+                self.show_preview(f"No preview available: {error}")
+            else:
+                self.show_preview(text or "(empty)")
+        self.root.after(POLL_INTERVAL_MS, self.process_preview_results)
+    
+    def show_preview(self, text):
+        """Replace the text of the read-only preview pane."""
+        self.preview_text.config(state=tk.NORMAL)
+        self.preview_text.delete("1.0", tk.END)
+        self.preview_text.insert("1.0", text)
+        self.preview_text.config(state=tk.DISABLED)
+    
     def update_output_formats(self, event=None):
         """Update available output formats based on input format."""
         input_fmt = self.input_format_var.get()
@@ -481,55 +606,122 @@ class FileConverterGUI:
             messagebox.showerror("Error", "Please select an output file path.")
             return
         
-        # Run the conversion in a separate thread to prevent the UI from freezing
-        thread = threading.Thread(target=self.perform_conversion)
-        thread.daemon = True
-        thread.start()
+        # The conversion runs on the job queue; its events are handled in process_job_events
+        job = self.enqueue(self.input_file_path.get(), self.output_file_path.get(),
+                           self.converters[self.input_format_var.get()])
+        self.notify_jobs.add(job.id)
     
-    def perform_conversion(self):
-        """Execute the file conversion."""
-        try:
-            self.conversion_running = True
-            self.convert_button.config(state=tk.DISABLED)
-            self.progress_bar.start()
-            self.progress_var.set("⏳ Converting... (in progress)")
+    def add_files(self):
+        """Queue several files at once, each converted next to itself to the selected output format."""
+        output_format = self.output_format_var.get()
+        if not output_format:
+            messagebox.showwarning("Warning", "Please select an output format first.")
+            return
+        
+        file_paths = filedialog.askopenfilenames(title="Select files to convert")
+        skipped = []
+        for file_path in file_paths:
+            spec = get_spec(file_path)
+            if spec is None or output_format not in self.format_options.get(spec.name, []):
+                skipped.append(os.path.basename(file_path))
+                continue
+            self.enqueue(file_path, get_output_path(file_path, output_format.lstrip(".")), spec)
+        
+        if skipped:
+            messagebox.showwarning("Warning", f"These files cannot be converted to {output_format}:\n"
+                                   + "\n".join(skipped))
+    
+    def enqueue(self, input_file, output_file, spec):
+        """Submit a conversion to the job queue and add its row to the queue table."""
+        job = self.job_queue.submit(input_file, output_file, spec)
+        self.job_rows[job.id] = self.job_table.insert(
+            "", tk.END, values=(os.path.basename(input_file), os.path.basename(output_file), job.status, "", ""))
+        self.update_progress()
+        return job
+    
+    def cancel_selected_jobs(self):
+        """Cancel the selected jobs; running ones stop at their next chunk or page."""
+        selected = set(self.job_table.selection())
+        for job in self.job_queue.jobs:
+            if self.job_rows.get(job.id) in selected:
+                self.job_queue.cancel(job)
+    
+    def clear_finished_jobs(self):
+        """Remove finished and cancelled jobs from the queue table."""
+        for job in list(self.job_queue.jobs):
+            if job.status in ("success", "failed", "cancelled"):
+                self.job_table.delete(self.job_rows.pop(job.id))
+                self.job_queue.jobs.remove(job)
+    
+    def process_job_events(self):
+        """Apply the job queue's events to the widgets; runs on the Tk main loop every POLL_INTERVAL_MS."""
+        for event, job in self.job_queue.drain():
+            row = self.job_rows.get(job.id)
+            if row is not None:
+                seconds = f"{job.seconds:.2f} s" if job.seconds is not None else ""
+                self.job_table.set(row, "status", job.status)
+                self.job_table.set(row, "progress", self.format_job_progress(job))
+                self.job_table.set(row, "time", seconds)
+            if event == "finished" and job.id in self.notify_jobs:
+                self.notify_jobs.discard(job.id)
+                self.show_job_result(job)
+        self.update_progress()
+        self.root.after(POLL_INTERVAL_MS, self.process_job_events)
+    
+    def format_job_progress(self, job):
+        """Return the progress column of a job: its percentage, or its rows if there is no total."""
+        if job.status == "success":
+            return "100%"
+        if job.progress is None:
+            return ""
+        if job.progress.fraction is not None:
+            return f"{job.progress.fraction:.0%}"
+        return f"{job.progress.rows:,} rows" if job.progress.rows else ""
+    
+    def update_progress(self):
+        """
+        Show how many jobs are running and queued. The bar shows the mean progress of
+        the running jobs, or is animated while some of them have no known total.
+        """
+        running_jobs = [job for job in self.job_queue.jobs if job.status == "running"]
+        running = len(running_jobs)
+        queued = sum(1 for job in self.job_queue.jobs if job.status == "queued")
+        if running or queued:
+            self.progress_var.set(f"⏳ Converting... ({running} running, {queued} queued)")
             self.progress_label.config(fg=self.warning_color)
-            
-            input_file = self.input_file_path.get()
-            output_file = self.output_file_path.get()
-            input_format = self.input_format_var.get()
-            output_format = self.output_format_var.get()
-            
-            # Ensure output directory exists
-            ensure_directory_exists(output_file)
-            
-            # Get the appropriate converter
-            converter_class = self.converters[input_format]
-            converter = converter_class(input_file)
-            
-            # Perform the conversion
-            success = converter.convert(output_file)
-            
-            self.progress_bar.stop()
-            
-            if success:
-                self.progress_var.set("✓ Conversion successful!")
-                self.progress_label.config(fg=self.success_color)
-                messagebox.showinfo("Success", f"File converted successfully!\nOutput: {output_file}")
+            fractions = [job.progress.fraction if job.progress is not None else 0.0 for job in running_jobs]
+            if running and None not in fractions:
+                if str(self.progress_bar.cget("mode")) != "determinate":
+                    self.progress_bar.stop()
+                    self.progress_bar.config(mode="determinate")
+                self.progress_bar["value"] = 100 * sum(fractions) / running
             else:
-                self.progress_var.set("✗ Conversion failed")
+                if str(self.progress_bar.cget("mode")) != "indeterminate":
+                    self.progress_bar.config(mode="indeterminate", value=0)
+                self.progress_bar.start()
+        elif self.progress_var.get().startswith("⏳"):
+            failed = sum(1 for job in self.job_queue.jobs if job.status == "failed")
+            if failed:
+                self.progress_var.set(f"✗ {failed} conversion(s) failed")
                 self.progress_label.config(fg=self.error_color)
-                messagebox.showerror("Error", "Conversion failed. Please check the file format and try again.")
-        
-        except Exception as e:
+            else:
+                self.progress_var.set("✓ All conversions finished")
+                self.progress_label.config(fg=self.success_color)
             self.progress_bar.stop()
-            self.progress_var.set("✗ Error during conversion")
-            self.progress_label.config(fg=self.error_color)
-            messagebox.showerror("Error", f"An error occurred during conversion:\n{str(e)}")
-        
-        finally:
-            self.conversion_running = False
-            self.convert_button.config(state=tk.NORMAL)
+            self.progress_bar.config(mode="indeterminate", value=0)
+    
+    def show_job_result(self, job):
+        """Report a job started with the Convert button in a message box."""
+        if job.status == "success":
+            messagebox.showinfo("Success", f"File converted successfully!\nOutput: {job.output_path}"
+                                f"\n\n{job.result.format()}")
+        elif job.status == "cancelled":
+            messagebox.showinfo("Cancelled", f"The conversion of {os.path.basename(job.input_path)} was cancelled.")
+        elif job.error is not None:
+            messagebox.showerror("Error", f"An error occurred during conversion:\n{job.error}")
+        elif job.result is not None:
+            messagebox.showerror("Error", "Conversion failed. Please check the file format and try again."
+                                 f"\n\n{job.result.format()}")
     
     def clear_fields(self):
         """Clear all input fields."""
@@ -539,12 +731,15 @@ class FileConverterGUI:
         self.output_format_var.set("")
         self.progress_var.set("Ready to convert")
         self.progress_label.config(fg=self.success_color)
+        self.show_preview("Select an input file to preview it")
 
 
 def main():
     root = tk.Tk()
     app = FileConverterGUI(root)
     root.mainloop()
+    app.job_queue.shutdown()
+    app.preview_loader.shutdown()
 
 
 if __name__ == "__main__":
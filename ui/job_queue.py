@@ -0,0 +1,111 @@
+"""
+Conversion job queue for the GUI.
+
+Jobs run on a fixed number of worker threads and never touch Tk: each state change is
+put on a thread-safe queue as a (event, job) pair, which the GUI drains from its main
+loop with after(). Converters whose work holds the GIL (ConverterSpec.executor ==
+'process', e.g. PDF) are handed from their worker thread to a worker process, so a
+PDF job does not slow down the CSV jobs running next to it. Running jobs can be
+cancelled too: they stop at their next chunk or page, or have their process terminated.
+"""
+import itertools
+import os
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from converters.async_api import WorkerProcessPool, convert_in_worker
+from converters.progress import CancellationToken
+from utils.file_utils import ensure_directory_exists
+
+# Conversions that run at the same time
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+
+
+class ConversionJob:
+    """One file in the queue. status is 'queued', 'running', 'success', 'failed' or 'cancelled'."""
+
+    def __init__(self, job_id, input_path, output_path, spec):
+        self.id = job_id
+        self.input_path = input_path
+        self.output_path = output_path
+        self.spec = spec
+        self.status = "queued"
+        self.result = None
+        self.error = None
+        self.seconds = None
+        self.future = None
+        self.progress = None
+        self.token = CancellationToken()
+
+
+class JobQueue:
+    """
+    Runs ConversionJobs on a pool of `workers` threads and reports them on `events`:
+    ("running", job), ("progress", job) with job.progress updated, and ("finished", job).
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS):
+        self.workers = workers
+        self.events = queue.Queue()
+        self.jobs = []
+        self._ids = itertools.count(1)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="conversion")
+        self._processes = WorkerProcessPool()
+
+    def submit(self, input_path, output_path, spec):
+        """Queue the conversion of input_path to output_path with the converter of spec."""
+        job = ConversionJob(next(self._ids), input_path, output_path, spec)
+        self.jobs.append(job)
+        job.future = self._executor.submit(self._run, job)
+        return job
+
+    def cancel(self, job):
+        """
+        Cancel a job. A queued job is dropped; a running one is stopped and reported
+        as finished once its partial output is deleted. Returns False if it is done.
+        """
+        if job.future.cancel():
+            job.status = "cancelled"
+            self.events.put(("finished", job))
+            return True
+        if job.future.done():
+            return False
+        job.token.cancel()
+        return True
+
+    def drain(self):
+        """Return the (event, job) pairs posted since the last call, without blocking."""
+        events = []
+        while True:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                return events
+
+    def shutdown(self):
+        """Drop queued jobs and let running ones finish in the background."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._processes.close()
+
+    def _run(self, job):
+        job.status = "running"
+        self.events.put(("running", job))
+        start = time.perf_counter()
+        try:
+            ensure_directory_exists(os.path.abspath(job.output_path))
+            # The input format chosen in the GUI picks the converter, not the file's extension
+            arguments = (job.input_path, job.output_path, job.spec.input_formats[0], None, {})
+            run = self._processes.run if job.spec.executor == "process" else convert_in_worker
+            job.result = run(*arguments, on_progress=lambda progress: self._report(job, progress),
+                             cancel_token=job.token)
+            job.status = job.result.status
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+        job.seconds = time.perf_counter() - start
+        self.events.put(("finished", job))
+
+    def _report(self, job, progress):
+        job.progress = progress
+        self.events.put(("progress", job))
@@ -0,0 +1,79 @@
+"""
+Input previews for the GUI.
+
+A preview is the converter's own reading of the first rows, paragraphs or pages of
+a file (BaseConverter.preview()), so only the head of the file is read. Previews are
+built on a background thread and handed back on a thread-safe queue, which the GUI
+drains from its main loop with after(), like the job queue. Each preview is cached
+by path, size and modification time, so selecting a file again shows it at once
+and a file that has changed is read again.
+"""
+import os
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Number of previews kept in the cache
+PREVIEW_CACHE_SIZE = 32
+
+
+class PreviewLoader:
+    """Builds previews off the Tk thread and reports them on `results` as (path, text, error)."""
+
+    def __init__(self, cache_size=PREVIEW_CACHE_SIZE):
+        self.cache_size = cache_size
+        self.results = queue.Queue()
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        # One thread: previews are quick, and a second one would only compete with conversions
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="preview")
+
+    def request(self, path, spec):
+        """
+        Preview path as read by the converter of spec. A cached preview is reported
+        at once; otherwise it is built in the background. Returns True if it was cached.
+        """
+        try:
+            key = self._get_key(path, spec)
+        except OSError as e:
+            self.results.put((path, None, str(e)))
+            return False
+        with self._lock:
+            text = self._cache.get(key)
+            if text is not None:
+                self._cache.move_to_end(key)
+        if text is not None:
+            self.results.put((path, text, None))
+            return True
+        self._executor.submit(self._load, path, spec, key)
+        return False
+
+    def drain(self):
+        """Return the (path, text, error) triples reported since the last call, without blocking."""
+        results = []
+        while True:
+            try:
+                results.append(self.results.get_nowait())
+            except queue.Empty:
+                return results
+
+    def shutdown(self):
+        """Drop previews that have not started."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _get_key(self, path, spec):
+        stat = os.stat(path)
+        return os.path.abspath(path), stat.st_size, stat.st_mtime_ns, spec.name
+
+    def _load(self, path, spec, key):
+        try:
+            text = spec.load()(path).preview()
+        except Exception as e:
+            self.results.put((path, None, str(e)))
+            return
+        with self._lock:
+            self._cache[key] = text
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        self.results.put((path, text, None))
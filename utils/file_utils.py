@@ -1,6 +1,13 @@
 import os
-from pathlib import Path
-from datetime import datetime
+
+# Suffixes of compressed files by compression, which belong to the extension of the file inside them
+# (converters/compression.py builds its codecs from these)
+COMPRESSION_SUFFIXES = {
+    'gzip': ('.gz', '.gzip'),
+    'bz2': ('.bz2',),
+    'xz': ('.xz',),
+    'zstd': ('.zst', '.zstd'),
+}
 
 def validate_file(file_path, supported_formats):
     """Validate if the file exists and is of a supported format."""
@@ -12,14 +19,31 @@ def validate_file(file_path, supported_formats):
     
     return True
 
+def split_compression(file_path):
+    """Split a compression suffix off a file name or extension: 'data.json.gz' -> ('data.json', 'gzip'), or None."""
+    name = os.fspath(file_path)
+    lower = name.lower()
+    for compression, suffixes in COMPRESSION_SUFFIXES.items():
+        for suffix in suffixes:
+            if lower.endswith(suffix):
+                return name[:-len(suffix)], compression
+    return name, None
+
+def split_extension(file_path):
+    """Split a file path like os.path.splitext(), keeping a compression suffix in the extension ('.csv.gz')."""
+    path = os.fspath(file_path)
+    name, _ = split_compression(path)
+    base, extension = os.path.splitext(name)
+    return base, extension + path[len(name):]
+
 def get_output_path(input_path, target_format):
     """Generate an output file path based on the input file and target format."""
-    base, _ = os.path.splitext(input_path)
+    base, _ = split_extension(input_path)
     return f"{base}_converted.{target_format}"
 
 def get_file_extension(file_path):
-    """Get the file extension from a file path."""
-    return Path(file_path).suffix.lower()
+    """Get the file extension from a file path, with its compression suffix (e.g. '.csv.gz')."""
+    return split_extension(file_path)[1].lower()
 
 def ensure_directory_exists(file_path):
     """Ensure that the directory for the given file path exists."""